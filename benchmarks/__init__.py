@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for clproc.
+
+The benchmarks are not collected by the default test-run. See
+:ref:`benchmarks` for details.
+"""
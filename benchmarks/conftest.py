@@ -0,0 +1,92 @@
+"""
+Fixtures for the benchmark-suite.
+
+The changelog sizes are taken from the environment variable
+``CLPROC_BENCH_SIZES`` (a comma-separated list like ``1k,100k,1M``). Only the
+smallest size is benchmarked by default.
+"""
+import os
+import tracemalloc
+from functools import lru_cache
+from typing import Any, Callable, List
+
+import pytest
+
+from benchmarks.generator import generate_changelog
+
+SIZES_ENV = "CLPROC_BENCH_SIZES"
+DEFAULT_SIZES = "1k"
+MULTIPLIERS = {"k": 1_000, "M": 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    """
+    Convert a size like ``"100k"`` into the number of rows
+    """
+    value = value.strip()
+    if value[-1:] in MULTIPLIERS:
+        return int(value[:-1]) * MULTIPLIERS[value[-1]]
+    return int(value)
+
+
+def _sizes() -> List[str]:
+    raw = os.environ.get(SIZES_ENV, DEFAULT_SIZES)
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    """
+    Run every benchmark using the "num_rows" fixture for each configured size
+    """
+    if "num_rows" in metafunc.fixturenames:
+        sizes = _sizes()
+        metafunc.parametrize(
+            "num_rows", [parse_size(item) for item in sizes], ids=sizes
+        )
+
+
+@lru_cache(maxsize=None)
+def changelog_content(
+    num_rows: int,
+    changelog_version: str = "2.0",
+    release_nodes: int = 2,
+    max_issue_id: int = 100_000,
+) -> str:
+    """
+    Return (and remember) a generated changelog. Generating large files is
+    slow, and they are shared between benchmarks.
+    """
+    return generate_changelog(
+        num_rows, changelog_version, release_nodes, max_issue_id=max_issue_id
+    )
+
+
+@pytest.fixture(params=["1.0", "2.0"], ids=["v1", "v2"])
+def changelog_version(request: pytest.FixtureRequest) -> str:
+    """
+    The changelog-version used for the generated file
+    """
+    return request.param
+
+
+@pytest.fixture()
+def measure(benchmark: Any) -> Callable[..., Any]:
+    """
+    Benchmark a function and record its peak memory usage.
+
+    The memory is measured in a separate (untimed) run because tracing
+    allocations slows down the code considerably. The value is stored in the
+    ``peak_memory`` field of the benchmark's ``extra_info``.
+    """
+
+    def run(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory"] = peak
+        return benchmark(func, *args, **kwargs)
+
+    return run
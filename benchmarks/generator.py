@@ -0,0 +1,153 @@
+"""
+Deterministic generator for synthetic changelog files.
+
+The generated files are valid changelogs (no parsing issues) which exercise
+the expensive parts of the parser: multi-line details, propagated
+version-columns, comments, issue-ids from multiple sources and (for version
+1.0) special release-lines.
+"""
+import random
+from datetime import date, timedelta
+from typing import List
+
+from clproc.model import ChangelogType
+
+WORDS = (
+    "add remove fix update support parser renderer release version issue "
+    "changelog detail template markdown json column file cache output entry"
+).split()
+
+TYPES = [item.value for item in ChangelogType]
+
+ISSUE_COUNT_WEIGHTS = [40, 30, 15, 8, 4, 2, 1]
+"Relative probabilities for 0, 1, 2, ... issue-ids per row"
+
+DETAIL_LINE_WEIGHTS = [60, 15, 10, 8, 4, 2, 1]
+"Relative probabilities for 0, 1, 2, ... lines in the detail-column"
+
+ROWS_PER_RELEASE = (1, 40)
+"The minimum and maximum number of rows per release"
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _release_prefix(index: int, release_nodes: int) -> List[int]:
+    """
+    Return the version-components of the release with the given *index*.
+    """
+    if release_nodes == 1:
+        return [index + 1]
+    return [index // 1000 + 1] + [0] * (release_nodes - 2) + [index % 1000]
+
+
+def _issue_ids(rng: random.Random, max_issue_id: int) -> str:
+    (count,) = rng.choices(range(len(ISSUE_COUNT_WEIGHTS)), ISSUE_COUNT_WEIGHTS)
+    ids = []
+    for _ in range(count):
+        issue = rng.randint(1, max_issue_id)
+        ids.append(f"jira:{issue}" if rng.random() < 0.2 else str(issue))
+    return ", ".join(ids)
+
+
+def _detail(rng: random.Random) -> str:
+    (num_lines,) = rng.choices(
+        range(len(DETAIL_LINE_WEIGHTS)), DETAIL_LINE_WEIGHTS
+    )
+    if not num_lines:
+        return ""
+    lines = [_words(rng, rng.randint(3, 12)) for _ in range(num_lines)]
+    body = "\n".join(f"    {line}" for line in lines)
+    return f'"\n{body}"'
+
+
+def _header(changelog_version: str, release_nodes: int) -> List[str]:
+    return [
+        f"# -*- changelog-version: {changelog_version} -*-",
+        f"# -*- release-nodes: {release_nodes} -*-",
+        "# -*- issue-url-template: https://tracker.example.com/{id} -*-",
+        "# -*- issue-url-template: jira;https://jira.example.com/{id} -*-",
+        "",
+        "# version ; type ; subject ; issues ; i ; h ; detail",
+    ]
+
+
+def generate_changelog(
+    num_rows: int,
+    changelog_version: str = "2.0",
+    release_nodes: int = 2,
+    seed: int = 0,
+    max_issue_id: int = 100_000,
+) -> str:
+    """
+    Generate the content of a changelog file with *num_rows* log-entries.
+
+    The same arguments always generate the same content.
+
+    :param num_rows: The number of log-entries (comments and release-lines
+        are not counted).
+    :param changelog_version: Either ``"1.0"`` or ``"2.0"``
+    :param release_nodes: The number of version-components identifying a
+        release. Versions of log-entries have one more component.
+    :param seed: The seed for the random number generator
+    :param max_issue_id: The highest generated issue-id. Small values result
+        in issues which are referenced by many log-entries.
+    """
+    rng = random.Random(seed)
+    is_v1 = changelog_version == "1.0"
+    first_release_date = date(2000, 1, 1)
+    # Releases are generated from the oldest to the newest and reversed at
+    # the end, so the newest release is at the top of the file.
+    releases: List[List[List[str]]] = []
+    remaining = num_rows
+    while remaining > 0:
+        block_size = min(remaining, rng.randint(*ROWS_PER_RELEASE))
+        remaining -= block_size
+        release_index = len(releases)
+        prefix = _release_prefix(release_index, release_nodes)
+        release = ".".join(str(item) for item in prefix)
+        rows: List[List[str]] = []
+        if is_v1:
+            release_date = first_release_date + timedelta(days=release_index)
+            rows.append(
+                [release, "release", release_date.isoformat(), _words(rng, 6)]
+            )
+        patch = 0
+        for row_index in range(block_size):
+            if row_index and rng.random() < 0.2:
+                patch += 1
+            columns = [
+                f"{release}.{patch}",
+                rng.choice(TYPES),
+                _words(rng, rng.randint(2, 10)),
+                _issue_ids(rng, max_issue_id),
+                "*" if rng.random() < 0.1 else "",
+                "*" if rng.random() < 0.05 else "",
+            ]
+            if is_v1:
+                columns.append("")
+            columns.append(_detail(rng))
+            rows.append(columns)
+            if rng.random() < 0.01:
+                rows.append([f"# {_words(rng, 5)}"])
+        rows.reverse()
+        releases.append(rows)
+    releases.reverse()
+
+    lines = _header(changelog_version, release_nodes)
+    previous_version = ""
+    for rows in releases:
+        for columns in rows:
+            if len(columns) == 1:
+                # A comment would be propagated into the next empty column
+                lines.append(columns[0])
+                previous_version = ""
+                continue
+            version = columns[0]
+            if version == previous_version and rng.random() < 0.3:
+                # Empty version-columns are filled in from the previous row
+                columns[0] = ""
+            previous_version = version
+            lines.append(" ; ".join(columns[:-1]) + " ;" + columns[-1])
+    return "\n".join(lines) + "\n"
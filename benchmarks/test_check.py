@@ -0,0 +1,62 @@
+"""
+Benchmarks for checking a changelog for a version
+"""
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable
+from unittest.mock import patch
+
+import pytest
+from packaging.version import Version
+
+from benchmarks.conftest import changelog_content
+from clproc import core, parser
+from clproc.parser import mapped
+
+
+def _check(content: str, version: Version, strict: bool) -> bool:
+    return core.check_changelog(version, StringIO(content), strict=strict)
+
+
+@pytest.mark.parametrize("strict", [False, True], ids=["fast", "strict"])
+@pytest.mark.parametrize("position", ["newest", "oldest"])
+def test_check(
+    measure: Callable[..., Any], num_rows: int, strict: bool, position: str
+) -> None:
+    """
+    Check for the newest version (best case) and the oldest version (worst
+    case) in the changelog.
+    """
+    content = changelog_content(num_rows)
+    if position == "oldest":
+        version = Version("1.0")
+    else:
+        data = parser.parse(StringIO(content), num_releases=1)
+        version = data.changelog.releases[0].version
+    assert measure(_check, content, version, strict)
+
+
+@pytest.mark.parametrize("layer", ["text", "mapped"])
+def test_scan_file(
+    benchmark: Any, tmp_path: Path, num_rows: int, layer: str
+) -> None:
+    """
+    Scan all versions of a changelog file, either through the text-layer or
+    on the memory-mapped bytes of the file (regardless of its size).
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_text(changelog_content(num_rows), encoding="utf8")
+
+    def scan() -> int:
+        with open(filename, encoding="utf8") as infile, patch.object(
+            mapped, "MIN_MAP_SIZE", 1
+        ):
+            buffer = mapped.map_file(infile) if layer == "mapped" else None
+            if buffer is None:
+                _, versions = parser.scan_versions(infile, lambda _: None)
+                return sum(1 for _ in versions)
+            with buffer:
+                _, versions = mapped.scan_versions(buffer, lambda _: None)
+                return sum(1 for _ in versions)
+
+    assert benchmark(scan) >= num_rows
@@ -0,0 +1,71 @@
+"""
+Benchmarks for the memory used by the data-model
+"""
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from io import StringIO
+from typing import Any, List, Tuple
+
+import pytest
+
+from benchmarks.conftest import changelog_content
+from clproc import parser
+from clproc.model import ChangelogEntry, IssueId
+
+
+def _unslotted(cls: type) -> type:
+    """
+    Return a copy of the dataclass *cls* with a per-instance ``__dict__`` (the
+    layout used before the model classes were slotted)
+    """
+    return make_dataclass(
+        f"Unslotted{cls.__name__}",
+        [(item.name, item.type, item) for item in fields(cls)],
+        frozen=True,
+    )
+
+
+def _copies(
+    entries: List[ChangelogEntry], entry_cls: type, issue_cls: type
+) -> List[Any]:
+    return [
+        entry_cls(
+            **{
+                item.name: getattr(entry, item.name)
+                for item in fields(ChangelogEntry)
+                if item.name != "issue_ids"
+            },
+            issue_ids=frozenset(
+                issue_cls(issue.id, issue.source) for issue in entry.issue_ids
+            ),
+        )
+        for entry in entries
+    ]
+
+
+@pytest.mark.parametrize("layout", ["dict", "slots"])
+def test_bytes_per_entry(benchmark: Any, num_rows: int, layout: str) -> None:
+    """
+    Create copies of all log-entries (and their issue-ids) of a parsed
+    changelog. The memory per entry is stored as ``bytes_per_entry`` in the
+    "extra info" of the benchmark.
+
+    Only the objects themselves are counted. Strings and versions are shared
+    with the parsed changelog.
+    """
+    data = parser.parse(StringIO(changelog_content(num_rows)))
+    entries = [
+        log for release in data.changelog.releases for log in release.logs
+    ]
+    classes: Tuple[type, type] = (ChangelogEntry, IssueId)
+    if layout == "dict":
+        classes = (_unslotted(ChangelogEntry), _unslotted(IssueId))
+    tracemalloc.start()
+    try:
+        copies = _copies(entries, *classes)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["bytes_per_entry"] = size / len(copies)
+    result = benchmark(_copies, entries, *classes)
+    assert len(result) == len(entries)
@@ -0,0 +1,63 @@
+"""
+Benchmarks for the changelog parser
+"""
+from io import StringIO
+from typing import Any, Callable, List
+
+import pytest
+
+from benchmarks.conftest import changelog_content
+from clproc import parser
+from clproc.model import FileMetadata, ParseResult, ReleaseEntry
+from clproc.parser import compiled
+from clproc.parser.core import aggregate_releases
+from clproc.reporting import default_parse_issue_handler
+
+
+def _parse(content: str) -> ParseResult:
+    return parser.parse(StringIO(content))
+
+
+def _aggregate(content: str, file_metadata: FileMetadata) -> List[ReleaseEntry]:
+    return list(aggregate_releases(StringIO(content), file_metadata))
+
+
+@pytest.mark.parametrize("release_nodes", [2, 3])
+def test_parse(
+    measure: Callable[..., Any],
+    num_rows: int,
+    changelog_version: str,
+    release_nodes: int,
+) -> None:
+    """
+    Parse a complete changelog
+    """
+    content = changelog_content(num_rows, changelog_version, release_nodes)
+    result = measure(_parse, content)
+    assert sum(len(release.logs) for release in result.changelog.releases) == (
+        num_rows
+    )
+
+
+def test_aggregate_releases(measure: Callable[..., Any], num_rows: int) -> None:
+    """
+    Aggregate the log-entries into releases (without release-information)
+    """
+    content = changelog_content(num_rows)
+    file_metadata = parser.extract_metadata(
+        StringIO(content), default_parse_issue_handler
+    )
+    releases = measure(_aggregate, content, file_metadata)
+    assert releases
+
+
+@pytest.mark.parametrize("num_releases", [0, 10])
+def test_load_compiled(
+    measure: Callable[..., Any], num_rows: int, num_releases: int
+) -> None:
+    """
+    Load a compiled changelog (compare with test_parse)
+    """
+    data = compiled.dumps(_parse(changelog_content(num_rows)))
+    result = measure(compiled.loads, data, num_releases)
+    assert len(result.changelog.releases) == num_releases or not num_releases
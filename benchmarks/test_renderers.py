@@ -0,0 +1,101 @@
+"""
+Benchmarks for the renderers
+"""
+from dataclasses import replace
+from io import StringIO
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+from benchmarks.conftest import changelog_content
+from clproc import parser
+from clproc.model import Changelog, ChangelogEntry, ChangelogType
+from clproc.renderer import create
+from clproc.renderer.json import JSONRenderer
+from clproc.renderer.markdown import MarkdownRenderer, group_by_type
+
+
+@pytest.mark.parametrize(
+    "max_issue_id", [100_000, 50], ids=["sparse-issues", "dense-issues"]
+)
+@pytest.mark.parametrize(
+    "renderer", [JSONRenderer(), MarkdownRenderer()], ids=["json", "markdown"]
+)
+def test_render(
+    measure: Callable[..., Any],
+    num_rows: int,
+    renderer: Any,
+    max_issue_id: int,
+) -> None:
+    """
+    Render a parsed changelog. With "dense" issues, the same issue-ids are
+    referenced by many log-entries.
+    """
+    content = changelog_content(num_rows, max_issue_id=max_issue_id)
+    data = parser.parse(StringIO(content))
+    output = measure(renderer.render, data.changelog, data.file_metadata)
+    assert output
+
+
+def _legacy_sort(logs: Tuple[ChangelogEntry, ...]) -> List[ChangelogEntry]:
+    """
+    The sort used before the logs were grouped by type (for comparison)
+    """
+    return list(
+        reversed(
+            sorted(
+                logs,
+                key=lambda x: (
+                    -list(ChangelogType).index(x.type_),
+                    x.is_highlight,
+                    x.version,
+                ),
+            )
+        )
+    )
+
+
+def _grouped_sort(logs: Tuple[ChangelogEntry, ...]) -> List[ChangelogEntry]:
+    return [log for _, section in group_by_type(logs) for log in section]
+
+
+@pytest.mark.parametrize(
+    "implementation",
+    [_legacy_sort, _grouped_sort],
+    ids=["legacy", "grouped"],
+)
+def test_markdown_release_ordering(
+    benchmark: Any, num_rows: int, implementation: Callable[..., Any]
+) -> None:
+    """
+    Order the log-entries of a single release containing all rows
+    """
+    data = parser.parse(StringIO(changelog_content(num_rows)))
+    logs = tuple(
+        log for release in data.changelog.releases for log in release.logs
+    )
+    result = benchmark(implementation, logs)
+    assert result == _legacy_sort(logs)
+
+
+@pytest.mark.parametrize("fmt", ["json", "markdown"])
+@pytest.mark.parametrize(
+    "cache_fragments", [False, True], ids=["uncached", "cached"]
+)
+def test_rerender(
+    benchmark: Any, num_rows: int, fmt: str, cache_fragments: bool
+) -> None:
+    """
+    Render a changelog again after a new release was added (as done by the
+    "serve" command and the watch mode)
+    """
+    data = parser.parse(StringIO(changelog_content(num_rows)))
+    instance = create(fmt, cache_fragments=cache_fragments)
+    assert instance is not None
+    instance.render(data.changelog, data.file_metadata)
+    releases = data.changelog.releases
+    modified = Changelog(
+        (replace(releases[0], notes="modified"),) + releases[1:]
+    )
+    output = benchmark(instance.render, modified, data.file_metadata)
+    assert "modified" in output
@@ -0,0 +1,70 @@
+"""
+Benchmarks for the columnar changelog representation
+"""
+from io import StringIO
+from typing import Any, Callable, Dict, List
+
+import pytest
+from packaging.version import Version
+
+from benchmarks.conftest import changelog_content
+from clproc import parser
+from clproc.model import ChangelogEntry, ChangelogType
+from clproc.table import ChangelogTable, parse_table
+
+CRITERIA: Dict[str, Dict[str, Any]] = {
+    "type": {"types": [ChangelogType.FIXED]},
+    "public-highlights": {"internal": False, "highlight": True},
+    "version-range": {
+        "min_version": Version("5"),
+        "max_version": Version("50"),
+    },
+}
+
+
+def _matches(log: ChangelogEntry, criteria: Dict[str, Any]) -> bool:
+    """
+    Check a single log-entry (the object-by-object equivalent of a filter)
+    """
+    types = criteria.get("types")
+    internal = criteria.get("internal")
+    highlight = criteria.get("highlight")
+    minimum = criteria.get("min_version")
+    maximum = criteria.get("max_version")
+    return (
+        (types is None or log.type_ in types)
+        and (internal is None or log.is_internal is internal)
+        and (highlight is None or log.is_highlight is highlight)
+        and (minimum is None or log.version >= minimum)
+        and (maximum is None or log.version < maximum)
+    )
+
+
+def test_parse_table(measure: Callable[..., Any], num_rows: int) -> None:
+    """
+    Parse a changelog into a table
+    """
+    content = changelog_content(num_rows)
+    table = measure(lambda: parse_table(StringIO(content), lambda _: None))
+    assert len(table) == num_rows
+
+
+@pytest.mark.parametrize("name", sorted(CRITERIA))
+@pytest.mark.parametrize("layout", ["objects", "table"])
+def test_filter(benchmark: Any, num_rows: int, name: str, layout: str) -> None:
+    """
+    Count the log-entries matching a filter
+    """
+    criteria = CRITERIA[name]
+    data = parser.parse(StringIO(changelog_content(num_rows)))
+    if layout == "table":
+        table = ChangelogTable.from_releases(data.changelog.releases)
+        result = benchmark(lambda: len(table.select(**criteria)))
+    else:
+        logs: List[ChangelogEntry] = [
+            log for release in data.changelog.releases for log in release.logs
+        ]
+        result = benchmark(
+            lambda: sum(1 for log in logs if _matches(log, criteria))
+        )
+    assert result >= 0
@@ -0,0 +1,44 @@
+"""
+Benchmarks for splitting changelogs into rows
+"""
+from typing import Any, Callable
+
+import pytest
+
+from benchmarks.conftest import changelog_content
+from clproc.parser.tokenizer import tokenize_rows
+from tests.csv_tokenizer import csv_tokenize_rows
+
+
+@pytest.mark.parametrize("quotes", [True, False], ids=["quoted", "unquoted"])
+@pytest.mark.parametrize(
+    "implementation",
+    [csv_tokenize_rows, tokenize_rows],
+    ids=["csv", "tokenizer"],
+)
+def test_tokenize(
+    benchmark: Any,
+    num_rows: int,
+    implementation: Callable[..., Any],
+    quotes: bool,
+) -> None:
+    """
+    Split a changelog into rows. The throughput in rows per second is stored
+    as ``rows_per_second`` in the "extra info" of the benchmark.
+
+    The generated changelogs contain many quoted multi-line details. The
+    "unquoted" variant removes them, which is closer to most real changelogs.
+    """
+    lines = changelog_content(num_rows).splitlines(keepends=True)
+    if not quotes:
+        lines = [
+            line
+            for line in lines
+            if '"' not in line and not line.startswith(" ")
+        ]
+    rows = benchmark(lambda: sum(1 for _ in implementation(lines)))
+    assert rows
+    if benchmark.stats:
+        # Not available with --benchmark-disable
+        mean = benchmark.stats["mean"]
+        benchmark.extra_info["rows_per_second"] = rows / mean
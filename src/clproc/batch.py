@@ -0,0 +1,394 @@
+"""
+This module contains the logic to process many changelog files in one
+invocation.
+
+Starting the interpreter and importing the dependencies of clproc takes
+longer than processing a typical changelog. Processing many files in one
+process (or a pool of processes) avoids paying that price for each file.
+"""
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from glob import glob
+from os.path import abspath, basename, dirname, isabs, join, splitext
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    TypeVar,
+)
+
+from packaging.version import InvalidVersion, Version
+
+from clproc import core
+from clproc.cache import ParseCache
+from clproc.discovery import discover_version
+from clproc.exc import ClprocException
+
+LOG = logging.getLogger(__name__)
+
+TJob = TypeVar("TJob")
+TResult = TypeVar("TResult")
+
+DEFAULT_OUTPUT_TEMPLATE = os.path.join("{dir}", "CHANGELOG.{ext}")
+"Where rendered files are written to if no template is given"
+
+EXTENSIONS = {"markdown": "md", "json": "json", "ndjson": "ndjson"}
+"File extensions for each output format (used in output templates)"
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    """
+    The description of one file to render
+    """
+
+    infile: str
+    "The changelog file"
+    outfile: str
+    "The file to write the rendered document into"
+    fmt: str = "json"
+    "The output format"
+    num_releases: int = 0
+    "Only render the last N releases (0 = all releases)"
+    cache_dir: str = ""
+    "The directory of the parse-cache (disabled if empty)"
+
+
+@dataclass(frozen=True)
+class JobResult:
+    """
+    The outcome of processing one file
+    """
+
+    infile: str
+    "The processed changelog file"
+    success: bool
+    "Whether the file was processed successfully"
+    message: str = ""
+    "A human readable description of an error"
+
+
+@dataclass(frozen=True)
+class CheckJob:
+    """
+    The description of one changelog to check
+    """
+
+    infile: str
+    "The changelog file"
+    version: str = ""
+    """
+    The expected version. If empty, it is discovered from the project metadata
+    in the folder of the changelog.
+    """
+    strict: bool = False
+    "Consider parsing issues as errors"
+    exact: bool = False
+    "Compare the version to the letter instead of comparing the release"
+    release_only: bool = False
+    "Only look for the release-version of the expected version"
+    cache_dir: str = ""
+    "The directory of the parse-cache (disabled if empty)"
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """
+    The outcome of checking one changelog
+    """
+
+    infile: str
+    "The checked changelog file"
+    version: str
+    "The expected version (empty if it could not be determined)"
+    success: bool
+    "Whether the changelog contains the expected version"
+    message: str = ""
+    "A human readable description of an error"
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """
+    Expand glob-patterns in *patterns* (``**`` is supported). Values without
+    wildcards are returned as-is, even if they do not exist.
+    """
+    output: List[str] = []
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            output.extend(sorted(glob(pattern, recursive=True)))
+        else:
+            output.append(pattern)
+    return output
+
+
+def output_filename(template: str, infile: str, fmt: str) -> str:
+    """
+    Create the output filename for *infile* from *template*.
+
+    The following placeholders are replaced:
+
+    ``{dir}``
+        The folder containing the changelog (``.`` for the current folder)
+    ``{name}``
+        The filename of the changelog without extension
+    ``{ext}``
+        The usual file-extension for *fmt* (f.ex. ``md`` for markdown)
+
+    >>> output_filename("{dir}/CHANGELOG.{ext}", "pkg/changelog.in", "markdown")
+    'pkg/CHANGELOG.md'
+    """
+    return template.format(
+        dir=dirname(infile) or ".",
+        name=splitext(basename(infile))[0],
+        ext=EXTENSIONS.get(fmt, fmt),
+    )
+
+
+@contextmanager
+def changelog_directory(infile: str) -> Iterator[None]:
+    """
+    Change into the folder of *infile* while running the block.
+
+    The release-file named in a changelog is relative to the working
+    directory. Running each job in the folder of its changelog finds it as if
+    clproc was called from there.
+    """
+    previous = os.getcwd()
+    os.chdir(dirname(abspath(infile)))
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def error_message(exc: Exception) -> str:
+    """
+    Describe *exc* for a failed job. Unexpected errors are prefixed with their
+    type, as their message alone is often meaningless.
+    """
+    if isinstance(exc, (ClprocException, OSError)):
+        return str(exc)
+    return f"{type(exc).__name__}: {exc}"
+
+
+def render_file(job: RenderJob) -> JobResult:
+    """
+    Render a single changelog file as described by *job*.
+
+    The job runs in the folder of the changelog (see
+    :py:func:`~.changelog_directory`). The output file is only replaced if
+    rendering succeeds. Errors are returned as failed :py:class:`~.JobResult`
+    instead of being raised, so that one broken file does not stop the other
+    files.
+    """
+    cache = ParseCache(abspath(job.cache_dir)) if job.cache_dir else None
+    infile_name = abspath(job.infile)
+    outfile_name = abspath(job.outfile)
+    try:
+        with changelog_directory(infile_name), open(
+            infile_name, encoding="utf8"
+        ) as infile, core.replacing_output(
+            outfile_name, encoding="utf8"
+        ) as outfile:
+            core.write_changelog(
+                fmt=job.fmt,
+                infile=infile,
+                outfile=outfile,
+                num_releases=job.num_releases,
+                cache=cache,
+            )
+    except Exception as exc:  # pylint: disable=broad-except
+        LOG.debug("Unable to render %r", job.infile, exc_info=True)
+        return JobResult(job.infile, False, error_message(exc))
+    return JobResult(job.infile, True)
+
+
+def run_jobs(
+    func: Callable[[TJob], TResult],
+    jobs: Sequence[TJob],
+    num_workers: Optional[int] = None,
+) -> List[TResult]:
+    """
+    Call *func* for each item in *jobs* using a pool of *num_workers*
+    processes and return the results in the order of *jobs*.
+
+    :param func: A picklable (module-level) function
+    :param num_workers: The number of worker processes. ``None`` or ``0`` uses
+        one process per CPU. With a single worker (or a single job) everything
+        runs in the current process.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    num_workers = min(num_workers, len(jobs))
+    if num_workers <= 1:
+        return [func(job) for job in jobs]
+    # multiprocessing is only imported when it is really used
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(jobs) // (num_workers * 4))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(func, jobs, chunksize=chunksize))
+
+
+def render_many(
+    infiles: Sequence[str],
+    fmt: str = "json",
+    output_template: str = DEFAULT_OUTPUT_TEMPLATE,
+    num_releases: int = 0,
+    num_workers: Optional[int] = None,
+    cache_dir: str = "",
+) -> List[JobResult]:
+    """
+    Render all changelogs in *infiles* into files named after
+    *output_template* (see :py:func:`~.output_filename`).
+
+    :raises ClprocException: If two changelogs would be written into the same
+        output file.
+    """
+    jobs = [
+        RenderJob(
+            infile,
+            output_filename(output_template, infile, fmt),
+            fmt,
+            num_releases,
+            cache_dir,
+        )
+        for infile in infiles
+    ]
+    counts = Counter(job.outfile for job in jobs)
+    duplicates = sorted(name for name, count in counts.items() if count > 1)
+    if duplicates:
+        raise ClprocException(
+            f"Multiple changelogs would be written into {duplicates}. "
+            "Use {dir} or {name} in the output template."
+        )
+    return run_jobs(render_file, jobs, num_workers)
+
+
+def read_manifest(
+    manifest: TextIO, base_dir: str = ""
+) -> List[Tuple[str, str]]:
+    """
+    Read pairs of changelog files and expected versions from *manifest*.
+
+    Each line contains the path to a changelog, optionally followed by the
+    expected version (separated by whitespace). Empty lines and lines starting
+    with ``#`` are ignored. Relative paths are relative to *base_dir*.
+
+    Example::
+
+        # changelog               version
+        pkg-a/changelog.in        1.2.0
+        pkg-b/changelog.in        # discovered from pkg-b/pyproject.toml
+
+    :return: A list of (path, version) tuples. The version is empty if it was
+        not given.
+    """
+    output: List[Tuple[str, str]] = []
+    for lineno, line in enumerate(manifest, 1):
+        line = line.partition("#")[0].strip()
+        if not line:
+            continue
+        fields = line.split()
+        if len(fields) > 2:
+            raise ClprocException(
+                f"Line #{lineno} of the manifest: Expected at most 2 fields "
+                f"but got {len(fields)}"
+            )
+        path = fields[0] if isabs(fields[0]) else join(base_dir, fields[0])
+        output.append((path, fields[1] if len(fields) == 2 else ""))
+    return output
+
+
+def check_file(job: CheckJob) -> CheckResult:
+    """
+    Check a single changelog file as described by *job*.
+
+    Unless the job is strict, only the version-columns of the changelog are
+    read (see :py:func:`clproc.core.check_changelog`). Like
+    :py:func:`~.render_file`, the check runs in the folder of the changelog.
+    Errors are returned as failed :py:class:`~.CheckResult`, so that one
+    broken file does not stop the other files.
+    """
+    try:
+        version = Version(job.version or discover_version(dirname(job.infile)))
+    except (ClprocException, OSError, InvalidVersion, KeyError) as exc:
+        LOG.debug(
+            "Unable to determine version of %r", job.infile, exc_info=True
+        )
+        return CheckResult(
+            job.infile, "", False, f"Unable to determine version: {exc}"
+        )
+    cache = ParseCache(abspath(job.cache_dir)) if job.cache_dir else None
+    infile_name = abspath(job.infile)
+    try:
+        with changelog_directory(infile_name), open(
+            infile_name, encoding="utf8"
+        ) as infile:
+            found = core.check_changelog(
+                version,
+                infile,
+                strict=job.strict,
+                exact=job.exact,
+                release_only=job.release_only,
+                cache=cache,
+            )
+    except Exception as exc:  # pylint: disable=broad-except
+        LOG.debug("Unable to check %r", job.infile, exc_info=True)
+        return CheckResult(job.infile, str(version), False, error_message(exc))
+    if found:
+        return CheckResult(job.infile, str(version), True)
+    message = f"Version {version} not found"
+    if job.strict:
+        message += " or errors found"
+    return CheckResult(job.infile, str(version), False, message)
+
+
+def check_many(
+    files: Sequence[Tuple[str, str]],
+    strict: bool = False,
+    exact: bool = False,
+    release_only: bool = False,
+    num_workers: Optional[int] = None,
+    cache_dir: str = "",
+) -> List[CheckResult]:
+    """
+    Check that each changelog in *files* contains the expected version.
+
+    :param files: Pairs of changelog filenames and expected versions (see
+        :py:func:`~.read_manifest`). An empty version is discovered from the
+        project metadata next to the changelog.
+    """
+    jobs = [
+        CheckJob(infile, version, strict, exact, release_only, cache_dir)
+        for infile, version in files
+    ]
+    return run_jobs(check_file, jobs, num_workers)
+
+
+def check_report(results: Sequence[CheckResult]) -> Dict[str, Any]:
+    """
+    Convert *results* into a JSON-serialisable report
+    """
+    return {
+        "success": all(result.success for result in results),
+        "results": [
+            {
+                "infile": result.infile,
+                "version": result.version,
+                "success": result.success,
+                "message": result.message,
+            }
+            for result in results
+        ],
+    }
@@ -0,0 +1,360 @@
+"""
+This module contains an opt-in on-disk cache for parse results.
+
+Parsed changelogs are stored in a cache directory keyed by a hash of the
+changelog content, the content of its release-file and the version of clproc.
+Any modification to one of those results in a new key. Stale entries are
+removed by age and by the total size of the cache directory.
+
+Entries are stored in the compiled format (see
+:py:mod:`clproc.parser.compiled`). Loading an entry does not import or call
+anything, even if somebody else can write to the cache directory.
+
+Several processes may share one cache directory. Files removed by another
+process while reading or evicting are treated like cache-misses.
+"""
+import hashlib
+import logging
+import marshal
+import os
+import time
+from dataclasses import dataclass
+from io import StringIO
+from os.path import exists, join
+from tempfile import NamedTemporaryFile
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from clproc import __version__
+from clproc.model import (
+    Changelog,
+    FileMetadata,
+    ParseResult,
+    ParsingIssueMessage,
+    TParseIssueHandler,
+)
+from clproc.parser import compiled
+from clproc.parser.core import scan_metadata
+from clproc.reporting import default_parse_issue_handler
+
+if TYPE_CHECKING:  # pragma: no cover
+    from clproc.parser.incremental import IncrementalState
+
+LOG = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "CLPROC_CACHE_DIR"
+"The environment variable which enables the cache"
+
+CACHE_FORMAT = 2
+"Bumped whenever the layout of cached data changes"
+
+SUFFIX = ".clpc"
+
+LEGACY_SUFFIXES = (".pickle",)
+"Suffixes of cache files written by previous versions. They are removed."
+
+ORPHAN_AGE = 60 * 60
+"""
+The age (in seconds) after which temporary files are removed. They are left
+behind by processes which were interrupted while writing a cache file.
+"""
+
+T = TypeVar("T")
+
+
+def clproc_version() -> str:
+    """
+    Return the version of the installed clproc package
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover (Python < 3.8)
+        return __version__
+    try:
+        return version("clproc")
+    except PackageNotFoundError:  # pragma: no cover
+        return __version__
+
+
+def _key_prefix() -> bytes:
+    """
+    Return the part of all keys which identifies the layout of cached data
+    """
+    return f"{CACHE_FORMAT}:{clproc_version()}\0".encode("utf8")
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """
+    The data stored for one changelog
+    """
+
+    result: ParseResult
+    "The parsed changelog"
+    parse_issues: Tuple[ParsingIssueMessage, ...] = tuple()
+    "Issues reported while parsing. They are replayed when loading the entry"
+
+
+class ParseCache:
+    """
+    A directory containing serialised parse results.
+
+    :param directory: Where to store the cache files. It is created if needed.
+    :param max_size: The maximum size (in bytes) of all cache files together.
+    :param max_age: The maximum age (in seconds) of a cache file.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = 64 * 1024 * 1024,
+        max_age: float = 7 * 24 * 60 * 60,
+    ) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def key(self, content: str, file_metadata: FileMetadata) -> str:
+        """
+        Compute the cache-key for a changelog.
+
+        :param content: The complete content of the changelog file
+        :param file_metadata: The metadata found in the changelog file. It
+            is used to locate the release-file.
+        """
+        digest = hashlib.sha256()
+        digest.update(_key_prefix())
+        digest.update(content.encode("utf8"))
+        digest.update(b"\0")
+        release_file = file_metadata.release_file
+        if release_file and exists(release_file):
+            with open(release_file, "rb") as fptr:
+                digest.update(fptr.read())
+        return digest.hexdigest()
+
+    def state_key(self, filename: str) -> str:
+        """
+        Compute the key for the incremental parser state of *filename*.
+
+        Contrary to :py:meth:`~.key` this does not depend on the file-content.
+        """
+        digest = hashlib.sha256()
+        digest.update(_key_prefix())
+        digest.update(os.path.abspath(filename).encode("utf8"))
+        return "state-" + digest.hexdigest()
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        """
+        Return the cached entry for *key* or ``None`` if it is not available.
+        """
+        return self._read(key, _load_entry)
+
+    def load_state(self, key: str) -> Optional["IncrementalState"]:
+        """
+        Return the incremental parser state for *key* (if available).
+        """
+        return self._read(key, _load_state)
+
+    def store(
+        self, key: str, entry: Union[CacheEntry, "IncrementalState"]
+    ) -> None:
+        """
+        Store *entry* under *key* and remove stale entries.
+        """
+        if isinstance(entry, CacheEntry):
+            data = _dump_entry(entry)
+        else:
+            data = _dump_state(entry)
+        os.makedirs(self.directory, exist_ok=True)
+        with NamedTemporaryFile(
+            "wb", dir=self.directory, suffix=".tmp", delete=False
+        ) as fptr:
+            try:
+                fptr.write(data)
+            except BaseException:
+                fptr.close()
+                _remove(fptr.name)
+                raise
+        os.replace(fptr.name, join(self.directory, key + SUFFIX))
+        self.evict()
+
+    def _read(self, key: str, load: Callable[[bytes], T]) -> Optional[T]:
+        """
+        Load the cache file for *key*. Returns ``None`` if the file is
+        missing or unreadable.
+        """
+        filename = join(self.directory, key + SUFFIX)
+        try:
+            with open(filename, "rb") as fptr:
+                output = load(fptr.read())
+            # Mark the file as recently used, so it is evicted last
+            os.utime(filename)
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-except
+            LOG.debug("Unable to read cache file %r", filename, exc_info=True)
+            return None
+        return output
+
+    def evict(self) -> None:
+        """
+        Remove entries which are too old and then the least recently used
+        entries until the cache fits into ``max_size``.
+
+        Temporary files older than :py:data:`~.ORPHAN_AGE` and the files of
+        previous cache formats are removed as well.
+        """
+        now = time.time()
+        files: List[Tuple[float, int, str]] = []
+        for item in os.scandir(self.directory):
+            if item.name.endswith(SUFFIX):
+                max_age = self.max_age
+            elif item.name.endswith(".tmp"):
+                max_age = ORPHAN_AGE
+            elif item.name.endswith(LEGACY_SUFFIXES):
+                max_age = 0
+            else:
+                continue
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > max_age:
+                _remove(item.path)
+            elif item.name.endswith(SUFFIX):
+                files.append((stat.st_mtime, stat.st_size, item.path))
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            _remove(path)
+            total_size -= size
+
+
+def _remove(filename: str) -> None:
+    """
+    Remove *filename* unless another process already did
+    """
+    try:
+        os.unlink(filename)
+    except FileNotFoundError:
+        pass
+
+
+def _dump_entry(entry: CacheEntry) -> bytes:
+    return compiled.dumps(entry.result, entry.parse_issues)
+
+
+def _load_entry(data: bytes) -> CacheEntry:
+    parse_issues: List[ParsingIssueMessage] = []
+    result = compiled.loads(data, parse_issue_handler=parse_issues.append)
+    return CacheEntry(result, tuple(parse_issues))
+
+
+def _dump_state(state: "IncrementalState") -> bytes:
+    """
+    The releases of *state* are compiled like a changelog. The remaining
+    values of each block are stored next to it.
+    """
+    releases = Changelog(tuple(block.release for block in state.blocks))
+    blocks = tuple(
+        (
+            block.offset,
+            block.digest,
+            block.num_rows,
+            tuple(
+                (row, issue.level, issue.message)
+                for row, issue in block.parse_issues
+            ),
+        )
+        for block in state.blocks
+    )
+    return marshal.dumps(
+        (compiled.dumps(ParseResult(releases, state.file_metadata)), blocks),
+        compiled.MARSHAL_VERSION,
+    )
+
+
+def _load_state(data: bytes) -> "IncrementalState":
+    # pylint: disable=import-outside-toplevel
+    from clproc.parser.incremental import IncrementalState, ReleaseBlock
+
+    changelog, blocks = marshal.loads(data)
+    result = compiled.loads(changelog)
+    releases = result.changelog.releases
+    if len(releases) != len(blocks):
+        raise ValueError("The number of releases and blocks differ")
+    return IncrementalState(
+        result.file_metadata,
+        tuple(
+            ReleaseBlock(
+                offset,
+                digest,
+                num_rows,
+                release,
+                tuple(
+                    (row, ParsingIssueMessage(level, message))
+                    for row, level, message in issues
+                ),
+            )
+            for release, (offset, digest, num_rows, issues) in zip(
+                releases, blocks
+            )
+        ),
+    )
+
+
+def cached_parse(
+    infile: TextIO,
+    cache: ParseCache,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> ParseResult:
+    """
+    Parse *infile* like :py:func:`clproc.parser.parse`, reusing a previous
+    result from *cache* if neither the changelog nor its release-file have
+    changed.
+
+    The complete changelog is always parsed (and cached). Issues found while
+    parsing are reported to *parse_issue_handler* on every call.
+
+    On a cache-miss, unchanged releases at the end of the file are reused from
+    the previous run on the same file (see :py:mod:`clproc.parser.incremental`).
+
+    Compiled changelogs (see :py:mod:`clproc.parser.compiled`) are loaded
+    without using the cache.
+    """
+    # pylint: disable=import-outside-toplevel
+    from clproc.parser.incremental import parse_incremental
+
+    data = compiled.read_compiled(infile)
+    if data is not None:
+        return compiled.loads(data, parse_issue_handler=parse_issue_handler)
+    content = infile.read()
+    file_metadata, _ = scan_metadata(StringIO(content), lambda _: None)
+    key = cache.key(content, file_metadata)
+    entry = cache.load(key)
+    if entry is None:
+        LOG.debug("Cache miss for %r", getattr(infile, "name", infile))
+        parse_issues: List[ParsingIssueMessage] = []
+        state_key = cache.state_key(getattr(infile, "name", "<unknown>"))
+        result, state = parse_incremental(
+            content, cache.load_state(state_key), parse_issues.append
+        )
+        entry = CacheEntry(result, tuple(parse_issues))
+        cache.store(key, entry)
+        if state:
+            cache.store(state_key, state)
+    else:
+        LOG.debug("Cache hit for %r", getattr(infile, "name", infile))
+    for issue in entry.parse_issues:
+        parse_issue_handler(issue)
+    return entry.result
@@ -1,20 +1,27 @@
 """
 The CLI interface
 """
+import json
 import logging
+import os
 import sys
 from argparse import ArgumentParser, FileType, Namespace
-from os.path import abspath
+from os.path import abspath, dirname
 from typing import Callable, Optional, Sequence
 
 from packaging.version import Version
 
-from clproc import core
+from clproc import batch, core
+from clproc.batch import DEFAULT_OUTPUT_TEMPLATE
+from clproc.cache import CACHE_DIR_ENV, ParseCache
 from clproc.discovery import discover_version
 from clproc.exc import ClprocException
 
 LOG = logging.getLogger(__name__)
 
+BATCH_COMMANDS = {"render-many", "check-many", "serve"}
+"Subcommands processing multiple files (which are not preceded by a file)"
+
 
 def format_converter(fmt: str) -> str:
     """
@@ -22,6 +29,8 @@ def format_converter(fmt: str) -> str:
     """
     if fmt == "md":
         return "markdown"
+    if fmt == "jsonl":
+        return "ndjson"
     return fmt
 
 
@@ -54,11 +63,10 @@ def add_check_args(parser: ArgumentParser) -> None:
     )
 
 
-def parse_args(args: Optional[Sequence[str]] = None) -> Namespace:
+def add_global_args(parser: ArgumentParser) -> None:
     """
-    Process and parse command-line arguments and return the processes object.
+    Add the CLI arguments which are available for all subcommands.
     """
-    parser = ArgumentParser()
     parser.add_argument(
         "-v",
         "--verbose",
@@ -67,14 +75,21 @@ def parse_args(args: Optional[Sequence[str]] = None) -> Namespace:
         help="Increase output verbosity (can be specified multiple times)",
     )
     parser.add_argument(
-        "infile",
-        help="The source-file for the changelog",
-        type=FileType("r"),
+        "--cache-dir",
+        default=os.environ.get(CACHE_DIR_ENV, ""),
+        help=(
+            "Cache parse results in this directory and reuse them while "
+            "the changelog and its release-file are unchanged. Defaults to "
+            f"the {CACHE_DIR_ENV} environment variable (disabled if unset)"
+        ),
     )
-    subp = parser.add_subparsers()
 
-    render_parser = subp.add_parser("render")
-    render_parser.add_argument(
+
+def add_render_args(parser: ArgumentParser) -> None:
+    """
+    Add common CLI arguments for the "render/render-many" subcommands.
+    """
+    parser.add_argument(
         "-n",
         "--num-releases",
         type=int,
@@ -85,20 +100,195 @@ def parse_args(args: Optional[Sequence[str]] = None) -> Namespace:
         metavar="N",
         default=0,
     )
-    render_parser.add_argument(
+    parser.add_argument(
         "-f",
         "--format",
         default="json",
         type=format_converter,
         help="the possible output format",
-        choices=["md", "markdown", "json"],
+        choices=["md", "markdown", "json", "jsonl", "ndjson"],
+    )
+
+
+def add_jobs_arg(parser: ArgumentParser) -> None:
+    """
+    Add the argument controlling the number of worker processes
+    """
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "The number of worker processes. Use 0 (default) for one "
+            "process per CPU"
+        ),
+    )
+
+
+def _first_positional(args: Sequence[str]) -> Optional[str]:
+    """
+    Return the first positional argument in *args* (skipping the values of
+    global options).
+    """
+    skip_value = False
+    for arg in args:
+        if skip_value:
+            skip_value = False
+        elif arg == "--cache-dir":
+            skip_value = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def parse_batch_args(args: Sequence[str]) -> Namespace:
+    """
+    Parse command-line arguments for the subcommands which process multiple
+    files. Contrary to the single-file commands, those don't take the
+    changelog file as first argument.
+    """
+    parser = ArgumentParser()
+    add_global_args(parser)
+    subp = parser.add_subparsers()
+
+    render_parser = subp.add_parser(
+        "render-many", help="Render multiple changelog files"
     )
+    add_render_args(render_parser)
+    render_parser.add_argument(
+        "-o",
+        "--output-template",
+        default=DEFAULT_OUTPUT_TEMPLATE,
+        help=(
+            "Where to write each rendered changelog. {dir} is replaced with "
+            "the folder of the changelog, {name} with its filename (without "
+            "extension) and {ext} with the extension of the output format. "
+            "(default: %(default)s)"
+        ),
+    )
+    add_jobs_arg(render_parser)
+    render_parser.add_argument(
+        "infiles",
+        nargs="+",
+        metavar="INFILE",
+        help=(
+            "The changelog files. Glob patterns (like **/changelog.in) "
+            "are expanded"
+        ),
+    )
+    render_parser.set_defaults(func=execute_render_many)
+
+    check_parser = subp.add_parser(
+        "check-many",
+        help="Check multiple changelog files for their expected version",
+    )
+    add_check_args(check_parser)
+    add_jobs_arg(check_parser)
+    check_parser.add_argument(
+        "--manifest",
+        type=FileType("r"),
+        help=(
+            "A file listing changelogs (one per line) followed by their "
+            "expected version. If the version is missing, it is discovered "
+            "from the project metadata next to the changelog. Relative paths "
+            "are relative to the folder of the manifest"
+        ),
+    )
+    check_parser.add_argument(
+        "--report",
+        default="-",
+        help=(
+            "Write a JSON report into this file. Leave empty or set to '-' "
+            "to use stdout"
+        ),
+    )
+    check_parser.add_argument(
+        "infiles",
+        nargs="*",
+        metavar="INFILE",
+        help=(
+            "Additional changelog files. Their version is discovered from "
+            "the project metadata next to the changelog. Glob patterns "
+            "(like **/changelog.in) are expanded"
+        ),
+    )
+    check_parser.set_defaults(func=execute_check_many)
+
+    serve_parser = subp.add_parser(
+        "serve", help="Serve rendered changelogs over HTTP"
+    )
+    serve_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="The address to listen on (default: %(default)s)",
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="The port to listen on (default: %(default)s)",
+    )
+    serve_parser.add_argument(
+        "files",
+        nargs="+",
+        metavar="[NAME=]INFILE",
+        help=(
+            "The changelogs to serve. Each changelog is available as "
+            "/NAME.md, /NAME.json and /NAME.ndjson. NAME defaults to the "
+            "name of the folder containing the changelog"
+        ),
+    )
+    serve_parser.set_defaults(func=execute_serve)
+    output = parser.parse_args(args)
+    if output.func is execute_check_many and not (
+        output.manifest or output.infiles
+    ):
+        check_parser.error("Either --manifest or INFILE is required")
+    return output
+
+
+def parse_args(args: Optional[Sequence[str]] = None) -> Namespace:
+    """
+    Process and parse command-line arguments and return the processes object.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    if _first_positional(args) in BATCH_COMMANDS:
+        return parse_batch_args(args)
+    parser = ArgumentParser(
+        epilog=(
+            "To process multiple files at once, see "
+            "'clproc render-many --help' and 'clproc check-many --help'"
+        )
+    )
+    add_global_args(parser)
+    parser.add_argument(
+        "infile",
+        help="The source-file for the changelog",
+        type=FileType("r"),
+    )
+    subp = parser.add_subparsers()
+
+    render_parser = subp.add_parser("render")
+    add_render_args(render_parser)
     render_parser.add_argument(
         "-o",
         "--outfile",
         default="-",
         help="Output file. Leave empty or set to '-' to use stdout",
     )
+    render_parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and render the changelog again whenever it (or "
+            "its release-file) is modified. The output file is only "
+            "replaced if its content changes. Requires --outfile"
+        ),
+    )
     render_parser.set_defaults(func=execute_render)
 
     check_parser = subp.add_parser("check")
@@ -114,6 +304,21 @@ def parse_args(args: Optional[Sequence[str]] = None) -> Namespace:
     )
     check_parser.set_defaults(func=execute_check)
 
+    compile_parser = subp.add_parser(
+        "compile",
+        help=(
+            "Write a precompiled changelog which is loaded considerably "
+            "faster than the source file"
+        ),
+    )
+    compile_parser.add_argument(
+        "-o",
+        "--outfile",
+        required=True,
+        help="The compiled file (f.ex. changelog.clpc)",
+    )
+    compile_parser.set_defaults(func=execute_compile)
+
     autocheck_parser = subp.add_parser("autocheck")
     add_check_args(autocheck_parser)
     autocheck_parser.set_defaults(func=execute_autocheck)
@@ -135,6 +340,15 @@ def setup_logging(verbosity: int = 0) -> None:
         logging.basicConfig(level=logging.DEBUG)
 
 
+def get_cache(namespace: Namespace) -> Optional[ParseCache]:
+    """
+    Return the parse-cache requested on the command-line (if any).
+    """
+    if not namespace.cache_dir:
+        return None
+    return ParseCache(namespace.cache_dir)
+
+
 def execute_render(namespace: Namespace) -> int:
     """
     Main entry-point for the "render" subcommand.
@@ -143,16 +357,151 @@ def execute_render(namespace: Namespace) -> int:
     :returns: A valid posix exit-code
     """
     LOG.info("Rendering %s", abspath(namespace.infile.name))
-    render_output = core.make_changelog(
+    if namespace.watch:
+        return execute_watch(namespace)
+    if namespace.outfile.strip() in {"-", ""}:
+        try:
+            core.write_changelog(
+                fmt=namespace.format,
+                infile=namespace.infile,
+                outfile=sys.stdout,
+                num_releases=namespace.num_releases,
+                cache=get_cache(namespace),
+            )
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The consumer (f.ex. "head") stopped reading. Any remaining
+            # output is discarded instead of failing again on exit.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return 0
+    else:
+        with core.replacing_output(namespace.outfile.strip()) as stream:
+            core.write_changelog(
+                fmt=namespace.format,
+                infile=namespace.infile,
+                outfile=stream,
+                num_releases=namespace.num_releases,
+                cache=get_cache(namespace),
+            )
+    return 0
+
+
+def execute_watch(namespace: Namespace) -> int:
+    """
+    Run the "render" subcommand in watch mode until interrupted.
+
+    :param namespace: The argparse namespace.
+    :returns: A valid posix exit-code
+    """
+    # pylint: disable=import-outside-toplevel
+    from clproc.watch import Watcher, watch
+
+    namespace.infile.close()
+    outfile = namespace.outfile.strip()
+    if outfile in {"-", ""} or namespace.infile.name == "<stdin>":
+        LOG.error("Watching requires both an input- and an output-file")
+        return 1
+    watcher = Watcher(
+        namespace.infile.name,
+        outfile,
+        namespace.format,
+        namespace.num_releases,
+    )
+    print(
+        f"Watching {namespace.infile.name} (press Ctrl+C to stop)",
+        file=sys.stderr,
+    )
+    try:
+        watch(watcher)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def execute_render_many(namespace: Namespace) -> int:
+    """
+    Main entry-point for the "render-many" subcommand.
+
+    :param namespace: The argparse namespace.
+    :returns: A valid posix exit-code. It is non-zero if any file failed.
+    """
+    infiles = batch.expand_paths(namespace.infiles)
+    LOG.info("Rendering %d files", len(infiles))
+    results = batch.render_many(
+        infiles,
         fmt=namespace.format,
-        infile=namespace.infile,
+        output_template=namespace.output_template,
         num_releases=namespace.num_releases,
+        num_workers=namespace.jobs,
+        cache_dir=namespace.cache_dir,
     )
-    if namespace.outfile.strip() in {"-", ""}:
-        print(render_output)
+    failures = [result for result in results if not result.success]
+    for result in failures:
+        print(
+            f"Unable to render {result.infile}: {result.message}",
+            file=sys.stderr,
+        )
+    LOG.info(
+        "Rendered %d of %d files", len(results) - len(failures), len(results)
+    )
+    return 1 if failures else 0
+
+
+def execute_check_many(namespace: Namespace) -> int:
+    """
+    Main entry-point for the "check-many" subcommand.
+
+    :param namespace: The argparse namespace.
+    :returns: A valid posix exit-code. It is non-zero if any check failed.
+    """
+    files = []
+    if namespace.manifest:
+        with namespace.manifest as manifest:
+            files.extend(batch.read_manifest(manifest, dirname(manifest.name)))
+    files.extend((item, "") for item in batch.expand_paths(namespace.infiles))
+    LOG.info("Checking %d files", len(files))
+    results = batch.check_many(
+        files,
+        strict=namespace.strict,
+        exact=namespace.exact,
+        release_only=namespace.release_only,
+        num_workers=namespace.jobs,
+        cache_dir=namespace.cache_dir,
+    )
+    report = json.dumps(batch.check_report(results), indent=2)
+    if namespace.report.strip() in {"-", ""}:
+        print(report)
     else:
-        with open(namespace.outfile.strip(), "w") as stream:
-            print(render_output, file=stream)
+        with open(namespace.report.strip(), "w", encoding="utf8") as stream:
+            print(report, file=stream)
+    failures = [result for result in results if not result.success]
+    for result in failures:
+        print(f"{result.infile}: {result.message}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def execute_serve(namespace: Namespace) -> int:
+    """
+    Main entry-point for the "serve" subcommand. Runs until interrupted.
+
+    :param namespace: The argparse namespace.
+    :returns: A valid posix exit-code
+    """
+    # pylint: disable=import-outside-toplevel
+    from clproc.server import ChangelogServer, ChangelogStore, parse_file_args
+
+    store = ChangelogStore(parse_file_args(namespace.files))
+    with ChangelogServer((namespace.host, namespace.port), store) as server:
+        print(
+            f"Serving {', '.join(store.names())} on "
+            f"http://{namespace.host}:{server.server_port}/",
+            file=sys.stderr,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
     return 0
 
 
@@ -168,6 +517,19 @@ def execute_check(namespace: Namespace) -> int:
     return _execute_check_internal(namespace, expected_version)
 
 
+def execute_compile(namespace: Namespace) -> int:
+    """
+    Main entry-point for the "compile" subcommand.
+
+    :param namespace: The argparse namespace.
+    :returns: A valid posix exit-code
+    """
+    LOG.info("Compiling %s", abspath(namespace.infile.name))
+    with core.replacing_output(namespace.outfile.strip(), "wb") as stream:
+        core.compile_changelog(namespace.infile, stream)
+    return 0
+
+
 def execute_autocheck(namespace: Namespace) -> int:
     """
     Main entry-point for the "autocheck" subcommand.
@@ -189,6 +551,7 @@ def _execute_check_internal(
         strict=namespace.strict,
         exact=namespace.exact,
         release_only=namespace.release_only,
+        cache=get_cache(namespace),
     )
     if check_output:
         LOG.info("No issues found.")
@@ -213,7 +576,7 @@ def main(args: Optional[Sequence[str]] = None) -> int:
     try:
         func: Callable[..., int] = namespace.func
         return func(namespace)
-    except ClprocException as exc:
+    except (ClprocException, OSError) as exc:
         LOG.debug(str(exc), exc_info=True)
         LOG.error("Error: %s", exc)
         return 1
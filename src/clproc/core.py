@@ -2,14 +2,28 @@
 Evrything related to parsing and rendering of the "changelog.in" file.
 """
 import logging
-from typing import List, TextIO
+import os
+import stat
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, TextIO
+from uuid import uuid4
 
 from packaging.version import Version
 
 from clproc import parser
-from clproc.model import ParsingIssueMessage
+from clproc.cache import ParseCache, cached_parse
+from clproc.model import (
+    Changelog,
+    FileMetadata,
+    ParsingIssueMessage,
+    ReleaseEntry,
+)
+from clproc.parser import compiled, mapped
 from clproc.parser.core import make_release_version
 from clproc.renderer import create
+from clproc.renderer.base import Renderer
+from clproc.reporting import default_parse_issue_handler
 
 LOG = logging.getLogger(__name__)
 
@@ -18,6 +32,7 @@ def make_changelog(
     fmt: str,
     infile: TextIO,
     num_releases: int = 0,
+    cache: Optional[ParseCache] = None,
 ) -> str:
     """
     Converts a ``changelog.in`` file into both a JSON and Mardown version of
@@ -25,7 +40,15 @@ def make_changelog(
     """
     LOG.info("Generating %s changelog from %r", fmt, infile.name)
 
-    data = parser.parse(infile, num_releases)
+    if cache:
+        data = cached_parse(infile, cache)
+        if num_releases:
+            data = replace(
+                data,
+                changelog=Changelog(data.changelog.releases[:num_releases]),
+            )
+    else:
+        data = parser.parse(infile, num_releases)
     renderer = create(fmt)
     if not renderer:
         LOG.error("No renderer found for %s", fmt)
@@ -34,35 +57,204 @@ def make_changelog(
     return renderer.render(data.changelog, data.file_metadata)
 
 
+def write_changelog(
+    fmt: str,
+    infile: TextIO,
+    outfile: TextIO,
+    num_releases: int = 0,
+    cache: Optional[ParseCache] = None,
+) -> None:
+    """
+    Converts a ``changelog.in`` file into the given format and writes it into
+    *outfile* one release at a time (see :py:func:`~.write_document`).
+    """
+    LOG.info("Writing %s changelog from %r", fmt, infile.name)
+
+    renderer = create(fmt)
+    if not renderer:
+        LOG.error("No renderer found for %s", fmt)
+        return
+
+    releases: Iterable[ReleaseEntry]
+    if cache:
+        data = cached_parse(infile, cache)
+        file_metadata = data.file_metadata
+        releases = data.changelog.releases
+        if num_releases:
+            releases = releases[:num_releases]
+    else:
+        file_metadata, releases = parser.iter_parse(infile, num_releases)
+    write_document(renderer, outfile, releases, file_metadata)
+
+
+def write_document(
+    renderer: Renderer,
+    outfile: TextIO,
+    releases: Iterable[ReleaseEntry],
+    file_metadata: FileMetadata,
+) -> None:
+    """
+    Write *releases* into *outfile* using *renderer*.
+
+    The output is terminated with a newline, unless the format already
+    terminates every line (see
+    :py:attr:`clproc.renderer.base.Renderer.TRAILING_NEWLINE`).
+    """
+    renderer.render_to(outfile, releases, file_metadata)
+    if renderer.TRAILING_NEWLINE:
+        outfile.write("\n")
+
+
+@contextmanager
+def replacing_output(
+    filename: str, mode: str = "w", encoding: Optional[str] = None
+) -> Iterator[Any]:
+    """
+    Open a temporary file next to *filename* for writing. It replaces
+    *filename* once the block completes.
+
+    If the block raises an exception, the temporary file is removed and an
+    existing *filename* is left untouched. Readers never see a partially
+    written file.
+
+    Symbolic links are followed, so the file they point to is replaced. The
+    file mode of an existing file is kept. Outputs which are not regular
+    files (f.ex. ``/dev/stdout`` or named pipes) are written directly.
+
+    :param filename: The file to replace
+    :param mode: Either ``"w"`` or ``"wb"``
+    :param encoding: The encoding of text-files (see :py:func:`open`)
+    """
+    try:
+        file_stat: Optional[os.stat_result] = os.stat(filename)
+    except FileNotFoundError:
+        file_stat = None
+    if file_stat is not None and not stat.S_ISREG(file_stat.st_mode):
+        with open(filename, mode, encoding=encoding) as stream:
+            yield stream
+        return
+    target = os.path.realpath(filename)
+    directory, name = os.path.split(target)
+    temp_name = os.path.join(directory, f".{name}.{uuid4().hex[:8]}.tmp")
+    try:
+        with open(
+            temp_name, mode.replace("w", "x"), encoding=encoding
+        ) as stream:
+            yield stream
+        if file_stat is not None:
+            os.chmod(temp_name, stat.S_IMODE(file_stat.st_mode))
+        os.replace(temp_name, target)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+
+
+def compile_changelog(infile: TextIO, outfile: BinaryIO) -> None:
+    """
+    Parse a ``changelog.in`` file (including its release-file) and write the
+    compiled result into *outfile* (see :py:mod:`clproc.parser.compiled`).
+
+    Parsing issues are reported and stored in the compiled file, so they are
+    reported again whenever it is loaded.
+    """
+    LOG.info("Compiling changelog from %r", infile.name)
+    parse_issues: List[ParsingIssueMessage] = []
+
+    def handle_issue(issue: ParsingIssueMessage) -> None:
+        parse_issues.append(issue)
+        default_parse_issue_handler(issue)
+
+    data = parser.parse(infile, parse_issue_handler=handle_issue)
+    outfile.write(compiled.dumps(data, parse_issues))
+
+
 def check_changelog(
     expected_version: Version,
     infile: TextIO,
     strict: bool = False,
     exact: bool = False,
     release_only: bool = False,
+    cache: Optional[ParseCache] = None,
 ) -> bool:
     """
     Return "True" if the changelog contains an entry for the given release
     version, "False" otherwise
+
+    Unless *strict* is set, only the version-column is inspected and reading
+    stops as soon as the version is found. If possible, the file is
+    memory-mapped and only the required columns are decoded (see
+    :py:mod:`clproc.parser.mapped`).
+
+    If a *cache* is given, the complete parse result is taken from (or stored
+    into) that cache instead.
     """
     parse_issues: List[ParsingIssueMessage] = []
-    data = parser.parse(infile, parse_issue_handler=parse_issues.append)
-    changelog = data.changelog
-    meta = data.file_metadata
-    if release_only:
-        expected_version = make_release_version(
-            expected_version, meta.release_nodes
+    versions: Iterable[Version]
+    buffer = None if cache or strict else mapped.map_file(infile)
+    try:
+        if cache:
+            data = cached_parse(infile, cache, parse_issues.append)
+            meta = data.file_metadata
+            versions = (
+                log.version
+                for release in data.changelog.releases
+                for log in release.logs
+            )
+        elif strict:
+            # Strict mode needs every issue in the file, including those only
+            # detected when fully parsing the log-entries.
+            meta, releases = parser.iter_parse(
+                infile, parse_issue_handler=parse_issues.append
+            )
+            versions = (
+                log.version for release in releases for log in release.logs
+            )
+        elif buffer is not None:
+            meta, versions = mapped.scan_versions(buffer, parse_issues.append)
+        else:
+            meta, versions = parser.scan_versions(
+                infile, parse_issue_handler=parse_issues.append
+            )
+        found = _find_version(
+            versions, expected_version, meta, strict, exact, release_only
         )
+    finally:
+        if buffer is not None:
+            buffer.close()
     for row in parse_issues:
         LOG.log(row.level if not strict else logging.ERROR, row.message)
     if strict and parse_issues:
         return False
-    if exact:
-        candidates = set()
-        for release in changelog.releases:
-            candidates.update([log.version for log in release.logs])
-    else:
-        candidates = {
-            release.version for release in changelog.releases if release.version
-        }
-    return expected_version in candidates
+    return found
+
+
+def _find_version(
+    versions: Iterable[Version],
+    expected_version: Version,
+    meta: FileMetadata,
+    strict: bool,
+    exact: bool,
+    release_only: bool,
+) -> bool:
+    """
+    Return whether *versions* contains *expected_version* (see
+    :py:func:`~.check_changelog`).
+    """
+    if release_only:
+        expected_version = make_release_version(
+            expected_version, meta.release_nodes
+        )
+    found = False
+    for version in versions:
+        candidate = (
+            version
+            if exact
+            else make_release_version(version, meta.release_nodes)
+        )
+        if candidate == expected_version:
+            found = True
+            # In strict mode, the whole file must be checked for issues
+            if not strict:
+                break
+    return found
@@ -2,25 +2,24 @@
 This module contains code to auto-discover the current version of the project.
 """
 import json
-from os.path import exists
+from os.path import basename, exists, join
 from typing import IO, Callable, Dict
 
-import tomli
-
 from clproc.exc import ClprocException
 
 
-def discover_version() -> str:
+def discover_version(directory: str = "") -> str:
     """
-    Discover the project version for the current working directory.
+    Discover the project version for *directory* (defaults to the current
+    working directory).
     """
-    filename = pkg_filename()
+    filename = pkg_filename(directory)
     handlers: Dict[str, Callable[[IO[bytes]], str]] = {
         "pyproject.toml": from_pyproject,
         "package.json": from_package_json,
     }
     with open(filename, mode="rb") as fptr:
-        return handlers[filename](fptr)
+        return handlers[basename(filename)](fptr)
 
 
 def from_pyproject(data: IO[bytes]) -> str:
@@ -29,6 +28,9 @@ def from_pyproject(data: IO[bytes]) -> str:
 
     :param data: A file handle to the metadata file.
     """
+    # pylint: disable=import-outside-toplevel
+    import tomli
+
     metadata = tomli.load(data)  # type: ignore
     backend = metadata["build-system"]["build-backend"]
     if backend != "setuptools.build_meta":
@@ -46,12 +48,16 @@ def from_package_json(data: IO[bytes]) -> str:
     return metadata["version"]  # type: ignore
 
 
-def pkg_filename() -> str:  # pragma: no cover
+def pkg_filename(directory: str = "") -> str:  # pragma: no cover
     """
-    Return the most appropriate package metadata filename for this project
+    Return the most appropriate package metadata filename for the project in
+    *directory* (defaults to the current working directory).
     """
     precedence = ["pyproject.toml", "package.json"]
     for item in precedence:
-        if exists(item):
-            return item
-    raise ClprocException("No valid project metadata file found!")
+        filename = join(directory, item)
+        if exists(filename):
+            return filename
+    raise ClprocException(
+        f"No valid project metadata file found in {directory or '.'!r}!"
+    )
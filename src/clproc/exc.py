@@ -21,3 +21,9 @@ class ReleaseFormatError(ClprocException):
     """
     Exception which is raised whenever soemthing is wrong in the release-file
     """
+
+
+class CompiledFormatError(ClprocException):
+    """
+    Exception which is raised when a compiled changelog cannot be loaded
+    """
@@ -1,10 +1,11 @@
 """
 This module contains the data-model used across clproc
 """
+import sys
 from dataclasses import dataclass, field
 from datetime import date
 from enum import Enum
-from typing import Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
 
 from packaging.version import Version
 
@@ -51,6 +52,13 @@ class ParsingIssueMessage(NamedTuple):
 TParseIssueHandler = Callable[[ParsingIssueMessage], None]
 "A type-alias for a callable that handles parsing issues"
 
+SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 11) else {}
+"""
+Additional dataclass options for the classes of which a changelog holds many
+instances. Without a per-instance ``__dict__`` they need considerably less
+memory. Frozen slotted dataclasses can only be pickled since Python 3.11.
+"""
+
 
 @dataclass(frozen=True)
 class FileMetadata:
@@ -86,7 +94,7 @@ class FileMetadata:
     """
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class ChangelogEntry:
     """
     A single entry of the changelog.
@@ -136,7 +144,7 @@ class ChangelogEntry:
     """
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class ReleaseEntry:
     """
     A "release" is a collection of log-entries and aggregates log-entries of
@@ -197,7 +205,7 @@ class ParseResult:
     "The metadata detected in the input file"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class ReleaseInformation:
     """
     This contains information pertaining to a release as a whole (as opposed to
@@ -212,7 +220,7 @@ class ReleaseInformation:
     "Additional release notes"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class IssueId:
     """
     An issue ID is combined of the ID itself and a source indicator where that
@@ -4,20 +4,33 @@ Entry point for changelog source parsing.
 This file provides :py:func:`~.parse` which delegates to the appropriate parser
 depending on detected changelog version.
 """
-from typing import TextIO
+from types import ModuleType
+from typing import Iterable, Iterator, Tuple
 
 from packaging.version import Version
 
 from clproc.exc import ClprocException
-from clproc.model import ParseResult, TParseIssueHandler
-from clproc.parser.core import extract_metadata
+from clproc.model import (
+    FileMetadata,
+    ParseResult,
+    ReleaseEntry,
+    TParseIssueHandler,
+)
+from clproc.parser import compiled
+from clproc.parser.core import extract_metadata, scan_metadata
 from clproc.reporting import default_parse_issue_handler
 
-from . import v1, v2
+__all__ = [
+    "extract_metadata",
+    "iter_parse",
+    "parse",
+    "scan_metadata",
+    "scan_versions",
+]
 
 
 def parse(
-    infile: TextIO,
+    infile: Iterable[str],
     num_releases: int = 0,
     parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
 ) -> ParseResult:
@@ -27,27 +40,95 @@ def parse(
 
     This delegates to the appropriate parser for the given file.
 
-    :param infile: The main changelog content
+    :param infile: The main changelog content. This is read only once, so
+        non-seekable inputs (like pipes) are supported. Compiled changelogs
+        (see :py:mod:`clproc.parser.compiled`) are loaded directly.
+    :param num_releases: When non-zero, only the first N releases are parsed.
+        Reading stops as soon as those releases are complete so the cost does
+        not depend on the size of the remaining file. Version 1.0 files are
+        the exception: their special "release" lines may appear anywhere, so
+        the remaining rows are still split (but not processed) to find them.
     :param parse_issue_handler: A callable which is called for every issue
         encountered during parsing. It gets a tuple with two elements: A
         severity (based on logging levels like ``logging.INFO``) and a message
     """
-    file_metadata = extract_metadata(infile, parse_issue_handler)
+    data = compiled.read_compiled(infile)
+    if data is not None:
+        return compiled.loads(data, num_releases, parse_issue_handler)
+    file_metadata, lines = scan_metadata(infile, parse_issue_handler)
+    implementation = _implementation(file_metadata)
+    changelog = implementation.parse(
+        lines, file_metadata, num_releases, parse_issue_handler
+    )
+    return ParseResult(changelog, file_metadata)
+
+
+def iter_parse(
+    infile: Iterable[str],
+    num_releases: int = 0,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Tuple[FileMetadata, Iterator[ReleaseEntry]]:
+    """
+    Lazy variant of :py:func:`~.parse`.
+
+    The file metadata is read immediately. The releases are parsed on demand
+    while iterating, so consumers which only need the first few releases
+    don't pay for the rest of the file. Version 1.0 files are the exception:
+    They are parsed completely before the first release is generated, as
+    their release-lines may affect any release.
+
+    See :py:func:`~.parse` for a description of the arguments.
+    """
+    data = compiled.read_compiled(infile)
+    if data is not None:
+        return compiled.iter_loads(data, num_releases, parse_issue_handler)
+    file_metadata, lines = scan_metadata(infile, parse_issue_handler)
+    implementation = _implementation(file_metadata)
+    releases = implementation.iter_parse(
+        lines, file_metadata, num_releases, parse_issue_handler
+    )
+    return file_metadata, releases
+
+
+def scan_versions(
+    infile: Iterable[str],
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Tuple[FileMetadata, Iterator[Version]]:
+    """
+    Return the file metadata and a lazy iterator over the versions of all
+    log-entries in *infile*.
+
+    This is considerably cheaper than :py:func:`~.iter_parse` as only the
+    mandatory columns are validated and no log-entries are constructed. It
+    is intended for lookups like "does the changelog contain version x.y?".
+    """
+    data = compiled.read_compiled(infile)
+    if data is not None:
+        return compiled.scan_versions(data, parse_issue_handler)
+    file_metadata, lines = scan_metadata(infile, parse_issue_handler)
+    implementation = _implementation(file_metadata)
+    versions = implementation.scan_versions(
+        lines, file_metadata, parse_issue_handler
+    )
+    return file_metadata, versions
+
+
+def _implementation(file_metadata: FileMetadata) -> ModuleType:
+    """
+    Return the parser module for the changelog version in *file_metadata*.
+
+    The modules are only imported when needed, as they pull in dependencies
+    which are only used by one version of the file-format.
+    """
+    # pylint: disable=import-outside-toplevel
     if file_metadata.version == Version("1.0"):
-        return ParseResult(
-            v1.parse(infile, file_metadata, num_releases, parse_issue_handler),
-            file_metadata,
-        )
+        from clproc.parser import v1
+
+        return v1
     if file_metadata.version == Version("2.0"):
-        return ParseResult(
-            v2.parse(
-                infile,
-                file_metadata,
-                num_releases,
-                parse_issue_handler,
-            ),
-            file_metadata,
-        )
+        from clproc.parser import v2
+
+        return v2
     raise ClprocException(
         f"Unsupported infile version: {file_metadata.version}"
     )
@@ -0,0 +1,419 @@
+"""
+This module contains a precompiled (binary) representation of parsed
+changelogs.
+
+Parsing a changelog means splitting, validating and converting every row of
+the CSV file (and reading its release-file). Changelogs which rarely change
+can be compiled once (``clproc <changelog> compile -o changelog.clpc``) and
+loaded a lot faster afterwards. The release-information is part of the
+compiled file, so it must be compiled again whenever the changelog or its
+release-file are modified.
+
+A compiled file starts with a header containing :py:data:`~.MAGIC`, the
+:py:data:`~.FORMAT_VERSION` and the size of the index. It is followed by
+sections which are each a :py:mod:`marshal` payload containing only tuples,
+strings and integers:
+
+* The index: The file metadata, the parsing issues reported while compiling,
+  a table of all version strings and the sizes of the other sections
+* The version column: The index of the version of each log-entry. Checking
+  for a version only needs this column.
+* Chunks of consecutive releases (see :py:data:`~.CHUNK_SIZE`). Each chunk
+  contains its own string- and issue-id-tables, one record per release and
+  one record per log-entry. Records reference strings and issue-ids by their
+  index in those tables.
+
+Each section is unpacked from the loaded data without copying it. Chunks are
+only unpacked when their releases are needed, so loading the first releases
+does not depend on the size of the changelog. Unlike :py:mod:`pickle`,
+unpacking a marshal payload never imports or calls anything.
+"""
+import marshal
+import struct
+from datetime import date
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from packaging.version import Version
+
+from clproc.exc import CompiledFormatError
+from clproc.model import (
+    Changelog,
+    ChangelogEntry,
+    ChangelogType,
+    FileMetadata,
+    IssueId,
+    ParseResult,
+    ParsingIssueMessage,
+    ReleaseEntry,
+    TParseIssueHandler,
+)
+from clproc.reporting import default_parse_issue_handler
+
+MAGIC = b"CLPC"
+"The first bytes of every compiled changelog"
+
+FORMAT_VERSION = 1
+"Bumped whenever the layout of compiled files changes"
+
+MARSHAL_VERSION = 4
+"The version of the marshal format (readable by all supported Pythons)"
+
+CHUNK_SIZE = 1024
+"The minimum number of log-entries in a chunk (except for the last one)"
+
+INTERNAL = 1
+"Flag of internal log-entries in the entry records"
+HIGHLIGHT = 2
+"Flag of highlighted log-entries in the entry records"
+
+_HEADER = struct.Struct("<4sHI")
+_NO_ISSUES: "frozenset[IssueId]" = frozenset()
+
+_Record = Tuple[Any, ...]
+
+T = TypeVar("T")
+
+
+class _Chunk:
+    """
+    Collects the tables and records of one chunk while compiling
+    """
+
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.issue_ids: Dict[Tuple[int, int], int] = {}
+        self.releases: List[_Record] = []
+        self.entries: List[_Record] = []
+
+    def string(self, value: str) -> int:
+        """
+        Return the index of *value* in the string-table
+        """
+        return self.strings.setdefault(value, len(self.strings))
+
+    def add(self, release: ReleaseEntry, version: int) -> None:
+        """
+        Add the records of *release* and its log-entries
+
+        :param version: The index of the release-version
+        """
+        release_date = release.release_date
+        self.releases.append(
+            (
+                version,
+                release_date.toordinal() if release_date else 0,
+                self.string(release.notes),
+                len(release.logs),
+            )
+        )
+        for log in release.logs:
+            issues = tuple(
+                self.issue_ids.setdefault(
+                    (issue.id, self.string(issue.source)), len(self.issue_ids)
+                )
+                for issue in log.issue_ids
+            )
+            self.entries.append(
+                (
+                    self.string(log.type_.value),
+                    self.string(log.subject),
+                    (INTERNAL if log.is_internal else 0)
+                    | (HIGHLIGHT if log.is_highlight else 0),
+                    issues,
+                    self.string(log.detail),
+                )
+            )
+
+    def dumps(self) -> bytes:
+        """
+        Return the marshalled chunk
+        """
+        return marshal.dumps(
+            (
+                tuple(self.strings),
+                tuple(self.issue_ids),
+                tuple(self.releases),
+                tuple(self.entries),
+            ),
+            MARSHAL_VERSION,
+        )
+
+
+def dumps(
+    result: ParseResult, parse_issues: Iterable[ParsingIssueMessage] = ()
+) -> bytes:
+    """
+    Return the compiled representation of *result*.
+
+    :param parse_issues: Issues reported while parsing. They are replayed
+        whenever the compiled changelog is loaded.
+    """
+    versions: Dict[str, int] = {}
+    version_column: List[int] = []
+    chunks: List[bytes] = []
+    chunk_sizes: List[Tuple[int, int]] = []
+    chunk = _Chunk()
+    for release in result.changelog.releases:
+        for log in release.logs:
+            version_column.append(
+                versions.setdefault(str(log.version), len(versions))
+            )
+        chunk.add(
+            release,
+            -1
+            if release.version is None
+            else versions.setdefault(str(release.version), len(versions)),
+        )
+        if len(chunk.entries) >= CHUNK_SIZE:
+            chunks.append(chunk.dumps())
+            chunk_sizes.append((len(chunks[-1]), len(chunk.entries)))
+            chunk = _Chunk()
+    if chunk.releases:
+        chunks.append(chunk.dumps())
+        chunk_sizes.append((len(chunks[-1]), len(chunk.entries)))
+
+    column = marshal.dumps(tuple(version_column), MARSHAL_VERSION)
+    metadata = result.file_metadata
+    index = marshal.dumps(
+        (
+            (
+                str(metadata.version),
+                metadata.release_nodes,
+                tuple(metadata.issue_url_templates.items()),
+                metadata.release_file,
+            ),
+            tuple((issue.level, issue.message) for issue in parse_issues),
+            tuple(versions),
+            len(column),
+            tuple(chunk_sizes),
+        ),
+        MARSHAL_VERSION,
+    )
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(index))
+    return b"".join([header, index, column] + chunks)
+
+
+class _Table(Generic[T]):
+    """
+    A table of values which are only created when they are first accessed.
+
+    Loading a part of a compiled changelog (f.ex. the first N releases or only
+    the versions) doesn't pay for creating the objects of the other parts.
+    """
+
+    def __init__(self, rows: Sequence[Any], factory: Callable[[Any], T]):
+        self.rows = rows
+        self.factory = factory
+        self.values: Dict[int, T] = {}
+
+    def __getitem__(self, index: int) -> T:
+        value = self.values.get(index)
+        if value is None:
+            value = self.values[index] = self.factory(self.rows[index])
+        return value
+
+
+class _Sections(NamedTuple):
+    """
+    The unpacked index of a compiled changelog and the location of the other
+    sections
+    """
+
+    file_metadata: FileMetadata
+    versions: _Table[Version]
+    data: memoryview
+    column: slice
+    "The location of the version column"
+    chunks: Tuple[Tuple[slice, int], ...]
+    "The location and the number of log-entries of each chunk"
+
+
+def _unmarshal(data: memoryview) -> Any:
+    try:
+        return marshal.loads(data)
+    except (EOFError, ValueError, TypeError) as exc:
+        raise CompiledFormatError(f"Corrupt compiled changelog: {exc}") from exc
+
+
+def _unpack(data: bytes, parse_issue_handler: TParseIssueHandler) -> _Sections:
+    """
+    Unpack the index of a compiled changelog and report the issues stored in
+    it.
+
+    :raises CompiledFormatError: If *data* is not a compiled changelog of the
+        supported :py:data:`~.FORMAT_VERSION`
+    """
+    if len(data) < _HEADER.size:
+        raise CompiledFormatError("Not a compiled changelog (too short)")
+    magic, format_version, index_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CompiledFormatError("Not a compiled changelog")
+    if format_version != FORMAT_VERSION:
+        raise CompiledFormatError(
+            f"Unsupported compiled format {format_version} (expected "
+            f"{FORMAT_VERSION}). Compile the changelog again."
+        )
+    view = memoryview(data)
+    offset = _HEADER.size + index_size
+    index = _unmarshal(view[_HEADER.size : offset])
+    try:
+        metadata, parse_issues, versions, column_size, chunk_sizes = index
+        changelog_version, release_nodes, templates, release_file = metadata
+    except (TypeError, ValueError) as exc:
+        raise CompiledFormatError(f"Corrupt compiled changelog: {exc}") from exc
+    column = slice(offset, offset + column_size)
+    offset += column_size
+    chunks = []
+    for size, num_entries in chunk_sizes:
+        chunks.append((slice(offset, offset + size), num_entries))
+        offset += size
+    if offset != len(data):
+        raise CompiledFormatError("Corrupt compiled changelog: Invalid size")
+    for level, message in parse_issues:
+        parse_issue_handler(ParsingIssueMessage(level, message))
+    file_metadata = FileMetadata(
+        Version(changelog_version), release_nodes, dict(templates), release_file
+    )
+    return _Sections(
+        file_metadata, _Table(versions, Version), view, column, tuple(chunks)
+    )
+
+
+def _issue_id(strings: Sequence[str], row: Tuple[int, int]) -> IssueId:
+    return IssueId(row[0], strings[row[1]])
+
+
+def _releases(sections: _Sections, num_releases: int) -> Iterator[ReleaseEntry]:
+    """
+    Generate the releases of *sections* (see :py:func:`~.iter_loads`)
+    """
+    if not sections.chunks:
+        return
+    versions = sections.versions
+    column = _unmarshal(sections.data[sections.column])
+    types = {item.value: item for item in ChangelogType}
+    remaining = num_releases or -1
+    first_entry = 0
+    for location, num_entries in sections.chunks:
+        strings, issue_rows, release_rows, entry_rows = _unmarshal(
+            sections.data[location]
+        )
+        issue_ids = _Table(issue_rows, partial(_issue_id, strings))
+        offset = 0
+        for version, ordinal, notes, size in release_rows:
+            logs = tuple(
+                [
+                    ChangelogEntry(
+                        versions[column[first_entry + index]],
+                        types[strings[type_]],
+                        strings[subject],
+                        bool(flags & INTERNAL),
+                        bool(flags & HIGHLIGHT),
+                        frozenset([issue_ids[item] for item in issues])
+                        if issues
+                        else _NO_ISSUES,
+                        strings[detail],
+                    )
+                    for index, (type_, subject, flags, issues, detail) in (
+                        enumerate(entry_rows[offset : offset + size], offset)
+                    )
+                ]
+            )
+            offset += size
+            yield ReleaseEntry(
+                None if version < 0 else versions[version],
+                date.fromordinal(ordinal) if ordinal else None,
+                strings[notes],
+                logs,
+            )
+            remaining -= 1
+            if not remaining:
+                return
+        first_entry += num_entries
+
+
+def loads(
+    data: bytes,
+    num_releases: int = 0,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> ParseResult:
+    """
+    Load a compiled changelog.
+
+    :param data: The content of the compiled file
+    :param num_releases: When non-zero, only the first N releases are loaded
+    :param parse_issue_handler: Receives the issues reported while compiling
+    :raises CompiledFormatError: If *data* is not a compiled changelog of the
+        supported :py:data:`~.FORMAT_VERSION`
+    """
+    sections = _unpack(data, parse_issue_handler)
+    releases = tuple(_releases(sections, num_releases))
+    return ParseResult(Changelog(releases), sections.file_metadata)
+
+
+def iter_loads(
+    data: bytes,
+    num_releases: int = 0,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Tuple[FileMetadata, Iterator[ReleaseEntry]]:
+    """
+    Lazy variant of :py:func:`~.loads`. The releases are created while
+    iterating.
+    """
+    sections = _unpack(data, parse_issue_handler)
+    return sections.file_metadata, _releases(sections, num_releases)
+
+
+def scan_versions(
+    data: bytes,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Tuple[FileMetadata, Iterator[Version]]:
+    """
+    Return the file metadata and a lazy iterator over the versions of all
+    log-entries in a compiled changelog. Only the version column is unpacked.
+
+    See :py:func:`clproc.parser.scan_versions`.
+    """
+    sections = _unpack(data, parse_issue_handler)
+    versions = sections.versions
+    column = _unmarshal(sections.data[sections.column])
+    return sections.file_metadata, (versions[index] for index in column)
+
+
+def read_compiled(infile: Iterable[str]) -> Optional[bytes]:
+    """
+    Return the content of *infile* if it is a compiled changelog and ``None``
+    otherwise.
+
+    Compiled changelogs are detected by peeking at the first bytes of the
+    binary buffer underlying a text-file (like the ones returned by
+    :py:func:`open` or :py:data:`sys.stdin`). Other inputs (f.ex.
+    :py:class:`io.StringIO` or lists of lines) are always treated as text.
+    Nothing is consumed from text-files which are not compiled.
+    """
+    buffer = getattr(infile, "buffer", None)
+    peek = getattr(buffer, "peek", None)
+    if peek is None:
+        return None
+    try:
+        head = peek(len(MAGIC))
+    except (OSError, ValueError):
+        return None
+    if head[: len(MAGIC)] != MAGIC:
+        return None
+    data: bytes = buffer.read()  # type: ignore
+    return data
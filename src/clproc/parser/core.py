@@ -5,16 +5,18 @@ template.
 It centralises important (externally advertised) application logic which both
 versions have in common.
 """
-import csv
 import logging
 import re
 from dataclasses import replace
+from functools import lru_cache
+from itertools import chain
 from typing import (
     Any,
     Callable,
     Dict,
     Generator,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
@@ -36,11 +38,31 @@ from clproc.model import (
     ReleaseInformation,
     TParseIssueHandler,
 )
+from clproc.parser.tokenizer import tokenize_rows
 from clproc.reporting import default_parse_issue_handler
 from clproc.textprocessing import get_multiline
 
 LOG = logging.getLogger(__name__)
 P_FILE_OPTION = re.compile(r"-\*- (?P<key>[a-z-]+):\s*?(?P<value>.*?)\s*?-\*-")
+VERSION_CACHE_SIZE = 4096
+"The maximum number of cached version objects"
+CHANGELOG_V2 = Version("2.0")
+METADATA_CHUNK_SIZE = 1 << 16
+"The number of characters read at once when searching a file for metadata"
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def parse_version(raw_version: str) -> Version:
+    """
+    Parse a version string into a :py:class:`~packaging.version.Version`.
+
+    Consecutive rows of a changelog nearly always share the same version. The
+    parsed instances are therefore cached and identical strings return the
+    identical (immutable) object.
+
+    :raises packaging.version.InvalidVersion: If the version is not valid
+    """
+    return Version(raw_version)
 
 
 def _make_url_template(value: str) -> Tuple[str, str]:
@@ -76,45 +98,60 @@ def parse_issue_ids(raw_text: str) -> Iterable[IssueId]:
             yield IssueId(int(lhs.strip()))
 
 
-def cleanup(row: List[str], changelog_version: Version) -> ChangelogEntry:
-    """
-    Cleanup values from the changelog rows and convert them to proper
-    Python types.
+def parse_mandatory_columns(row: List[str]) -> Tuple[Version, ChangelogType]:
     """
+    Validate the mandatory columns of a changelog row and return the parsed
+    version and type.
 
+    :param row: A row as generated by :py:func:`~.tokenize_rows` (with
+        surrounding whitespace already removed)
+    :raises ChangelogFormatError: If the row is not a valid log-entry
+    """
     if len(row) < 3:
         raise ChangelogFormatError(
             f"not enough fields/columns. Expected at least 3 but got {len(row)}"
         )
 
-    version_raw = row[0].strip()
+    version_raw = row[0]
     type_ = row[1]
-    subject = row[2]
-    issue_ids_raw = row[3] if len(row) >= 4 else ""
-    internal = row[4] if len(row) >= 5 else ""
-    highlight = row[5] if len(row) >= 6 else ""
-    # NOTE: Since version 2.0 of the changelog, the date-column (idx=6) is
-    # ignored
-    if changelog_version >= Version("2.0"):
-        detail = row[6] if len(row) >= 7 else ""
-    else:
-        detail = row[7] if len(row) >= 8 else ""
 
     try:
-        version = Version(version_raw)
+        version = parse_version(version_raw)
     except InvalidVersion as exc:
         raise ChangelogFormatError(f"Invalid version: {version_raw!r}") from exc
 
     try:
-        parsed_type = ChangelogType[type_.strip().upper()]
+        parsed_type = ChangelogType[type_.upper()]
     except KeyError as exc:
         raise ChangelogFormatError(
-            f"Unknown changelog type: {type_.strip()!r}. "
+            f"Unknown changelog type: {type_!r}. "
             f"Expected one of {[item.value for item in ChangelogType]}"
         ) from exc
-    is_highlight = bool(highlight.strip())
-    is_internal = bool(internal.strip())
-    subject = subject.strip()
+    return version, parsed_type
+
+
+def cleanup(row: List[str], changelog_version: Version) -> ChangelogEntry:
+    """
+    Cleanup values from the changelog rows and convert them to proper
+    Python types.
+
+    :param row: A row as generated by :py:func:`~.tokenize_rows` (with
+        surrounding whitespace already removed)
+    """
+    version, parsed_type = parse_mandatory_columns(row)
+    subject = row[2]
+    issue_ids_raw = row[3] if len(row) >= 4 else ""
+    internal = row[4] if len(row) >= 5 else ""
+    highlight = row[5] if len(row) >= 6 else ""
+    # NOTE: Since version 2.0 of the changelog, the date-column (idx=6) is
+    # ignored
+    if changelog_version >= CHANGELOG_V2:
+        detail = row[6] if len(row) >= 7 else ""
+    else:
+        detail = row[7] if len(row) >= 8 else ""
+
+    is_highlight = bool(highlight)
+    is_internal = bool(internal)
     issue_ids = frozenset(parse_issue_ids(issue_ids_raw))
     detail = get_multiline(detail)
 
@@ -143,35 +180,19 @@ def make_release_version(exact_version: Version, cutoff: int) -> Version:
     :param exact_version: The detailed version
     :param cutoff: How many elements to keep
     """
-    release_version = Version(
-        ".".join([str(x) for x in exact_version.release[:cutoff]])
-    )
-    return release_version
+    return _make_release_version(exact_version.release, cutoff)
 
 
-def propagate_first_col(
-    rows: Iterable[List[str]],
-) -> Generator[List[str], None, None]:
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _make_release_version(release: Tuple[int, ...], cutoff: int) -> Version:
     """
-    Iterate over items in *reader* and "fill in" missing valus in the first
-    column.
-
-    >>> list(propagate_first_col([["foo", "bar"], ["", "baz"]])
-    [["foo", "bar"], ["foo", "baz"]]
+    Cached implementation of :py:func:`~.make_release_version`
     """
-    last_seen_value = ""
-    for row in rows:
-        if len(row) >= 1 and row[0].strip() == "":
-            yield [last_seen_value] + row[1:]
-        elif len(row) >= 1 and row[0].strip() != "":
-            last_seen_value = row[0]
-            yield row
-        else:
-            yield row
+    return parse_version(".".join([str(x) for x in release[:cutoff]]))
 
 
 def changelogrows(
-    changelog_file: TextIO,
+    changelog_file: Iterable[str],
     changelog_version: Version,
     parsing_issue_handler: TParseIssueHandler,
 ) -> Generator[ChangelogEntry, None, None]:
@@ -182,34 +203,75 @@ def changelogrows(
     This takes care of cleanup and skipping wherever necessary. Each iteration
     on this generator contains a valid changelog item.
     """
-    reader = csv.reader(changelog_file, delimiter=";", quotechar='"')
-    for lineno, row in enumerate(propagate_first_col(reader), 1):
-        # skip empty lines
-        if not row:
+    for lineno, row in tokenize_rows(changelog_file):
+        try:
+            entry = cleanup(row, changelog_version)
+        except ChangelogFormatError as exc:
+            parsing_issue_handler(
+                ParsingIssueMessage(logging.WARNING, f"Line #{lineno}: {exc}")
+            )
             continue
 
-        # Allow a sharp as comment line
-        # (= whenever the value in the first column starts with a '#')
-        if row[0].strip().startswith("#"):
-            continue
+        yield entry
 
-        # Allow for unreleased entries
-        if row[0].strip() == "unreleased":
-            continue
 
+def scan_versions(
+    changelog_file: Iterable[str],
+    parsing_issue_handler: TParseIssueHandler,
+) -> Generator[Version, None, None]:
+    """
+    Read *changelog_file* and generate the version of each valid log-entry.
+
+    This only validates the mandatory columns and skips everything else
+    (details, issue-ids, ...). It is intended for quick lookups which don't
+    need the full :py:class:`~clproc.model.ChangelogEntry`.
+    """
+    for lineno, row in tokenize_rows(changelog_file):
         try:
-            entry = cleanup(row, changelog_version)
+            version, _ = parse_mandatory_columns(row)
         except ChangelogFormatError as exc:
             parsing_issue_handler(
                 ParsingIssueMessage(logging.WARNING, f"Line #{lineno}: {exc}")
             )
             continue
+        yield version
 
-        yield entry
+
+def group_releases(
+    entries: Iterable[ChangelogEntry],
+    release_nodes: int = 2,
+    num_releases: int = 0,
+) -> Generator[ReleaseEntry, None, None]:
+    """
+    Group consecutive changelog entries into releases.
+
+    A release is delimited by the version number and as defined by
+    ``release_nodes``. See :py:func:`~.aggregate_releases` for details.
+
+    When ``num_releases`` is non-zero, return up to this many releases. No
+    further entries are consumed once the last release is complete.
+    """
+    logs: List[ChangelogEntry] = []
+    last_seen_release: Optional[Version] = None
+    release_version: Optional[Version] = None
+    emitted_releases = 0
+    for entry in entries:
+        release_version = make_release_version(entry.version, release_nodes)
+        if last_seen_release and last_seen_release != release_version:
+            yield ReleaseEntry(last_seen_release, None, "", tuple(logs))
+            emitted_releases += 1
+            if emitted_releases == num_releases:
+                return
+            logs.clear()
+        logs.append(entry)
+        last_seen_release = release_version
+
+    if logs:
+        yield ReleaseEntry(last_seen_release, None, "", tuple(logs))
 
 
 def aggregate_releases(
-    changelog_file: TextIO,
+    changelog_file: Iterable[str],
     file_metadata: FileMetadata = FileMetadata(),
     num_releases: int = 0,
     parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
@@ -228,45 +290,158 @@ def aggregate_releases(
     ``release_nodes=2`` and part of release "1.2.3" when using
     ``release_nodes=3``.
     """
-    logs: List[ChangelogEntry] = []
-    last_seen_release: Optional[Version] = None
-    release_version: Optional[Version] = None
-    emitted_releases = 0
-    for entry in changelogrows(
+    entries = changelogrows(
         changelog_file, file_metadata.version, parse_issue_handler
-    ):
-        release_version = make_release_version(
-            entry.version, file_metadata.release_nodes
-        )
-        if last_seen_release and last_seen_release != release_version:
-            yield ReleaseEntry(last_seen_release, None, "", tuple(logs))
-            emitted_releases += 1
-            if emitted_releases == num_releases:
-                return
-            logs.clear()
-        logs.append(entry)
-        last_seen_release = release_version
+    )
+    yield from group_releases(
+        entries, file_metadata.release_nodes, num_releases
+    )
 
-    if logs:
-        yield ReleaseEntry(last_seen_release, None, "", tuple(logs))
 
+def _is_data_line(line: str) -> bool:
+    """
+    Return ``True`` if *line* is neither blank, nor a comment-line, nor the
+    optional row of column-names (``version;type;subject;...``).
 
-def extract_metadata(
-    infile: TextIO, parse_issue_handler: TParseIssueHandler
-) -> FileMetadata:
+    The first such line marks the end of the file header.
+    """
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#"):
+        return False
+    return stripped.split(";", 1)[0].strip().lower() != "version"
+
+
+def _tell(infile: Iterable[str]) -> Optional[int]:
+    """
+    Return the current position of *infile* or ``None`` if it is not a
+    seekable file.
+    """
+    try:
+        if infile.seekable():  # type: ignore
+            return infile.tell()  # type: ignore
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def _search_metadata(infile: TextIO, kwargs: Dict[str, Any]) -> None:
+    """
+    Read *infile* to the end and store the metadata found in it in *kwargs*.
+
+    The content is read in chunks of :py:data:`~.METADATA_CHUNK_SIZE`
+    characters. Only the lines of chunks containing ``-*-`` are inspected.
+    """
+    pending = ""
+    while True:
+        chunk = infile.read(METADATA_CHUNK_SIZE)
+        if not chunk:
+            break
+        # The last (incomplete) line continues in the next chunk
+        complete, _, pending = (pending + chunk).rpartition("\n")
+        if "-*-" in complete:
+            for line in complete.splitlines():
+                if "-*-" in line:
+                    _collect_metadata(line, kwargs)
+    if "-*-" in pending:
+        _collect_metadata(pending, kwargs)
+
+
+def _report_ignored_metadata(
+    lines: Iterator[str],
+    lineno: int,
+    parse_issue_handler: TParseIssueHandler,
+) -> Iterator[str]:
+    """
+    Pass through *lines*, reporting metadata which can no longer be applied.
+
+    *lineno* is the number of lines which were already consumed.
+    """
+    for line in lines:
+        lineno += 1
+        if "-*-" in line and P_FILE_OPTION.search(line):
+            parse_issue_handler(
+                ParsingIssueMessage(
+                    logging.WARNING,
+                    f"Line #{lineno}: Ignoring file metadata below the file "
+                    "header. Move it to the top of the file.",
+                )
+            )
+        yield line
+
+
+def scan_metadata(
+    infile: Iterable[str],
+    parse_issue_handler: TParseIssueHandler,
+    max_header_lines: int = 0,
+) -> Tuple[FileMetadata, Iterator[str]]:
     # pylint: disable=line-too-long
     """
-    Search *infile* for a line containing metadata following emacs style file
-    headers::
+    Search the header of *infile* for lines containing metadata following
+    emacs style file headers::
 
         -*- changelog-version: 1.0 -*-
         -*- field: value -*-
 
+    The header ends with the first line which is neither empty nor a comment
+    (the optional row of column-names is part of the header). When
+    *max_header_lines* is non-zero, the scan also stops after that many
+    lines.
+
+    Metadata may also appear further down in the file. Seekable files are
+    therefore searched completely and rewound. Non-seekable inputs (like
+    pipes) can only be read once: the metadata found below the header (or
+    below *max_header_lines*) is reported as ignored.
+
+    The returned iterator yields *all* lines of *infile* (including the
+    header-lines which have already been consumed).
+
+    :param infile: The lines of the changelog
+    :param parse_issue_handler: A callable receiving parsing-issues
+    :param max_header_lines: The maximum number of lines to inspect. Use 0
+        (default) to scan up to the first data line.
+    :return: The detected metadata, and an iterator over all lines of *infile*
+
     .. seealso:: https://www.gnu.org/software/emacs/manual/html_node/emacs/Specifying-File-Variables.html#Specifying-File-Variables
     """
     # pylint: enable=line-too-long
-    initial_position = infile.tell()
-    kwargs = {}
+    kwargs: Dict[str, Any] = {}
+    start = _tell(infile)
+    lines = iter(infile)
+    header: List[str] = []
+    for line in lines:
+        header.append(line)
+        if _is_data_line(line):
+            break
+        _collect_metadata(line, kwargs)
+        if max_header_lines and len(header) >= max_header_lines:
+            break
+    remaining: Iterator[str] = lines
+    if start is not None and not max_header_lines:
+        # Metadata is allowed anywhere in the file. Searching the complete
+        # file again gives the same result as searching the rest of it.
+        infile.seek(start)  # type: ignore
+        _search_metadata(infile, kwargs)  # type: ignore
+        infile.seek(start)  # type: ignore
+        header, remaining = [], iter(infile)
+    else:
+        remaining = _report_ignored_metadata(
+            lines, len(header), parse_issue_handler
+        )
+    if "version" not in kwargs:
+        clv_field = FileMetadataField.CHANGELOG_VERSION.value
+        parse_issue_handler(
+            ParsingIssueMessage(
+                logging.WARNING, f"'-*- {clv_field}: x.y -*-' is missing"
+            )
+        )
+    return FileMetadata(**kwargs), chain(header, remaining)
+
+
+def _collect_metadata(line: str, kwargs: Dict[str, Any]) -> None:
+    """
+    Store the metadata found in *line* in *kwargs* (the arguments for the
+    :py:class:`~clproc.model.FileMetadata` object).
+    """
     # Mapping from keyname as used in the file-content to the argument name of
     # the FileMetadata object. With a callable that converts the value from
     # string to the proper type.
@@ -279,30 +454,33 @@ def extract_metadata(
         ),
         FileMetadataField.RELEASE_FILE: ("release_file", str.strip),
     }
+    matches = dict(P_FILE_OPTION.findall(line))
+    for field, (meta_kwarg, converter) in keydef.items():
+        if field.value in matches:
+            # pylint: disable=not-callable
+            if field == FileMetadataField.ISSUE_URL_TEMPLATE:
+                container = kwargs.setdefault("issue_url_templates", {})
+                source, template = converter(matches[field.value])  # type: ignore # noqa
+                container[source] = template
+            else:
+                kwargs[meta_kwarg] = converter(matches[field.value])
+
+
+def extract_metadata(
+    infile: TextIO, parse_issue_handler: TParseIssueHandler
+) -> FileMetadata:
+    """
+    Search the header of *infile* for metadata and rewind the file afterwards.
+
+    This requires a seekable file. See :py:func:`~.scan_metadata` for details
+    and for a variant which works on non-seekable inputs.
+    """
+    initial_position = infile.tell()
     try:
-        for line in infile:
-            matches = dict(P_FILE_OPTION.findall(line))
-            if not matches:
-                continue
-            for field, (meta_kwarg, converter) in keydef.items():
-                if field.value in matches:
-                    # pylint: disable=not-callable
-                    if field == FileMetadataField.ISSUE_URL_TEMPLATE:
-                        container = kwargs.setdefault("issue_url_templates", {})
-                        source, template = converter(matches[field.value])  # type: ignore # noqa
-                        container[source] = template
-                    else:
-                        kwargs[meta_kwarg] = converter(matches[field.value])
+        file_metadata, _ = scan_metadata(infile, parse_issue_handler)
     finally:
         infile.seek(initial_position)
-    if "version" not in kwargs:
-        clv_field = FileMetadataField.CHANGELOG_VERSION.value
-        parse_issue_handler(
-            ParsingIssueMessage(
-                logging.WARNING, f"'-*- {clv_field}: x.y -*-' is missing"
-            )
-        )
-    return FileMetadata(**kwargs)
+    return file_metadata
 
 
 def with_release_information(
@@ -0,0 +1,262 @@
+"""
+Incremental parsing for changelogs which grow at the top.
+
+New entries are nearly always added to the top of a changelog file while the
+rest of the file stays untouched. This module remembers where each release
+starts (counted from the *end* of the file) together with a hash of its text.
+On the next run, releases at the end of the file whose text did not change are
+reused as-is and only the changed prefix of the file is parsed again.
+
+Only changelog version 2.0 is supported. Version 1.0 files may contain
+release-lines which affect other releases, and are always parsed completely.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass, replace
+from io import StringIO
+from os.path import join
+from typing import Iterator, List, Optional, Tuple
+
+from packaging.version import Version
+
+from clproc import parser
+from clproc.exc import ChangelogFormatError
+from clproc.model import (
+    Changelog,
+    ChangelogEntry,
+    FileMetadata,
+    ParseResult,
+    ParsingIssueMessage,
+    ReleaseEntry,
+    TParseIssueHandler,
+)
+from clproc.parser.core import (
+    CHANGELOG_V2,
+    cleanup,
+    make_release_version,
+    scan_metadata,
+    with_release_information,
+)
+from clproc.parser.tokenizer import tokenize_rows
+from clproc.parser.v2 import load_release_information
+from clproc.reporting import default_parse_issue_handler
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReleaseBlock:
+    """
+    The text-block of one release in the changelog file.
+
+    A block starts right after the last row of the previous release and ends
+    with the last row of the release (or at the end of the file).
+    """
+
+    offset: int
+    """
+    The distance (in characters) from the start of the block to the end of
+    the file
+    """
+    digest: str
+    "A hash of the text of this block"
+    num_rows: int
+    "The number of CSV rows in this block"
+    release: ReleaseEntry
+    "The parsed release (without information from the release-file)"
+    parse_issues: Tuple[Tuple[int, ParsingIssueMessage], ...] = tuple()
+    "Issues found in this block with their row-number relative to the block"
+
+
+@dataclass(frozen=True)
+class IncrementalState:
+    """
+    Everything needed to incrementally parse the next version of a file
+    """
+
+    file_metadata: FileMetadata
+    "The metadata of the parsed file"
+    blocks: Tuple[ReleaseBlock, ...]
+    "The releases of the file in file-order"
+
+
+class _CountingLines:
+    """
+    An iterator over lines which keeps track of the number of characters read
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, text: str) -> None:
+        self._lines = iter(text.splitlines(keepends=True))
+        self.position = 0
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        line = next(self._lines)
+        self.position += len(line)
+        return line
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+def reusable_blocks(
+    content: str, previous: IncrementalState
+) -> Tuple[ReleaseBlock, ...]:
+    """
+    Return the blocks at the end of *previous* which are unchanged in
+    *content*.
+
+    The most recent of the unchanged blocks is never returned: new rows at
+    the top of the file may belong to the same release and it must be parsed
+    again to merge them.
+    """
+    reused: List[ReleaseBlock] = []
+    end = len(content)
+    for block in reversed(previous.blocks):
+        start = len(content) - block.offset
+        if start < 0 or (start > 0 and content[start - 1] != "\n"):
+            break
+        if _digest(content[start:end]) != block.digest:
+            break
+        reused.append(block)
+        end = start
+    reused.reverse()
+    return tuple(reused[1:])
+
+
+def _parse_blocks(
+    text: str, changelog_version: Version, release_nodes: int, total: int
+) -> Tuple[List[ReleaseBlock], List[Tuple[int, ParsingIssueMessage]]]:
+    """
+    Parse *text* into release blocks.
+
+    :param text: The (prefix of the) changelog to parse
+    :param total: The length of the complete changelog (used to compute the
+        offsets)
+    :return: The blocks and the issues found in a file without any valid
+        log-entry (which therefore have no block to belong to).
+    """
+    lines = _CountingLines(text)
+    blocks: List[ReleaseBlock] = []
+    logs: List[ChangelogEntry] = []
+    issues: List[Tuple[int, ParsingIssueMessage]] = []
+    last_seen_release: Optional[Version] = None
+    block_start = 0
+    block_first_row = 0
+    row_end = 0
+    last_row = 0
+
+    def close_block(end: int) -> None:
+        blocks.append(
+            ReleaseBlock(
+                total - block_start,
+                _digest(text[block_start:end]),
+                last_row - block_first_row,
+                ReleaseEntry(last_seen_release, None, "", tuple(logs)),
+                tuple(issues),
+            )
+        )
+
+    for lineno, row in tokenize_rows(lines):
+        try:
+            entry = cleanup(row, changelog_version)
+        except ChangelogFormatError as exc:
+            issues.append(
+                (
+                    lineno - block_first_row,
+                    ParsingIssueMessage(logging.WARNING, str(exc)),
+                )
+            )
+            last_row, row_end = lineno, lines.position
+            continue
+        release_version = make_release_version(entry.version, release_nodes)
+        if last_seen_release and last_seen_release != release_version:
+            close_block(row_end)
+            logs.clear()
+            issues.clear()
+            block_start = row_end
+            block_first_row = last_row
+        logs.append(entry)
+        last_seen_release = release_version
+        last_row, row_end = lineno, lines.position
+
+    if logs:
+        close_block(len(text))
+        return blocks, []
+    return blocks, issues
+
+
+def parse_incremental(
+    content: str,
+    previous: Optional[IncrementalState] = None,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+    base_dir: str = "",
+) -> Tuple[ParseResult, Optional[IncrementalState]]:
+    """
+    Parse the complete changelog *content*, reusing unchanged releases from a
+    *previous* run.
+
+    :param content: The text of the changelog
+    :param previous: The state returned by the previous call for the same
+        file (if any).
+    :param parse_issue_handler: A callable receiving parsing-issues. Issues in
+        reused releases are reported again.
+    :param base_dir: The folder relative to which the release-file is read.
+        By default it is relative to the working directory.
+    :return: The parsed changelog and the state for the next call. The state
+        is ``None`` if the file cannot be parsed incrementally.
+    """
+    metadata_issues: List[ParsingIssueMessage] = []
+    file_metadata, _ = scan_metadata(StringIO(content), metadata_issues.append)
+    if file_metadata.version != CHANGELOG_V2:
+        result = parser.parse(StringIO(content), 0, parse_issue_handler)
+        return result, None
+    for issue in metadata_issues:
+        parse_issue_handler(issue)
+
+    reused: Tuple[ReleaseBlock, ...] = tuple()
+    if previous and previous.file_metadata == file_metadata:
+        reused = reusable_blocks(content, previous)
+    prefix_end = len(content) - reused[0].offset if reused else len(content)
+    LOG.debug(
+        "Reusing %d releases, parsing %d of %d characters",
+        len(reused),
+        prefix_end,
+        len(content),
+    )
+    blocks, orphan_issues = _parse_blocks(
+        content[:prefix_end],
+        file_metadata.version,
+        file_metadata.release_nodes,
+        len(content),
+    )
+    blocks.extend(reused)
+
+    block_row = 0
+    for block_issues, num_rows in [(orphan_issues, 0)] + [
+        (block.parse_issues, block.num_rows) for block in blocks
+    ]:
+        for relative_row, issue in block_issues:
+            lineno = block_row + relative_row
+            parse_issue_handler(
+                issue._replace(message=f"Line #{lineno}: {issue.message}")
+            )
+        block_row += num_rows
+
+    release_metadata = file_metadata
+    if base_dir and file_metadata.release_file:
+        release_metadata = replace(
+            file_metadata,
+            release_file=join(base_dir, file_metadata.release_file),
+        )
+    releases = with_release_information(
+        [block.release for block in blocks],
+        load_release_information(release_metadata),
+    )
+    result = ParseResult(Changelog(tuple(releases)), file_metadata)
+    return result, IncrementalState(file_metadata, tuple(blocks))
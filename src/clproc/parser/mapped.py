@@ -0,0 +1,239 @@
+"""
+This module contains a parse-path working on a memory-mapped changelog file.
+
+Reading a file in text-mode decodes every character of it. Lookups like
+"does the changelog contain version x.y?" only need the first two columns of
+each row. For very large changelogs, splitting the raw bytes and decoding only
+those values is considerably faster.
+
+The result is identical to the one of :py:func:`clproc.parser.scan_versions`.
+Files which cannot be mapped or which might be decoded differently by the
+text-layer (see :py:func:`~.map_file`) must use the text-based functions.
+"""
+import codecs
+import csv
+import logging
+import mmap
+import os
+import stat
+from io import UnsupportedOperation
+from typing import IO, Iterable, Iterator, Optional, Tuple
+
+from packaging.version import Version
+
+from clproc.exc import ChangelogFormatError, ClprocException
+from clproc.model import FileMetadata, ParsingIssueMessage, TParseIssueHandler
+from clproc.parser.compiled import MAGIC
+from clproc.parser.core import parse_mandatory_columns, scan_metadata
+from clproc.parser.tokenizer import Feed
+
+SUPPORTED_VERSIONS = (Version("1.0"), Version("2.0"))
+"The changelog-versions which can be read from a mapped file"
+
+BLOCK_SIZE = 1 << 16
+"The number of bytes read from the mapped file at once"
+
+MIN_MAP_SIZE = 1 << 23
+"""
+The minimum size (in bytes) of a file to map. Smaller files are read faster
+through the text-layer.
+"""
+
+
+def map_file(infile: IO[str]) -> Optional[mmap.mmap]:
+    """
+    Map the file underlying *infile* into memory.
+
+    ``None`` is returned if the file cannot (or should not) be processed on
+    the byte-level. This is the case for anything but a regular file (f.ex.
+    pipes or stdin), for files smaller than :py:data:`~.MIN_MAP_SIZE`, for
+    files which were already partially read, for encodings other than UTF-8
+    and for compiled changelogs (see :py:mod:`clproc.parser.compiled`).
+
+    Nothing but the first bytes of the file is read here. Line-endings are
+    converted while reading the lines (see :py:func:`~.iter_lines`).
+    """
+    try:
+        fileno = infile.fileno()
+        if infile.tell() != 0:
+            return None
+    except (AttributeError, OSError, UnsupportedOperation):
+        return None
+    encoding = getattr(infile, "encoding", None) or "utf8"
+    if codecs.lookup(encoding).name != "utf-8":
+        return None
+    file_stat = os.fstat(fileno)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    if file_stat.st_size == 0 or file_stat.st_size < MIN_MAP_SIZE:
+        return None
+    buffer = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    if buffer[: len(MAGIC)] == MAGIC:
+        buffer.close()
+        return None
+    return buffer
+
+
+def iter_lines(buffer: mmap.mmap) -> Iterator[bytes]:
+    """
+    Generate the lines of *buffer* (including their line-terminator) starting
+    at its current position.
+
+    The buffer is read in blocks of :py:data:`~.BLOCK_SIZE` bytes, which is
+    a lot faster than reading it line by line.
+
+    Like the text-layer (with universal newlines), ``\\r\\n`` and ``\\r`` are
+    converted to ``\\n``. Only blocks containing a carriage-return pay for
+    this conversion.
+    """
+    pending = b""
+    while True:
+        block = buffer.read(BLOCK_SIZE)
+        if not block:
+            break
+        data = pending + block
+        lines = data.splitlines(keepends=True)
+        # The last line may continue in the next block. This includes a
+        # trailing "\r" which may be followed by "\n".
+        pending = lines.pop()
+        if b"\r" in data:
+            lines = [_universal_newline(line) for line in lines]
+        yield from lines
+    if pending:
+        yield _universal_newline(pending)
+
+
+def _universal_newline(line: bytes) -> bytes:
+    if line[-2:] == b"\r\n":
+        return line[:-2] + b"\n"
+    if line[-1:] == b"\r":
+        return line[:-1] + b"\n"
+    return line
+
+
+def _decode(lines: Iterable[bytes]) -> Iterator[str]:
+    return (line.decode("utf8") for line in lines)
+
+
+class _MappedLines:
+    """
+    The decoded lines of a mapped file, seekable and readable like a
+    text-file so that :py:func:`~clproc.parser.core.scan_metadata` can search
+    and rewind it.
+    """
+
+    def __init__(self, buffer: mmap.mmap) -> None:
+        self.buffer = buffer
+        self.decoder = codecs.getincrementaldecoder("utf8")()
+
+    def __iter__(self) -> Iterator[str]:
+        return _decode(iter_lines(self.buffer))
+
+    def read(self, size: int = -1) -> str:
+        while True:
+            data = self.buffer.read(size)
+            text = self.decoder.decode(data, final=not data)
+            # An empty string means the end of the file (like for files)
+            if text or not data:
+                return text
+
+    @staticmethod
+    def seekable() -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.buffer.tell()
+
+    def seek(self, position: int) -> None:
+        self.buffer.seek(position)
+        self.decoder.reset()
+
+
+def tokenize_bytes(
+    lines: Iterable[bytes],
+) -> Iterator[Tuple[int, str, str, int]]:
+    """
+    The byte-level equivalent of
+    :py:func:`clproc.parser.tokenizer.tokenize_rows`.
+
+    Only the values of the first two columns are decoded (and stripped). They
+    are generated together with the row-number and the number of columns of
+    the row (counting at most 3). Missing values in the first column are
+    filled in from previous rows.
+
+    Rows containing quotes are decoded and split by a :py:func:`csv.reader`,
+    as quoted values may continue on the following lines.
+    """
+    lines = iter(lines)
+    feed = Feed(_decode(lines))
+    reader = csv.reader(feed, delimiter=";", quotechar='"')
+    last_seen_value = ""
+    lineno = 0
+    for line in lines:
+        lineno += 1
+        if b'"' in line or b"\0" in line:
+            # Quoted values may continue on the next lines
+            feed.pending = line.decode("utf8")
+            row = next(reader)
+            first = row[0].strip()
+            second = row[1].strip() if len(row) > 1 else ""
+            num_columns = min(len(row), 3)
+        elif line == b"\n":
+            continue
+        else:
+            values = line.split(b";", 2)
+            first = values[0].decode("utf8").strip()
+            second = values[1].decode("utf8").strip() if len(values) > 1 else ""
+            num_columns = len(values)
+        if first:
+            last_seen_value = first
+        else:
+            first = last_seen_value
+        # Comments and unreleased entries (see tokenize_rows)
+        if first[:1] == "#" or first == "unreleased":
+            continue
+        yield lineno, first, second, num_columns
+
+
+def _versions(
+    buffer: mmap.mmap,
+    skip_release_rows: bool,
+    parse_issue_handler: TParseIssueHandler,
+) -> Iterator[Version]:
+    rows = tokenize_bytes(iter_lines(buffer))
+    for lineno, first, type_, num_columns in rows:
+        if skip_release_rows and num_columns > 2 and type_.lower() == "release":
+            continue
+        # Only the number of columns matters for the remaining values
+        head = [first, type_, ""][:num_columns]
+        try:
+            version, _ = parse_mandatory_columns(head)
+        except ChangelogFormatError as exc:
+            parse_issue_handler(
+                ParsingIssueMessage(logging.WARNING, f"Line #{lineno}: {exc}")
+            )
+            continue
+        yield version
+
+
+def scan_versions(
+    buffer: mmap.mmap, parse_issue_handler: TParseIssueHandler
+) -> Tuple[FileMetadata, Iterator[Version]]:
+    """
+    Return the file metadata and a lazy iterator over the versions of all
+    log-entries in the mapped changelog *buffer*.
+
+    See :py:func:`clproc.parser.scan_versions`.
+    """
+    buffer.seek(0)
+    file_metadata, _ = scan_metadata(_MappedLines(buffer), parse_issue_handler)
+    if file_metadata.version not in SUPPORTED_VERSIONS:
+        raise ClprocException(
+            f"Unsupported infile version: {file_metadata.version}"
+        )
+    buffer.seek(0)
+    # Special "release" lines only exist in version 1.0
+    skip_release_rows = file_metadata.version == Version("1.0")
+    return file_metadata, _versions(
+        buffer, skip_release_rows, parse_issue_handler
+    )
@@ -0,0 +1,100 @@
+"""
+This module splits the lines of a changelog into rows.
+
+The changelog format is a CSV dialect using ``;`` as delimiter and ``"`` as
+quote character. Most lines of a changelog contain no quotes at all. Those
+lines are split with :py:meth:`str.split`, which is considerably faster than
+:py:func:`csv.reader`. Lines containing quotes (which may continue on the
+following lines) and lines with unusual characters are handed to a
+:py:func:`csv.reader`, so the result is identical to reading the whole file
+with :py:mod:`csv`.
+
+Values of the first columns are stripped while splitting, so the code
+processing the rows doesn't need to copy or strip them again.
+"""
+import csv
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+STRIPPED_COLUMNS = 6
+"""
+The number of leading columns from which surrounding whitespace is removed.
+The remaining columns (date and detail) are returned as they are written.
+"""
+
+
+class Feed:
+    """
+    An iterator over *lines* which can be told to return a given line first.
+
+    It is used as input of the :py:func:`csv.reader` for lines which can't
+    be split quickly. The reader only takes additional lines from *lines* if a
+    quoted value continues on the next line.
+    """
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self.lines = lines
+        self.pending: Optional[str] = None
+
+    def __iter__(self) -> "Feed":
+        return self
+
+    def __next__(self) -> str:
+        line = self.pending
+        if line is None:
+            return next(self.lines)
+        self.pending = None
+        return line
+
+
+def tokenize_rows(
+    changelog_file: Iterable[str],
+) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Split *changelog_file* into rows and generate the rows which may contain
+    data together with their row-number.
+
+    Empty rows, comments and "unreleased" rows are skipped and missing values
+    in the first column are filled in from the previous row. Whitespace
+    around the values of the first :py:data:`~.STRIPPED_COLUMNS` columns is
+    removed.
+
+    The rows are identical to the ones of ``csv.reader(changelog_file,
+    delimiter=";", quotechar='"')``. Row-numbers count CSV records, so a
+    quoted value spanning multiple lines is part of a single record. Each row
+    is generated before the next line is read from *changelog_file*.
+    """
+    feed = Feed(iter(changelog_file))
+    reader = csv.reader(feed, delimiter=";", quotechar='"')
+    strip = str.strip
+    last_seen_value = ""
+    lineno = 0
+    for line in feed:
+        lineno += 1
+        if '"' in line or "\r" in line or "\0" in line:
+            # Quoted values may continue on the next lines
+            feed.pending = line
+            row = next(reader)
+            if not row:  # An empty line with a "\r\n" terminator
+                continue
+            row[:STRIPPED_COLUMNS] = map(strip, row[:STRIPPED_COLUMNS])
+        elif line == "\n" or not line:
+            continue
+        else:
+            row = line.split(";")
+            if len(row) <= STRIPPED_COLUMNS:
+                # This also removes the line-terminator
+                row = list(map(strip, row))
+            else:
+                if row[-1][-1:] == "\n":
+                    row[-1] = row[-1][:-1]
+                row[:STRIPPED_COLUMNS] = map(strip, row[:STRIPPED_COLUMNS])
+        first = row[0]
+        if first:
+            last_seen_value = first
+        else:
+            row[0] = first = last_seen_value
+        # Allow a sharp as comment line (= whenever the value in the first
+        # column starts with a '#') and allow for unreleased entries
+        if first[:1] == "#" or first == "unreleased":
+            continue
+        yield lineno, row
@@ -1,17 +1,27 @@
 """
 Parser for the legacy (first version) changelog.in file
 """
-import csv
 import logging
 from dataclasses import replace
 from datetime import date
-from typing import Dict, List, TextIO
+from typing import (
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import dateutil.parser as dateutil
 from packaging.version import InvalidVersion, Version
 
+from clproc.exc import ChangelogFormatError
 from clproc.model import (
     Changelog,
+    ChangelogEntry,
     FileMetadata,
     ParsingIssueMessage,
     ReleaseEntry,
@@ -19,18 +29,21 @@ from clproc.model import (
     TParseIssueHandler,
 )
 from clproc.parser.core import (
-    aggregate_releases,
+    cleanup,
+    group_releases,
     make_release_version,
-    propagate_first_col,
+    parse_mandatory_columns,
+    parse_version,
     with_release_information,
 )
+from clproc.parser.tokenizer import tokenize_rows
 from clproc.reporting import default_parse_issue_handler
 
 LOG = logging.getLogger(__name__)
 
 
 def parse(
-    changelog_file: TextIO,
+    changelog_file: Iterable[str],
     file_metadata: FileMetadata = FileMetadata(),
     num_releases: int = 0,
     parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
@@ -101,29 +114,213 @@ def parse(
     changelog before the release is triggered.
     """
 
-    file_position = changelog_file.tell()
-    try:
-        release_information = extract_release_information(
-            changelog_file, parse_issue_handler
-        )
-    finally:
-        changelog_file.seek(file_position)
-
-    aggregated_releases = aggregate_releases(
-        changelog_file,
-        file_metadata,
-        num_releases,
-        parse_issue_handler,
+    release_information: Dict[Version, ReleaseInformation] = {}
+    rows = tokenize_rows(changelog_file)
+    entries = split_release_information(
+        _classify(rows, file_metadata, parse_issue_handler),
+        release_information,
     )
+    # Release lines may appear anywhere in the file, so the releases are
+    # aggregated before the collected information is attached.
+    aggregated_releases = list(
+        group_releases(entries, file_metadata.release_nodes, num_releases)
+    )
+    if num_releases:
+        # Aggregation stopped after the requested releases. The rest of the
+        # file is only searched for release lines, without processing the
+        # log-entries.
+        release_rows = (
+            _release_row(row, parse_issue_handler)
+            for _, row in rows
+            if _is_release_row(row)
+        )
+        # Only release rows are given, so this only collects the information
+        list(
+            split_release_information(
+                (item for item in release_rows if item is not None),
+                release_information,
+            )
+        )
     modified_releases: List[ReleaseEntry] = list(
         with_release_information(aggregated_releases, release_information)
     )
     return Changelog(tuple(modified_releases))
 
 
+def iter_parse(
+    changelog_file: Iterable[str],
+    file_metadata: FileMetadata = FileMetadata(),
+    num_releases: int = 0,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Iterator[ReleaseEntry]:
+    """
+    Variant of :py:func:`~.parse` returning an iterator over the releases.
+
+    The special "release" lines may appear anywhere in the file. A release is
+    therefore only complete once the rest of the file has been searched for
+    its release line, so the releases are only generated after parsing.
+    """
+    changelog = parse(
+        changelog_file, file_metadata, num_releases, parse_issue_handler
+    )
+    return iter(changelog.releases)
+
+
+def scan_versions(
+    changelog_file: Iterable[str],
+    file_metadata: FileMetadata = FileMetadata(),
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Generator[Version, None, None]:
+    """
+    Generate the versions of all log-entries without parsing them completely.
+
+    Special "release" lines are skipped.
+
+    :param file_metadata: Ignored in this version
+    """
+    del file_metadata  # pylint "hint"
+    for lineno, row in tokenize_rows(changelog_file):
+        if _is_release_row(row):
+            continue
+        try:
+            version, _ = parse_mandatory_columns(row)
+        except ChangelogFormatError as exc:
+            parse_issue_handler(
+                ParsingIssueMessage(logging.WARNING, f"Line #{lineno}: {exc}")
+            )
+            continue
+        yield version
+
+
+class ReleaseRow(NamedTuple):
+    """
+    Release information found in a single row of the changelog.
+
+    This is either a special "release" line (with notes) or the date-column of
+    a normal log-entry (without notes).
+    """
+
+    version: Version
+    "The version as written in the row"
+    date: date
+    "The date found in the row"
+    notes: Optional[str] = None
+    "The release-notes (only set for special release-lines)"
+
+
+def classify_rows(
+    changelog_file: Iterable[str],
+    file_metadata: FileMetadata = FileMetadata(),
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Generator[Union[ChangelogEntry, ReleaseRow], None, None]:
+    """
+    Read *changelog_file* once and generate both changelog entries and the
+    release information contained in the rows, in file order.
+
+    Special "release" lines only generate a :py:class:`~.ReleaseRow`. Normal
+    log-entries with a value in the date-column generate a
+    :py:class:`~.ReleaseRow` right before the entry itself.
+    """
+    yield from _classify(
+        tokenize_rows(changelog_file), file_metadata, parse_issue_handler
+    )
+
+
+def _classify(
+    rows: Iterable[Tuple[int, List[str]]],
+    file_metadata: FileMetadata,
+    parse_issue_handler: TParseIssueHandler,
+) -> Generator[Union[ChangelogEntry, ReleaseRow], None, None]:
+    """
+    Implementation of :py:func:`~.classify_rows` on the tokenized *rows*
+    """
+    for lineno, row in rows:
+        if _is_release_row(row):
+            release_row = _release_row(row, parse_issue_handler)
+            if release_row is not None:
+                yield release_row
+            continue
+
+        try:
+            entry = cleanup(row, file_metadata.version)
+        except ChangelogFormatError as exc:
+            parse_issue_handler(
+                ParsingIssueMessage(logging.WARNING, f"Line #{lineno}: {exc}")
+            )
+            continue
+        if len(row) > 7 and row[6].strip():
+            yield ReleaseRow(entry.version, _parse_date(row[6]))
+        yield entry
+
+
+def _is_release_row(row: List[str]) -> bool:
+    """
+    Return ``True`` if *row* is a special "release" line
+    """
+    return len(row) > 2 and row[1].strip().lower() == "release"
+
+
+def _release_row(
+    row: List[str], parse_issue_handler: TParseIssueHandler
+) -> Optional[ReleaseRow]:
+    """
+    Convert a special "release" line into a :py:class:`~.ReleaseRow`.
+    ``None`` is returned if the version is invalid.
+    """
+    try:
+        version = parse_version(row[0].strip())
+    except InvalidVersion as exc:
+        parse_issue_handler(ParsingIssueMessage(logging.DEBUG, str(exc)))
+        return None
+    notes = row[3].strip() if len(row) >= 4 else ""
+    return ReleaseRow(version, _parse_date(row[2]), notes)
+
+
+def _parse_date(value: str) -> date:
+    """
+    Parse a date-column, dropping any time-information.
+    """
+    # dateutil is slow to import and only needed for files with dates
+    # pylint: disable=import-outside-toplevel
+    import dateutil.parser as dateutil
+
+    return dateutil.parse(value.strip()).date()
+
+
+def split_release_information(
+    rows: Iterable[Union[ChangelogEntry, ReleaseRow]],
+    output: Dict[Version, ReleaseInformation],
+) -> Generator[ChangelogEntry, None, None]:
+    """
+    Generate the changelog entries from *rows* while collecting the release
+    information into *output* as it is encountered.
+
+    Because a release is only complete once the first entry of the next
+    release has been read, *output* contains all information of a release by
+    the time it is aggregated. This allows
+    :py:func:`~clproc.parser.core.with_release_information` to attach it
+    incrementally.
+    """
+    for item in rows:
+        if not isinstance(item, ReleaseRow):
+            yield item
+            continue
+        release_version = make_release_version(item.version, 2)
+        if item.notes is not None:
+            output[release_version] = ReleaseInformation(item.date, item.notes)
+        else:
+            entry = output.get(
+                release_version, ReleaseInformation(item.date, "")
+            )
+            entry = replace(entry, date=max(entry.date or date.min, item.date))
+            output[item.version] = entry
+
+
 def extract_release_information(
-    changelog_file: TextIO,
+    changelog_file: Iterable[str],
     parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+    num_releases: int = 0,
+    release_nodes: int = 2,
 ) -> Dict[Version, ReleaseInformation]:
     """
     Collect all special "release" lines
@@ -131,44 +328,20 @@ def extract_release_information(
     Scans through the changelog file to find all lines containing the special
     "release" line and returns it as a mapping from the release-version to the
     given information.
+
+    When ``num_releases`` is non-zero, scanning stops as soon as the file
+    leaves the first ``num_releases`` releases (as delimited by
+    ``release_nodes``).
     """
-    reader = csv.reader(changelog_file, delimiter=";", quotechar='"')
     output: Dict[Version, ReleaseInformation] = {}
-    for row in propagate_first_col(reader):
-        # NOTE: Some of this parsing (like skipping comment-lines, e.t.c.) is
-        # duplicated with the "clproc.core" module. This is caused by the
-        # special "release" rows in the changelog v1.0 format. The complexity
-        # should therefore *remaine here* and not pollute the rest of the code.
-        # If we wanted to deduplicate code, we need to handle the special
-        # "release" case in other areas where we don't really want it. So we
-        # accept this duplication.
-        if not row or row[0].strip().startswith("#"):
-            continue
-        version = row[0].strip()
-        try:
-            parsed_version = Version(version)
-        except InvalidVersion as exc:
-            parse_issue_handler(ParsingIssueMessage(logging.DEBUG, str(exc)))
-            continue
-        release_version = make_release_version(parsed_version, 2)
-        if row and len(row) > 2 and row[1].strip().lower() == "release":
-            date_string = row[2].strip()
-            parsed_date = dateutil.parse(date_string).date()
-            notes = ""
-            if len(row) >= 4:
-                notes = row[3].strip()
-            output[release_version] = ReleaseInformation(
-                parsed_date,
-                notes,
-            )
-        elif row and len(row) > 7 and row[6].strip():
-            date_string = row[6].strip()
-            parsed_date = dateutil.parse(date_string).date()
-            entry = output.get(
-                release_version, ReleaseInformation(parsed_date, "")
-            )
-            entry = replace(
-                entry, date=max(entry.date or date.min, parsed_date)
-            )
-            output[parsed_version] = entry
+    entries = split_release_information(
+        classify_rows(
+            changelog_file,
+            FileMetadata(release_nodes=release_nodes),
+            parse_issue_handler,
+        ),
+        output,
+    )
+    for _ in group_releases(entries, release_nodes, num_releases):
+        pass
     return output
@@ -4,10 +4,9 @@ Parser for the legacy (first version) changelog.in file
 import logging
 from datetime import date
 from os.path import exists
-from typing import Any, Dict, List, Optional, TextIO, Tuple
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
 
 from packaging.version import InvalidVersion, Version
-from yaml import safe_load
 
 from clproc.exc import ReleaseFormatError
 from clproc.model import (
@@ -17,14 +16,16 @@ from clproc.model import (
     ReleaseInformation,
     TParseIssueHandler,
 )
-from clproc.parser.core import aggregate_releases, with_release_information
+from clproc.parser.core import aggregate_releases, parse_version
+from clproc.parser.core import scan_versions as scan_versions_core
+from clproc.parser.core import with_release_information
 from clproc.reporting import default_parse_issue_handler
 
 LOG = logging.getLogger(__name__)
 
 
 def parse(
-    changelog_file: TextIO,
+    changelog_file: Iterable[str],
     file_metadata: FileMetadata,
     num_releases: int = 0,
     parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
@@ -79,13 +80,58 @@ def parse(
     line will be skipped. This allows developers to add entries into the
     changelog before the release is triggered.
     """
+    return Changelog(
+        tuple(
+            iter_parse(
+                changelog_file,
+                file_metadata,
+                num_releases,
+                parse_issue_handler,
+            )
+        )
+    )
+
+
+def iter_parse(
+    changelog_file: Iterable[str],
+    file_metadata: FileMetadata,
+    num_releases: int = 0,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Iterator[ReleaseEntry]:
+    """
+    Lazy variant of :py:func:`~.parse` generating the releases on demand.
+
+    The release-file is read immediately. The changelog itself is only read
+    while iterating over the result.
+    """
+    release_information = load_release_information(file_metadata)
+
+    aggregated_releases = aggregate_releases(
+        changelog_file,
+        file_metadata,
+        num_releases,
+        parse_issue_handler,
+    )
+    return iter(
+        with_release_information(aggregated_releases, release_information)
+    )
+
+
+def load_release_information(
+    file_metadata: FileMetadata,
+) -> Dict[Version, ReleaseInformation]:
+    """
+    Read the release-file referenced in *file_metadata* (if any).
+
+    A missing release-file is reported but does not raise an error.
+    """
     if file_metadata.release_file:
         if exists(file_metadata.release_file):
             with open(
                 file_metadata.release_file, encoding="utf8"
             ) as release_file:
                 release_information = extract_release_information(
-                    changelog_file, release_file
+                    [], release_file
                 )
         else:
             LOG.error(
@@ -96,21 +142,25 @@ def parse(
             release_information = {}
     else:
         release_information = {}
+    return release_information
 
-    aggregated_releases = aggregate_releases(
-        changelog_file,
-        file_metadata,
-        num_releases,
-        parse_issue_handler,
-    )
-    modified_releases: List[ReleaseEntry] = list(
-        with_release_information(aggregated_releases, release_information)
-    )
-    return Changelog(tuple(modified_releases))
+
+def scan_versions(
+    changelog_file: Iterable[str],
+    file_metadata: FileMetadata,
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> Iterator[Version]:
+    """
+    Generate the versions of all log-entries without parsing them completely.
+
+    :param file_metadata: Ignored in this version
+    """
+    del file_metadata  # pylint "hint"
+    return scan_versions_core(changelog_file, parse_issue_handler)
 
 
 def extract_release_information(
-    changelog_file: TextIO, release_file: Optional[TextIO]
+    changelog_file: Iterable[str], release_file: Optional[TextIO]
 ) -> Dict[Version, ReleaseInformation]:
     """
     Retrieve additional information for specific releases
@@ -123,6 +173,9 @@ def extract_release_information(
     if release_file is None:
         return release_information
 
+    # pylint: disable=import-outside-toplevel
+    from yaml import safe_load
+
     data = safe_load(release_file)
     try:
         release_notes_version = Version(data["meta"]["version"])
@@ -172,7 +225,7 @@ def parse_release_info(
             f"(invalid value {release_date!r} in {filename})"
         )
     try:
-        version = Version(version_str)
+        version = parse_version(version_str)
     except InvalidVersion as exc:
         raise ReleaseFormatError(
             f"Invalid version string in {filename}: "
@@ -4,22 +4,49 @@ This module contains the main entry-point for renderer instantiation.
 It contains the factory function :py:func:`~.create` to get a reference to a
 renderer.
 """
-from typing import ClassVar, List, Optional, Protocol, Type
+from typing import (
+    TYPE_CHECKING,
+    ClassVar,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    TextIO,
+    Type,
+)
 
-from clproc.model import Changelog, FileMetadata
+from clproc.model import Changelog, FileMetadata, ReleaseEntry
 
-from .json import JSONRenderer
-from .markdown import MarkdownRenderer
+if TYPE_CHECKING:  # pragma: no cover
+    from .fragments import FragmentCache
 
 
-def create(format_: str) -> Optional["Renderer"]:
+def create(format_: str, cache_fragments: bool = False) -> Optional["Renderer"]:
     """
     Instantiates the appropriate renderer
+
+    The renderer modules are imported on first use, so commands which don't
+    render anything don't pay for their import.
+
+    :param cache_fragments: Remember the output of each release to speed up
+        later calls of the same renderer instance (see
+        :py:class:`~clproc.renderer.fragments.FragmentCache`). Only useful if
+        the renderer is used more than once.
     """
-    renderers: List[Type[Renderer]] = [JSONRenderer, MarkdownRenderer]
+    # pylint: disable=import-outside-toplevel
+    from .fragments import FragmentCache
+    from .json import JSONRenderer
+    from .markdown import MarkdownRenderer
+    from .ndjson import NDJSONRenderer
+
+    renderers: List[Type[Renderer]] = [
+        JSONRenderer,
+        MarkdownRenderer,
+        NDJSONRenderer,
+    ]
     for cls in renderers:
         if cls.FORMAT == format_:
-            return cls()
+            return cls(FragmentCache() if cache_fragments else None)
     return None
 
 
@@ -33,11 +60,22 @@ class Renderer(Protocol):
         >>> from clproc.renderer import create
         >>> create('markdown')  # MarkdownRenderer
         >>> create('json')  # JSONRenderer
+        >>> create('ndjson')  # NDJSONRenderer
     """
 
     # pylint: disable=too-few-public-methods, unnecessary-ellipsis
 
     FORMAT: ClassVar[str]
+    TRAILING_NEWLINE: ClassVar[bool]
+    """
+    Whether a newline is added when writing a document into a file. Formats
+    which terminate each line themselves don't need one.
+    """
+
+    def __init__(
+        self, fragment_cache: Optional["FragmentCache"] = None
+    ) -> None:  # pragma: no cover
+        ...
 
     def render(
         self, changelog: Changelog, file_metadata: FileMetadata
@@ -46,3 +84,17 @@ class Renderer(Protocol):
         Render the given changelog and return the resulting data
         """
         ...
+
+    def render_to(
+        self,
+        stream: TextIO,
+        releases: Iterable[ReleaseEntry],
+        file_metadata: FileMetadata,
+    ) -> None:  # pragma: no cover
+        """
+        Render *releases* into *stream* one release at a time.
+
+        The releases are written in the order in which they are generated, so
+        only one release needs to be held in memory at any time.
+        """
+        ...
@@ -0,0 +1,101 @@
+"""
+This module contains a cache for the rendered fragments of releases.
+
+Most releases of a changelog never change once they are published. Renderers
+which are used more than once (f.ex. by the ``serve`` command or the watch
+mode of the ``render`` command) can remember the output of each release and
+only format new or modified releases.
+"""
+from typing import Callable, Dict, Hashable, Mapping, Tuple
+
+from clproc.model import ReleaseEntry
+
+_Known = Tuple[ReleaseEntry, Tuple[Hashable, ...], str]
+
+
+def release_key(
+    release: ReleaseEntry, templates: Mapping[str, str]
+) -> Tuple[Hashable, ...]:
+    """
+    Return a key which changes whenever the rendered output of *release*
+    would change.
+
+    Versions compare equal if they only differ in trailing zeroes (``1.0``
+    and ``1.0.0``). As the renderers write them as they were given, their
+    string values are part of the key.
+    """
+    return (
+        release,
+        str(release.version),
+        tuple(str(log.version) for log in release.logs),
+        tuple(sorted(templates.items())),
+    )
+
+
+class FragmentCache:
+    """
+    Remembers the rendered fragment of each release.
+
+    Only the fragments used by the current and the previous document are
+    kept, so the memory used by the cache is bounded by the size of the
+    rendered documents. Each document must be started with a call to
+    :py:meth:`~.begin`.
+
+    Computing the key of a release means hashing all its log-entries. The
+    incremental parser (:py:mod:`clproc.parser.incremental`) returns the same
+    objects for unchanged releases, so fragments are looked up by identity
+    first and the key is only computed for releases which were not seen yet.
+
+    The attributes ``hits`` and ``misses`` count the fragments which were
+    taken from the cache and the ones which had to be rendered.
+    """
+
+    def __init__(self) -> None:
+        self._previous: Dict[Hashable, str] = {}
+        self._current: Dict[Hashable, str] = {}
+        # id(release) -> (release, key, fragment). The release is stored to
+        # keep it alive, so its id cannot be reused by another object.
+        self._previous_ids: Dict[int, _Known] = {}
+        self._current_ids: Dict[int, _Known] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self) -> None:
+        """
+        Start a new document. Fragments which were not used since the
+        previous call are dropped.
+        """
+        self._previous, self._current = self._current, {}
+        self._previous_ids, self._current_ids = self._current_ids, {}
+
+    def fragment(
+        self,
+        release: ReleaseEntry,
+        templates: Mapping[str, str],
+        render: Callable[[], str],
+    ) -> str:
+        """
+        Return the fragment of *release*, calling *render* to create it if it
+        is not cached yet.
+
+        :param templates: The issue URL-templates used for rendering
+        """
+        templates_key = tuple(sorted(templates.items()))
+        known = self._current_ids.get(id(release)) or self._previous_ids.get(
+            id(release)
+        )
+        if known and known[0] is release and known[1][-1] == templates_key:
+            _, key, output = known
+            self.hits += 1
+        else:
+            key = release_key(release, templates)
+            cached = self._current.get(key, self._previous.get(key))
+            if cached is None:
+                self.misses += 1
+                output = render()
+            else:
+                self.hits += 1
+                output = cached
+        self._current_ids[id(release)] = (release, key, output)
+        self._current[key] = output
+        return output
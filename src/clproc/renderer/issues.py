@@ -0,0 +1,43 @@
+"""
+This module contains helpers shared by the renderers to link issues.
+"""
+from typing import Dict, List, Mapping, Optional
+
+from clproc.model import IssueId
+
+
+class IssueLinkFormatter:
+    """
+    Generates URLs for issue-ids from the issue URL-templates of a changelog.
+
+    The templates are split once on the ``{id}`` placeholder and every URL is
+    remembered, so an issue referenced by many log-entries is only formatted
+    once. A formatter should therefore be created once per rendered document.
+
+    :param templates: A mapping from the issue source to its URL-template (see
+        :py:attr:`clproc.model.FileMetadata.issue_url_templates`).
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, templates: Optional[Mapping[str, str]]) -> None:
+        self._templates: Dict[str, List[str]] = {
+            source: template.split("{id}")
+            for source, template in (templates or {}).items()
+            if template
+        }
+        self._urls: Dict[IssueId, str] = {}
+
+    def url(self, issue_id: IssueId) -> str:
+        """
+        Return the URL for *issue_id* or an empty string if there is no
+        template for its source.
+        """
+        try:
+            return self._urls[issue_id]
+        except KeyError:
+            pass
+        parts = self._templates.get(issue_id.source)
+        output = str(issue_id.id).join(parts) if parts else ""
+        self._urls[issue_id] = output
+        return output
@@ -4,7 +4,9 @@ object into a JSON document.
 """
 import json
 from datetime import date
-from typing import Any, ClassVar, Dict, Iterable, List
+from functools import partial
+from io import StringIO
+from typing import Any, ClassVar, Dict, Iterable, Optional, TextIO
 
 from packaging.version import Version
 
@@ -14,12 +16,26 @@ from clproc.model import (
     ChangelogType,
     FileMetadata,
     IssueId,
+    ReleaseEntry,
 )
+from clproc.renderer.fragments import FragmentCache
+from clproc.renderer.issues import IssueLinkFormatter
+
+ENCODER = json.JSONEncoder(check_circular=False)
+"""
+The encoder used by the renderer. The formatted data only contains builtin
+types and cannot be circular, so it is encoded entirely by the C-accelerated
+encoder of the standard library.
+"""
 
 
 class CustomEncoder(json.JSONEncoder):
     """
-    Custom JSON encoder for the JSONRenderer
+    Custom JSON encoder for the model types.
+
+    The renderer itself does not need this encoder anymore:
+    :py:func:`~.format_log` and :py:func:`~.format_release` only return
+    builtin types. It is kept for code which serialises model objects directly.
     """
 
     # pylint: disable=method-hidden
@@ -47,7 +63,9 @@ def _issue_id_sort_key(item: IssueId) -> Any:
 
 
 def format_issue_urls(
-    log: ChangelogEntry, templates: Dict[str, str]
+    log: ChangelogEntry,
+    templates: Dict[str, str],
+    formatter: Optional[IssueLinkFormatter] = None,
 ) -> Iterable[str]:
     """
     Extracts a list of URLs to issues from a changelog-entry.
@@ -55,19 +73,29 @@ def format_issue_urls(
     :param log: the changelog entry
     :param templates: A dictionary mapping an issue source to a string-template
         for the link. The value ``{id}`` is replaced with the issue-id.
+    :param formatter: A formatter to reuse between calls. If given,
+        *templates* is ignored.
     """
+    formatter = formatter or IssueLinkFormatter(templates)
     for issue_id in sorted(log.issue_ids, key=_issue_id_sort_key):
-        template = templates.get(issue_id.source, "")
-        yield template.replace("{id}", str(issue_id.id))
+        yield formatter.url(issue_id)
 
 
 def format_log(
-    log: ChangelogEntry, issue_url_templates: Dict[str, str]
+    log: ChangelogEntry,
+    issue_url_templates: Dict[str, str],
+    formatter: Optional[IssueLinkFormatter] = None,
 ) -> Dict[str, Any]:
     """
-    Convert a changelog-entry to a JSONifiable structure.
+    Convert a changelog-entry to a structure which only contains builtin
+    (JSON-serialisable) types.
+
+    :param formatter: A formatter to reuse between calls. If given,
+        *issue_url_templates* is ignored.
     """
+    formatter = formatter or IssueLinkFormatter(issue_url_templates)
     version = log.version or Version("0.0")
+    issue_ids = sorted(log.issue_ids, key=_issue_id_sort_key)
     return {
         "simple_version": (
             version.major,
@@ -76,24 +104,104 @@ def format_log(
         "full_version": version.release,
         "is_highlight": log.is_highlight,
         "is_internal": log.is_internal,
-        "issue_urls": list(format_issue_urls(log, issue_url_templates)),
+        "issue_urls": [formatter.url(item) for item in issue_ids],
         "detail": log.detail,
-        "issue_ids": [
-            item.id for item in sorted(log.issue_ids, key=_issue_id_sort_key)
-        ],
+        "issue_ids": [item.id for item in issue_ids],
         "subject": log.subject,
-        "type": log.type_,
+        "type": log.type_.value,
     }
 
 
+def format_release(
+    release: ReleaseEntry,
+    issue_url_templates: Dict[str, str],
+    formatter: Optional[IssueLinkFormatter] = None,
+) -> Dict[str, Any]:
+    """
+    Convert a release to a structure which only contains builtin
+    (JSON-serialisable) types.
+
+    :param formatter: A formatter to reuse between calls. If given,
+        *issue_url_templates* is ignored.
+    """
+    formatter = formatter or IssueLinkFormatter(issue_url_templates)
+    return {
+        "logs": [
+            format_log(log, issue_url_templates, formatter)
+            for log in release.logs
+        ],
+        "meta": {
+            "date": (
+                release.release_date.isoformat()
+                if release.release_date
+                else None
+            ),
+            "notes": release.notes,
+            "version": str(release.version) if release.version else None,
+        },
+    }
+
+
+def encode_release(
+    release: ReleaseEntry,
+    issue_url_templates: Dict[str, str],
+    formatter: Optional[IssueLinkFormatter] = None,
+) -> str:
+    """
+    Return *release* encoded as JSON object (see :py:func:`~.format_release`)
+    """
+    return ENCODER.encode(
+        format_release(release, issue_url_templates, formatter)
+    )
+
+
+def write_releases(
+    stream: TextIO,
+    releases: Iterable[ReleaseEntry],
+    file_metadata: FileMetadata,
+    separator: str,
+    fragment_cache: Optional[FragmentCache] = None,
+    terminator: str = "",
+) -> None:
+    """
+    Write each item of *releases* as JSON object into *stream*, separated by
+    *separator*.
+
+    :param fragment_cache: If given, previously encoded releases are taken
+        from it.
+    :param terminator: Written after each item
+    """
+    templates = file_metadata.issue_url_templates
+    formatter = IssueLinkFormatter(templates)
+    if fragment_cache is not None:
+        fragment_cache.begin()
+    for index, release in enumerate(releases):
+        if index:
+            stream.write(separator)
+        if fragment_cache is None:
+            stream.write(encode_release(release, templates, formatter))
+        else:
+            render = partial(encode_release, release, templates, formatter)
+            stream.write(fragment_cache.fragment(release, templates, render))
+        stream.write(terminator)
+
+
 class JSONRenderer:
     """
     Renders a changelog instance as JSON
+
+    :param fragment_cache: If given, each encoded release is remembered and
+        reused by later documents (see
+        :py:class:`~clproc.renderer.fragments.FragmentCache`).
     """
 
     # pylint: disable=too-few-public-methods
 
     FORMAT: ClassVar[str] = "json"
+    TRAILING_NEWLINE: ClassVar[bool] = True
+
+    def __init__(self, fragment_cache: Optional[FragmentCache] = None) -> None:
+        self.fragment_cache = fragment_cache
 
     def render(self, changelog: Changelog, file_metadata: FileMetadata) -> str:
         """
@@ -103,19 +211,24 @@ class JSONRenderer:
         :param issue_url_template: A simple string which is used to generate
             links to issues. The string ``{id}`` is replaced with the issue-id.
         """
-        output: List[Dict[str, Any]] = []
-        for release in changelog.releases:
-            logs: List[Dict[str, Any]] = []
-            for log in release.logs:
-                logs.append(format_log(log, file_metadata.issue_url_templates))
-            output.append(
-                {
-                    "logs": logs,
-                    "meta": {
-                        "date": release.release_date,
-                        "notes": release.notes,
-                        "version": release.version,
-                    },
-                }
-            )
-        return json.dumps(output, cls=CustomEncoder)
+        data = StringIO()
+        self.render_to(data, changelog.releases, file_metadata)
+        return data.getvalue()
+
+    def render_to(
+        self,
+        stream: TextIO,
+        releases: Iterable[ReleaseEntry],
+        file_metadata: FileMetadata,
+    ) -> None:
+        """
+        Write *releases* as JSON document into *stream*.
+
+        The document is identical to the one returned by :py:meth:`~.render`
+        but each release is encoded and written on its own.
+        """
+        stream.write("[")
+        write_releases(
+            stream, releases, file_metadata, ", ", self.fragment_cache
+        )
+        stream.write("]")
@@ -3,9 +3,11 @@ This module defines a renderer to convert a changelog object into a markdown
 document.
 """
 from datetime import date
+from functools import partial
 from io import StringIO
+from operator import attrgetter
 from textwrap import indent, wrap
-from typing import ClassVar, Dict, List, Optional, TextIO, Tuple
+from typing import ClassVar, Dict, Iterable, List, Optional, TextIO, Tuple
 
 from packaging.version import Version
 
@@ -16,6 +18,13 @@ from clproc.model import (
     FileMetadata,
     ReleaseEntry,
 )
+from clproc.renderer.fragments import FragmentCache
+from clproc.renderer.issues import IssueLinkFormatter
+
+TYPE_RANK: Dict[ChangelogType, int] = {
+    type_: rank for rank, type_ in enumerate(ChangelogType)
+}
+"The position of each section in a rendered release"
 
 
 def is_initial_release(version: Version) -> bool:
@@ -54,16 +63,23 @@ def format_detail(log: ChangelogEntry) -> str:
     return f"\n{indent(log.detail, '  ')}\n"
 
 
-def format_log(log: ChangelogEntry, issue_url_templates: Dict[str, str]) -> str:
+def format_log(
+    log: ChangelogEntry,
+    issue_url_templates: Dict[str, str],
+    formatter: Optional[IssueLinkFormatter] = None,
+) -> str:
     """
     Wraps a single log-entry to 70 characters and prefixes it as a bulleted
     list.
+
+    :param formatter: A formatter to reuse between calls. If given,
+        *issue_url_templates* is ignored.
     """
+    formatter = formatter or IssueLinkFormatter(issue_url_templates)
     issue_links: List[str] = []
-    for issue_id in sorted(log.issue_ids, key=lambda item: item.id):
-        issue_url_template = issue_url_templates.get(issue_id.source, "")
-        if issue_url_template:
-            url = issue_url_template.replace("{id}", str(issue_id.id))
+    for issue_id in sorted(log.issue_ids, key=attrgetter("id")):
+        url = formatter.url(issue_id)
+        if url:
             issue_links.append(f"[#{issue_id.id}]({url})")
         else:
             issue_links.append(f"#{issue_id.id}")
@@ -126,47 +142,121 @@ def section_header(log: ChangelogEntry, data: TextIO) -> None:
     print(f"### {log.type_.value.capitalize()}", file=data)
 
 
+def group_by_type(
+    logs: Iterable[ChangelogEntry],
+) -> List[Tuple[ChangelogType, List[ChangelogEntry]]]:
+    """
+    Group *logs* into one section per type, in the order in which the
+    sections are rendered.
+
+    Within a section, highlights come first, followed by the remaining entries
+    with the most recent version first.
+    """
+    sections: Dict[ChangelogType, List[ChangelogEntry]] = {}
+    for log in logs:
+        sections.setdefault(log.type_, []).append(log)
+    output = []
+    for type_ in sorted(sections, key=TYPE_RANK.__getitem__):
+        section = sections[type_]
+        section.sort(key=attrgetter("is_highlight", "version"))
+        section.reverse()
+        output.append((type_, section))
+    return output
+
+
+def render_release(
+    release: ReleaseEntry,
+    file_metadata: FileMetadata,
+    data: TextIO,
+    formatter: Optional[IssueLinkFormatter] = None,
+) -> None:
+    """
+    Print a release with all its log-entries into *data*
+
+    :param formatter: A formatter to reuse between calls. It is created from
+        *file_metadata* if missing.
+    """
+    templates = file_metadata.issue_url_templates
+    formatter = formatter or IssueLinkFormatter(templates)
+    release_header(release, data)
+    for _, logs in group_by_type(release.logs):
+        section_header(logs[0], data)
+        for log in logs:
+            print(format_log(log, templates, formatter), file=data)
+            if log.detail:
+                print(format_detail(log), file=data)
+
+
+def release_fragment(
+    release: ReleaseEntry,
+    file_metadata: FileMetadata,
+    formatter: Optional[IssueLinkFormatter] = None,
+) -> str:
+    """
+    Return the output of :py:func:`~.render_release` as string
+    """
+    data = StringIO()
+    render_release(release, file_metadata, data, formatter)
+    return data.getvalue()
+
+
 class MarkdownRenderer:
     """
     Renders a changelog instance as markdown
+
+    :param fragment_cache: If given, the output of each release is remembered
+        and reused by later documents (see
+        :py:class:`~clproc.renderer.fragments.FragmentCache`).
     """
 
     # pylint: disable=too-few-public-methods
 
     FORMAT: ClassVar[str] = "markdown"
+    TRAILING_NEWLINE: ClassVar[bool] = True
+
+    def __init__(self, fragment_cache: Optional[FragmentCache] = None) -> None:
+        self.fragment_cache = fragment_cache
 
     def render(self, changelog: Changelog, file_metadata: FileMetadata) -> str:
         """
         Convert *changelog* into a Markdown document.
 
+        The releases are written in the order of the changelog (see
+        :py:meth:`~.render_to`).
+
         :param changelog: The changelog object
         :param issue_url_template: A simple string which is used to generate
             links to issues. The string ``{id}`` is replaced with the issue-id.
         """
         data = StringIO()
-        releases = sorted(changelog.releases)
-
-        print("# Changelog\n", file=data)
-
-        for release in reversed(releases):
-            logs = sorted(
-                release.logs,
-                key=lambda x: (
-                    -list(ChangelogType).index(x.type_),
-                    x.is_highlight,
-                    x.version,
-                ),
-            )
-            release_header(release, data)
-            current_section = None
-            for log in reversed(logs):
-                if log.type_ != current_section:
-                    section_header(log, data)
-                    current_section = log.type_
-                print(
-                    format_log(log, file_metadata.issue_url_templates),
-                    file=data,
-                )
-                if log.detail:
-                    print(format_detail(log), file=data)
+        self.render_to(data, changelog.releases, file_metadata)
         return data.getvalue()
+
+    def render_to(
+        self,
+        stream: TextIO,
+        releases: Iterable[ReleaseEntry],
+        file_metadata: FileMetadata,
+    ) -> None:
+        """
+        Write *releases* as Markdown document into *stream*.
+
+        The releases are not sorted. They are written in the order in which
+        they are given, which for a changelog file means "newest first".
+        Sorting would need all releases in memory before writing the first
+        one.
+        """
+        templates = file_metadata.issue_url_templates
+        formatter = IssueLinkFormatter(templates)
+        print("# Changelog\n", file=stream)
+        cache = self.fragment_cache
+        if cache is None:
+            for release in releases:
+                render_release(release, file_metadata, stream, formatter)
+            return
+        cache.begin()
+        for release in releases:
+            render = partial(
+                release_fragment, release, file_metadata, formatter
+            )
+            stream.write(cache.fragment(release, templates, render))
@@ -0,0 +1,64 @@
+"""
+This module contains the definition of a renderer which transforms a changelog
+object into newline-delimited JSON (also known as "JSON Lines").
+"""
+from io import StringIO
+from typing import ClassVar, Iterable, Optional, TextIO
+
+from clproc.model import Changelog, FileMetadata, ReleaseEntry
+from clproc.renderer.fragments import FragmentCache
+from clproc.renderer.json import write_releases
+
+
+class NDJSONRenderer:
+    """
+    Renders a changelog instance as one JSON object per line.
+
+    Each line contains one release in the same structure as an item of the
+    document generated by :py:class:`~clproc.renderer.json.JSONRenderer`.
+
+    :param fragment_cache: If given, each encoded release is remembered and
+        reused by later documents (see
+        :py:class:`~clproc.renderer.fragments.FragmentCache`).
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    FORMAT: ClassVar[str] = "ndjson"
+    TRAILING_NEWLINE: ClassVar[bool] = False
+
+    def __init__(self, fragment_cache: Optional[FragmentCache] = None) -> None:
+        self.fragment_cache = fragment_cache
+
+    def render(self, changelog: Changelog, file_metadata: FileMetadata) -> str:
+        """
+        Convert *changelog* into a NDJSON document.
+
+        :param changelog: The changelog object
+        :param file_metadata: The metadata of the changelog file
+        """
+        data = StringIO()
+        self.render_to(data, changelog.releases, file_metadata)
+        return data.getvalue()
+
+    def render_to(
+        self,
+        stream: TextIO,
+        releases: Iterable[ReleaseEntry],
+        file_metadata: FileMetadata,
+    ) -> None:
+        """
+        Write each item of *releases* as one line into *stream* as soon as it
+        is generated.
+
+        Every line (including the last one) is terminated by a newline. A
+        changelog without releases results in an empty document.
+        """
+        write_releases(
+            stream,
+            releases,
+            file_metadata,
+            "",
+            self.fragment_cache,
+            terminator="\n",
+        )
@@ -0,0 +1,287 @@
+"""
+This module contains a small HTTP server which serves rendered changelogs.
+
+Parsed changelogs and rendered documents are kept in memory. Before answering
+a request, the modification times of the changelog and its release-file are
+compared with the ones of the cached data and only changed files are parsed
+again (see :py:mod:`clproc.parser.incremental`).
+
+Every response carries an ``ETag`` header. Clients sending it back in an
+``If-None-Match`` header receive a ``304 Not Modified`` response while the
+document is unchanged.
+"""
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from os.path import abspath, basename, dirname, join
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from clproc.exc import ClprocException
+from clproc.model import ParseResult
+from clproc.parser.core import scan_metadata
+from clproc.parser.incremental import IncrementalState, parse_incremental
+from clproc.renderer import create
+from clproc.renderer.base import Renderer
+from clproc.watch import TStamp, file_stamp
+
+LOG = logging.getLogger(__name__)
+
+FORMATS = {
+    "md": ("markdown", "text/markdown; charset=utf-8"),
+    "json": ("json", "application/json"),
+    "ndjson": ("ndjson", "application/x-ndjson"),
+}
+"Mapping from the URL extension to the output format and its content-type"
+
+
+@dataclass(frozen=True)
+class Document:
+    """
+    A rendered changelog
+    """
+
+    body: bytes
+    "The encoded document"
+    etag: str
+    "The (quoted) entity-tag of the document"
+    content_type: str
+    "The value of the Content-Type header"
+
+
+def _etag(body: bytes) -> str:
+    """
+    Return a (quoted) entity-tag for *body*
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class _Entry:
+    """
+    The cached data of one changelog file
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.stamp: Optional[TStamp] = None
+        self.result: Optional[ParseResult] = None
+        self.state: Optional[IncrementalState] = None
+        self.documents: Dict[str, Document] = {}
+        self.renderers: Dict[str, Renderer] = {}
+
+    def files(self) -> Tuple[str, ...]:
+        """
+        Return the files the parse result depends on
+        """
+        if self.result and self.result.file_metadata.release_file:
+            return (
+                self.filename,
+                self.release_file(self.result.file_metadata.release_file),
+            )
+        return (self.filename,)
+
+    def release_file(self, name: str) -> str:
+        """
+        Return the path of release-file *name*, which is relative to the
+        folder of the changelog
+        """
+        return join(dirname(self.filename), name)
+
+
+class ChangelogStore:
+    """
+    Keeps parsed and rendered changelogs in memory.
+
+    :param files: A mapping from a name (used in the URLs) to the filename of
+        a changelog.
+    """
+
+    def __init__(self, files: Mapping[str, str]) -> None:
+        self._entries = {name: _Entry(path) for name, path in files.items()}
+
+    def names(self) -> List[str]:
+        """
+        Return the names of all served changelogs
+        """
+        return sorted(self._entries)
+
+    def has_document(self, name: str, fmt: str) -> bool:
+        """
+        Return whether changelog *name* can be served as *fmt*
+        """
+        return name in self._entries and fmt in FORMATS
+
+    def parse_result(self, name: str) -> ParseResult:
+        """
+        Return the parsed changelog *name*, parsing it again if the file (or
+        its release-file) was modified.
+
+        :raises KeyError: If *name* is unknown
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            return self._refresh(entry)
+
+    def document(self, name: str, fmt: str) -> Document:
+        """
+        Return changelog *name* rendered as *fmt* (a key of
+        :py:data:`~.FORMATS`).
+
+        :raises KeyError: If either *name* or *fmt* are unknown
+        """
+        format_, content_type = FORMATS[fmt]
+        entry = self._entries[name]
+        with entry.lock:
+            result = self._refresh(entry)
+            document = entry.documents.get(fmt)
+            if document is None:
+                renderer = entry.renderers.get(fmt)
+                if renderer is None:
+                    # Each renderer keeps the output of unchanged releases
+                    renderer = create(format_, cache_fragments=True)
+                    if renderer is None:  # pragma: no cover
+                        raise KeyError(fmt)
+                    entry.renderers[fmt] = renderer
+                body = renderer.render(
+                    result.changelog, result.file_metadata
+                ).encode("utf8")
+                document = Document(body, _etag(body), content_type)
+                entry.documents[fmt] = document
+            return document
+
+    def _refresh(self, entry: _Entry) -> ParseResult:
+        """
+        Parse *entry* again if needed. The caller must hold the entry's lock.
+        """
+        if (
+            entry.result is not None
+            and file_stamp(*entry.files()) == entry.stamp
+        ):
+            return entry.result
+        LOG.info("Parsing %r", entry.filename)
+        # The files are stamped *before* they are read. If they are modified
+        # while parsing, the next request will parse them again.
+        stamp = file_stamp(entry.filename)
+        with open(entry.filename, encoding="utf8") as infile:
+            content = infile.read()
+        file_metadata, _ = scan_metadata(StringIO(content), lambda _: None)
+        if file_metadata.release_file:
+            stamp += file_stamp(entry.release_file(file_metadata.release_file))
+        result, state = parse_incremental(
+            content, entry.state, base_dir=dirname(entry.filename)
+        )
+        entry.result = result
+        entry.state = state
+        entry.stamp = stamp
+        entry.documents.clear()
+        return result
+
+
+class ChangelogRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the documents of a :py:class:`~.ChangelogStore`.
+
+    ``GET /`` returns a JSON list of all changelog names. ``GET /<name>.<ext>``
+    returns changelog ``<name>`` rendered in the format given by the extension
+    (see :py:data:`~.FORMATS`).
+    """
+
+    server: "ChangelogServer"
+
+    def do_HEAD(self) -> None:  # pylint: disable=invalid-name
+        """
+        Handle a HEAD request
+        """
+        self._respond(include_body=False)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Handle a GET request
+        """
+        self._respond(include_body=True)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # pylint: disable=redefined-builtin
+        LOG.info("%s - %s", self.address_string(), format % args)
+
+    def _respond(self, include_body: bool) -> None:
+        path = self.path.partition("?")[0].strip("/")
+        if not path:
+            body = json.dumps(self.server.store.names()).encode("utf8")
+            document = Document(body, _etag(body), "application/json")
+        else:
+            name, _, ext = path.rpartition(".")
+            if not self.server.store.has_document(name, ext):
+                self._send_error(HTTPStatus.NOT_FOUND, f"Not found: {path}")
+                return
+            try:
+                document = self.server.store.document(name, ext)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.exception("Unable to render %r", path)
+                self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(exc))
+                return
+
+        if_none_match = self.headers.get("If-None-Match", "")
+        if document.etag in {item.strip() for item in if_none_match.split(",")}:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", document.etag)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", document.content_type)
+        self.send_header("Content-Length", str(len(document.body)))
+        self.send_header("ETag", document.etag)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(document.body)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        body = message.encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class ChangelogServer(ThreadingHTTPServer):
+    """
+    A HTTP server serving the changelogs in *store*
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, server_address: Tuple[str, int], store: ChangelogStore
+    ) -> None:
+        super().__init__(server_address, ChangelogRequestHandler)
+        self.store = store
+
+
+def parse_file_args(values: List[str]) -> Dict[str, str]:
+    """
+    Convert ``NAME=PATH`` values into a mapping from name to path.
+
+    If the name is missing, the name of the folder containing the changelog
+    is used.
+
+    :raises ClprocException: If a name is used more than once
+    """
+    output: Dict[str, str] = {}
+    for value in values:
+        name, _, path = value.rpartition("=")
+        name = name or basename(dirname(abspath(path)))
+        if name in output:
+            raise ClprocException(
+                f"The name {name!r} is used for more than one changelog"
+            )
+        output[name] = path
+    return output
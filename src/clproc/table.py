@@ -0,0 +1,436 @@
+"""
+This module contains a columnar representation of a changelog.
+
+A :py:class:`~clproc.model.Changelog` holds one object per log-entry. This is
+convenient for rendering but slow for bulk queries over large changelogs. A
+:py:class:`~.ChangelogTable` stores each attribute of all log-entries in one
+compact column instead. Filters are computed on whole columns by builtin
+operations (like :py:meth:`bytes.translate`) and return a
+:py:class:`~.TableView` instead of a list of objects.
+
+Example::
+
+    with open("changelog.in", encoding="utf8") as infile:
+        table = parse_table(infile)
+    fixes = table.select(types=[ChangelogType.FIXED], internal=False)
+    print(len(fixes), fixes.subjects())
+
+Filter results are represented as *masks*: :py:class:`bytes` objects with one
+byte (``0`` or ``1``) per log-entry.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+from itertools import compress
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from packaging.version import Version
+
+from clproc.model import (
+    ChangelogEntry,
+    ChangelogType,
+    FileMetadata,
+    IssueId,
+    ReleaseEntry,
+    TParseIssueHandler,
+)
+from clproc.parser import iter_parse
+from clproc.reporting import default_parse_issue_handler
+
+TYPES = tuple(ChangelogType)
+"The type of each type-code (a type-code is the index in this tuple)"
+
+TYPE_CODES = {type_: code for code, type_ in enumerate(TYPES)}
+"The type-code of each type"
+
+INTERNAL = 1
+"The bit of the flags-column which is set for internal entries"
+
+HIGHLIGHT = 2
+"The bit of the flags-column which is set for highlights"
+
+
+def _translation(predicate: Callable[[int], bool]) -> bytes:
+    """
+    Create a table for :py:meth:`bytes.translate` which maps each byte to
+    ``1`` if *predicate* is true for it and to ``0`` otherwise.
+    """
+    return bytes(int(predicate(value)) for value in range(256))
+
+
+def mask_and(left: bytes, right: bytes) -> bytes:
+    """
+    Combine two masks of the same length. The result selects the entries
+    selected by both masks.
+    """
+    # With one byte per entry being either 0 or 1, a bitwise AND of the whole
+    # mask (as one large integer) is an AND of each entry.
+    value = int.from_bytes(left, "little") & int.from_bytes(right, "little")
+    return value.to_bytes(len(left), "little")
+
+
+class ChangelogTable:
+    """
+    Column-oriented storage of all log-entries of a changelog.
+
+    The entries are stored in the order of the changelog file (newest release
+    first). The entries of a release are stored next to each other.
+
+    Use :py:func:`~.parse_table` to create a table from a changelog file or
+    :py:meth:`~.from_releases` to convert already parsed releases.
+
+    :param file_metadata: The metadata of the changelog file
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, file_metadata: Optional[FileMetadata] = None) -> None:
+        self.file_metadata = file_metadata or FileMetadata()
+        self.releases: List[ReleaseEntry] = []
+        "The releases of the changelog (without log-entries)"
+        self.release_offsets = array("L", [0])
+        "The entries of release N are in the range [offsets[N], offsets[N+1])"
+        self.versions: List[Version] = []
+        "All distinct versions of the log-entries"
+        self.version_starts = array("L")
+        "The first entry of each run of entries with the same version"
+        self.version_codes = array("L")
+        "The index in :py:attr:`~.versions` of each run"
+        self.types = bytearray()
+        "The type-code (see :py:data:`~.TYPES`) of each entry"
+        self.flags = bytearray()
+        """
+        The :py:data:`~.INTERNAL` and :py:data:`~.HIGHLIGHT` bits of each
+        entry
+        """
+        self.strings: List[str] = []
+        "All distinct subjects, details and issue-sources"
+        self.subjects = array("L")
+        "The index in :py:attr:`~.strings` of the subject of each entry"
+        self.details = array("L")
+        "The index in :py:attr:`~.strings` of the detail of each entry"
+        self.issue_offsets = array("L", [0])
+        "The issue-ids of entry N are in the range [offsets[N], offsets[N+1])"
+        self.issue_numbers = array("q")
+        "The IDs of all issue-ids"
+        self.issue_sources = array("L")
+        "The index in :py:attr:`~.strings` of the source of each issue-id"
+        self._string_codes: Dict[str, int] = {}
+        self._version_codes: Dict[str, int] = {}
+        self._ranks: Optional[Tuple[List[Version], "array[int]", bool]] = None
+        self._negated_ranks: "array[int]" = array("l")
+
+    @classmethod
+    def from_releases(
+        cls,
+        releases: Iterable[ReleaseEntry],
+        file_metadata: Optional[FileMetadata] = None,
+    ) -> "ChangelogTable":
+        """
+        Create a table containing the log-entries of *releases*.
+
+        *releases* is consumed one release at a time, so it can be the
+        iterator returned by :py:func:`clproc.parser.iter_parse`.
+        """
+        output = cls(file_metadata)
+        for release in releases:
+            output.append_release(release)
+        return output
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def _intern(self, value: str) -> int:
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def append_release(self, release: ReleaseEntry) -> None:
+        """
+        Append *release* and all its log-entries to the table
+        """
+        self._ranks = None
+        self.releases.append(replace(release, logs=tuple()))
+        for log in release.logs:
+            self._append_log(log)
+        self.release_offsets.append(len(self.types))
+
+    def _append_log(self, log: ChangelogEntry) -> None:
+        index = len(self.types)
+        # Versions which compare equal may be written differently ("1.0" and
+        # "1.0.0"). The string keeps the spelling of the changelog.
+        version_key = str(log.version)
+        code = self._version_codes.get(version_key)
+        if code is None:
+            code = self._version_codes[version_key] = len(self.versions)
+            self.versions.append(log.version)
+        if not self.version_codes or self.version_codes[-1] != code:
+            self.version_starts.append(index)
+            self.version_codes.append(code)
+        self.types.append(TYPE_CODES[log.type_])
+        self.flags.append(
+            (INTERNAL if log.is_internal else 0)
+            | (HIGHLIGHT if log.is_highlight else 0)
+        )
+        self.subjects.append(self._intern(log.subject))
+        self.details.append(self._intern(log.detail))
+        for issue_id in sorted(
+            log.issue_ids, key=lambda item: (item.source, item.id)
+        ):
+            self.issue_numbers.append(issue_id.id)
+            self.issue_sources.append(self._intern(issue_id.source))
+        self.issue_offsets.append(len(self.issue_numbers))
+
+    def version(self, index: int) -> Version:
+        """
+        Return the version of entry *index*
+        """
+        run = bisect_right(self.version_starts, index) - 1
+        return self.versions[self.version_codes[run]]
+
+    def release(self, index: int) -> ReleaseEntry:
+        """
+        Return the release (without log-entries) containing entry *index*
+        """
+        return self.releases[bisect_right(self.release_offsets, index) - 1]
+
+    def entry(self, index: int) -> ChangelogEntry:
+        """
+        Create the :py:class:`~clproc.model.ChangelogEntry` of entry *index*
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self.issue_offsets[index], self.issue_offsets[index + 1]
+        strings = self.strings
+        return ChangelogEntry(
+            version=self.version(index),
+            type_=TYPES[self.types[index]],
+            subject=strings[self.subjects[index]],
+            is_internal=bool(self.flags[index] & INTERNAL),
+            is_highlight=bool(self.flags[index] & HIGHLIGHT),
+            issue_ids=frozenset(
+                IssueId(self.issue_numbers[item], strings[source])
+                for item, source in zip(
+                    range(start, end), self.issue_sources[start:end]
+                )
+            ),
+            detail=strings[self.details[index]],
+        )
+
+    def type_mask(self, types: Collection[ChangelogType]) -> bytes:
+        """
+        Return a mask selecting entries of one of *types*
+        """
+        codes = {TYPE_CODES[type_] for type_ in types}
+        return bytes(self.types.translate(_translation(codes.__contains__)))
+
+    def flag_mask(self, flag: int, value: bool = True) -> bytes:
+        """
+        Return a mask selecting entries where *flag* (:py:data:`~.INTERNAL`
+        or :py:data:`~.HIGHLIGHT`) is set (or not set if *value* is false).
+        """
+        table = _translation(lambda flags: bool(flags & flag) is value)
+        return bytes(self.flags.translate(table))
+
+    def version_mask(
+        self,
+        minimum: Optional[Version] = None,
+        maximum: Optional[Version] = None,
+    ) -> bytes:
+        """
+        Return a mask selecting entries with a version in the range
+        [*minimum*, *maximum*). A missing bound is not checked.
+        """
+        sorted_versions, run_ranks, descending = self._version_ranks()
+        # Versions with a rank in [low, high) are inside the range
+        low = 0 if minimum is None else bisect_left(sorted_versions, minimum)
+        high = (
+            len(sorted_versions)
+            if maximum is None
+            else bisect_left(sorted_versions, maximum)
+        )
+        num_runs = len(run_ranks)
+        if descending:
+            # The usual case: A changelog lists the newest version first, so
+            # the selected entries are next to each other.
+            negated = self._negated_ranks
+            first = bisect_right(negated, -high)
+            last = max(first, bisect_right(negated, -low))
+            start = (
+                self.version_starts[first] if first < num_runs else len(self)
+            )
+            end = self.version_starts[last] if last < num_runs else len(self)
+            return b"".join(
+                (
+                    b"\x00" * start,
+                    b"\x01" * (end - start),
+                    b"\x00" * (len(self) - end),
+                )
+            )
+        ends = self.version_starts[1:].tolist() + [len(self)]
+        return b"".join(
+            (b"\x01" if low <= rank < high else b"\x00") * (end - start)
+            for start, end, rank in zip(self.version_starts, ends, run_ranks)
+        )
+
+    def _version_ranks(self) -> Tuple[List[Version], "array[int]", bool]:
+        """
+        Return the sorted versions, the rank (the index in the sorted
+        versions) of each run and whether the ranks are in descending order.
+
+        The values are computed once and reset when entries are appended.
+        """
+        if self._ranks is None:
+            order = sorted(
+                range(len(self.versions)), key=self.versions.__getitem__
+            )
+            rank_of_code = [0] * len(order)
+            for rank, code in enumerate(order):
+                rank_of_code[code] = rank
+            run_ranks = array(
+                "L", [rank_of_code[code] for code in self.version_codes]
+            )
+            descending = all(
+                left >= right for left, right in zip(run_ranks, run_ranks[1:])
+            )
+            self._negated_ranks = array("l", [-rank for rank in run_ranks])
+            self._ranks = (
+                [self.versions[code] for code in order],
+                run_ranks,
+                descending,
+            )
+        return self._ranks
+
+    def all(self) -> "TableView":
+        """
+        Return a view selecting all entries
+        """
+        return TableView(self, b"\x01" * len(self))
+
+    def select(
+        self,
+        types: Optional[Collection[ChangelogType]] = None,
+        internal: Optional[bool] = None,
+        highlight: Optional[bool] = None,
+        min_version: Optional[Version] = None,
+        max_version: Optional[Version] = None,
+    ) -> "TableView":
+        """
+        Return a view on the entries matching all given criteria (see
+        :py:meth:`TableView.select`).
+        """
+        return self.all().select(
+            types, internal, highlight, min_version, max_version
+        )
+
+
+class TableView:
+    """
+    A selection of entries of a :py:class:`~.ChangelogTable`.
+
+    A view only holds a mask, the entries themselves are created on demand
+    when iterating over the view.
+
+    :param table: The table containing the entries
+    :param mask: One byte per entry of *table*. ``1`` selects the entry.
+    """
+
+    def __init__(self, table: ChangelogTable, mask: bytes) -> None:
+        if len(mask) != len(table):
+            raise ValueError(
+                f"The mask has {len(mask)} items but the table {len(table)}"
+            )
+        self.table = table
+        self.mask = mask
+
+    def __len__(self) -> int:
+        return self.mask.count(1)
+
+    def __iter__(self) -> Iterator[ChangelogEntry]:
+        return map(self.table.entry, self.indices())
+
+    def indices(self) -> Iterator[int]:
+        """
+        Return the index of each selected entry
+        """
+        return compress(range(len(self.mask)), self.mask)
+
+    def subjects(self) -> List[str]:
+        """
+        Return the subject of each selected entry
+        """
+        strings = self.table.strings
+        return [
+            strings[code] for code in compress(self.table.subjects, self.mask)
+        ]
+
+    def count_by_type(self) -> Dict[ChangelogType, int]:
+        """
+        Return the number of selected entries of each type
+        """
+        selected = bytes(compress(self.table.types, self.mask))
+        return {
+            type_: selected.count(code) for type_, code in TYPE_CODES.items()
+        }
+
+    def select(
+        self,
+        types: Optional[Collection[ChangelogType]] = None,
+        internal: Optional[bool] = None,
+        highlight: Optional[bool] = None,
+        min_version: Optional[Version] = None,
+        max_version: Optional[Version] = None,
+    ) -> "TableView":
+        """
+        Return a view on the entries of this view which match all given
+        criteria. Criteria which are ``None`` are not checked.
+
+        :param types: Only select entries of one of these types
+        :param internal: Select only internal (or only public) entries
+        :param highlight: Select only highlights (or only other entries)
+        :param min_version: The smallest version to select (inclusive)
+        :param max_version: The largest version to select (exclusive)
+        """
+        table = self.table
+        mask = self.mask
+        if types is not None:
+            mask = mask_and(mask, table.type_mask(types))
+        if internal is not None:
+            mask = mask_and(mask, table.flag_mask(INTERNAL, internal))
+        if highlight is not None:
+            mask = mask_and(mask, table.flag_mask(HIGHLIGHT, highlight))
+        if min_version is not None or max_version is not None:
+            mask = mask_and(mask, table.version_mask(min_version, max_version))
+        return TableView(table, mask)
+
+
+def parse_table(
+    infile: Iterable[str],
+    parse_issue_handler: TParseIssueHandler = default_parse_issue_handler,
+) -> ChangelogTable:
+    """
+    Parse a changelog file into a :py:class:`~.ChangelogTable`.
+
+    For version 2.0 changelogs, each release is added to the table as soon as
+    it is parsed, so the log-entry objects of the whole changelog are never
+    held in memory at the same time. Version 1.0 changelogs are parsed
+    completely first, as their release-lines may affect any release (see
+    :py:func:`clproc.parser.iter_parse`).
+
+    See :py:func:`clproc.parser.parse` for a description of the arguments.
+    """
+    file_metadata, releases = iter_parse(
+        infile, parse_issue_handler=parse_issue_handler
+    )
+    return ChangelogTable.from_releases(releases, file_metadata)
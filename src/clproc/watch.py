@@ -0,0 +1,181 @@
+"""
+This module contains the "watch" mode of the render command.
+
+The changelog and its release-file are polled for modifications. Once they
+are modified (and stay unmodified for a short while), the changelog is parsed
+again, reusing unchanged releases from the previous run (see
+:py:mod:`clproc.parser.incremental`).
+
+The output file is only replaced if the rendered document changed. It is
+replaced atomically, so readers never see a partially written file.
+"""
+import logging
+import os
+import time
+from io import StringIO
+from typing import Callable, Optional, Tuple
+
+from clproc.core import replacing_output, write_document
+from clproc.exc import ClprocException
+from clproc.parser.core import scan_metadata
+from clproc.parser.incremental import IncrementalState, parse_incremental
+from clproc.renderer import create
+
+LOG = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.5
+"The number of seconds between two checks for modifications"
+
+DEBOUNCE = 0.2
+"The number of seconds the files must stay unmodified before rendering"
+
+TStamp = Tuple[Tuple[int, int], ...]
+
+
+def file_stamp(*filenames: str) -> TStamp:
+    """
+    Return a value which changes whenever one of *filenames* is modified.
+
+    Missing files are part of the value, so creating them changes it as well.
+    """
+    output = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            output.append((-1, -1))
+        else:
+            output.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(output)
+
+
+def write_if_changed(filename: str, content: bytes) -> bool:
+    """
+    Atomically replace *filename* with *content* unless the file already
+    contains exactly those bytes (see :py:func:`clproc.core.replacing_output`).
+
+    :return: Whether the file was written
+    """
+    try:
+        with open(filename, "rb") as existing:
+            if existing.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    with replacing_output(filename, "wb") as fptr:
+        fptr.write(content)
+    return True
+
+
+class Watcher:
+    """
+    Renders *infile* into *outfile* whenever the changelog or its
+    release-file are modified.
+
+    :param infile: The filename of the changelog
+    :param outfile: The filename of the rendered document
+    :param fmt: The output format
+    :param num_releases: Only render the last N releases (0 = all)
+    :param debounce: See :py:data:`~.DEBOUNCE`
+    :param sleep: The function used to wait (replaceable for testing)
+    """
+
+    def __init__(
+        self,
+        infile: str,
+        outfile: str,
+        fmt: str,
+        num_releases: int = 0,
+        debounce: float = DEBOUNCE,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        renderer = create(fmt, cache_fragments=True)
+        if renderer is None:
+            raise ClprocException(f"No renderer found for {fmt}")
+        self.renderer = renderer
+        self.infile = infile
+        self.outfile = outfile
+        self.num_releases = num_releases
+        self.debounce = debounce
+        self.sleep = sleep
+        self._files: Tuple[str, ...] = (infile,)
+        self._stamp: Optional[TStamp] = None
+        self._state: Optional[IncrementalState] = None
+
+    def _wait_until_stable(self) -> TStamp:
+        """
+        Wait until the watched files are no longer modified and return their
+        stamp.
+        """
+        stamp = file_stamp(*self._files)
+        while True:
+            self.sleep(self.debounce)
+            current = file_stamp(*self._files)
+            if current == stamp:
+                return stamp
+            stamp = current
+
+    def poll(self) -> bool:
+        """
+        Render the changelog if it (or its release-file) was modified since
+        the last call.
+
+        :return: Whether the output file was written
+        """
+        stamp = file_stamp(*self._files)
+        if stamp == self._stamp:
+            return False
+        if self._stamp is not None:
+            stamp = self._wait_until_stable()
+        # Errors are only reported once per modification
+        self._stamp = stamp
+        with open(self.infile, encoding="utf8") as fptr:
+            content = fptr.read()
+        file_metadata, _ = scan_metadata(StringIO(content), lambda _: None)
+        files: Tuple[str, ...] = (self.infile,)
+        if file_metadata.release_file:
+            files += (file_metadata.release_file,)
+        if files != self._files:
+            # The release-file was not watched until now
+            self._files = files
+            self._stamp = file_stamp(*files)
+        result, self._state = parse_incremental(content, self._state)
+
+        releases = result.changelog.releases
+        if self.num_releases:
+            releases = releases[: self.num_releases]
+        output = StringIO()
+        write_document(self.renderer, output, releases, result.file_metadata)
+        written = write_if_changed(
+            self.outfile, output.getvalue().encode("utf8")
+        )
+        if written:
+            LOG.info("Updated %s", self.outfile)
+        else:
+            LOG.debug("%s is unchanged", self.outfile)
+        return written
+
+
+def watch(
+    watcher: Watcher,
+    interval: float = POLL_INTERVAL,
+    iterations: Optional[int] = None,
+) -> None:
+    """
+    Call :py:meth:`Watcher.poll` every *interval* seconds.
+
+    Errors in the changelog are reported and watching continues, as they are
+    expected while a file is being edited.
+
+    :param iterations: Stop after this many checks (``None`` = never)
+    """
+    count = 0
+    while iterations is None or count < iterations:
+        try:
+            watcher.poll()
+        except Exception as exc:  # pylint: disable=broad-except
+            LOG.debug("Unable to render %r", watcher.infile, exc_info=True)
+            LOG.error("Unable to render %s: %s", watcher.infile, exc)
+        count += 1
+        if iterations is None or count < iterations:
+            watcher.sleep(interval)
@@ -0,0 +1,34 @@
+"""
+The previous implementation of the tokenizer based on :py:func:`csv.reader`.
+
+It is shared by the compatibility tests of
+:py:func:`clproc.parser.tokenizer.tokenize_rows` and its benchmarks.
+"""
+import csv
+from typing import Iterable, Iterator, List, Tuple
+
+from clproc.parser.tokenizer import STRIPPED_COLUMNS
+
+
+def csv_tokenize_rows(lines: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+    """
+    The tokenizer as it was implemented with csv.reader. The values were
+    stripped when converting the rows into log-entries, which is included
+    here to compare the same amount of work.
+    """
+    reader = csv.reader(lines, delimiter=";", quotechar='"')
+    last_seen_value = ""
+    for lineno, row in enumerate(reader, 1):
+        if not row:
+            continue
+        # Missing values in the first column are filled in from previous rows
+        if row[0].strip():
+            last_seen_value = row[0]
+        else:
+            row = [last_seen_value] + row[1:]
+        if row[0].strip().startswith("#"):
+            continue
+        if row[0].strip() == "unreleased":
+            continue
+        stripped = [value.strip() for value in row[:STRIPPED_COLUMNS]]
+        yield lineno, stripped + row[STRIPPED_COLUMNS:]
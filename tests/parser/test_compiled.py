@@ -0,0 +1,210 @@
+"""
+Tests for the precompiled changelog format
+"""
+import logging
+from io import StringIO
+from pathlib import Path
+from textwrap import dedent
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from packaging.version import Version
+
+from clproc import core, parser
+from clproc.cache import ParseCache, cached_parse
+from clproc.exc import CompiledFormatError
+from clproc.model import ParseResult, ParsingIssueMessage
+from clproc.parser import compiled
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+V1_CONTENT = dedent(
+    """\
+    2.1.0 ; added   ; hello world   ; 12, foo:3 ; ; h ; 2018-01-01 ; detail
+    2.1.0 ; release ; 2018-01-02 ; Hello World
+    2.0.1 ; fixed   ; a fix         ;           ; i ;   ;            ;
+    2.0.0 ; release ; 2017-01-01
+          ; changed ; initial
+    1.0   ; doc     ;"multi
+      line";;;;;"more
+      details"
+    """
+)
+
+V2_CONTENT = dedent(
+    """\
+    # -*- changelog-version: 2.0 -*-
+    # -*- release-nodes: 3 -*-
+    # -*- issue-url-template: https://example.com/{id} -*-
+    # -*- issue-url-template: foo; https://example.com/foo/{id} -*-
+    1.2.3 ; added ; subject ; 1, foo:2 ; ; h ; the detail
+    1.2.2 ; fixed ; subject ; 1 ; i
+    1.2.0 ; invalid ; broken row
+    1.1.0 ; added ; old ;;;;"quoted ; detail"
+    """
+)
+
+
+def _parse(content: str) -> ParseResult:
+    return parser.parse(StringIO(content), parse_issue_handler=lambda _: None)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        V1_CONTENT,
+        V2_CONTENT,
+        (DATA_DIR / "changelog.in").read_text(encoding="utf8"),
+        "# -*- changelog-version: 2.0 -*-\n",
+    ],
+    ids=["v1", "v2", "data", "empty"],
+)
+def test_roundtrip(content: str) -> None:
+    """
+    Loading a compiled changelog should return the parsed changelog
+    """
+    expected = _parse(content)
+    data = compiled.dumps(expected)
+    assert data.startswith(compiled.MAGIC)
+    assert compiled.loads(data) == expected
+    _, releases = compiled.iter_loads(data)
+    assert tuple(releases) == expected.changelog.releases
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+@pytest.mark.parametrize("num_releases", [0, 1, 2, 3, 10])
+def test_num_releases(chunk_size: int, num_releases: int) -> None:
+    """
+    Loading only the first releases should work across chunk boundaries
+    """
+    content = (DATA_DIR / "changelog.in").read_text(encoding="utf8")
+    with patch.object(compiled, "CHUNK_SIZE", chunk_size):
+        data = compiled.dumps(_parse(content))
+    expected = parser.parse(
+        StringIO(content), num_releases, parse_issue_handler=lambda _: None
+    )
+    result = compiled.loads(data, num_releases)
+    assert result == expected
+    # Versions which only differ in trailing zeroes are kept as written
+    assert [str(release.version) for release in result.changelog.releases] == [
+        str(release.version) for release in expected.changelog.releases
+    ]
+
+
+@pytest.mark.parametrize("content", [V1_CONTENT, V2_CONTENT])
+def test_scan_versions(content: str) -> None:
+    """
+    The versions of a compiled changelog should be identical to the ones
+    found in the source
+    """
+    data = compiled.dumps(_parse(content))
+    meta, versions = compiled.scan_versions(data, lambda _: None)
+    expected_meta, expected = parser.scan_versions(
+        StringIO(content), lambda _: None
+    )
+    assert meta == expected_meta
+    assert list(versions) == list(expected)
+
+
+def test_parse_issues() -> None:
+    """
+    Issues found while compiling should be reported when loading
+    """
+    issues = [ParsingIssueMessage(logging.WARNING, "Line #7: broken")]
+    data = compiled.dumps(_parse(V2_CONTENT), issues)
+    reported: List[ParsingIssueMessage] = []
+    compiled.loads(data, parse_issue_handler=reported.append)
+    assert reported == issues
+
+
+@pytest.mark.parametrize(
+    "data, match",
+    [
+        (b"", "too short"),
+        (b"CLP", "too short"),
+        (b"FOOBAR" + bytes(10), "Not a compiled"),
+        (compiled.MAGIC + b"\xff\x00" + bytes(4), "Unsupported"),
+        (compiled.MAGIC + b"\x01\x00\x05\x00\x00\x00xxxxx", "Corrupt"),
+    ],
+)
+def test_invalid_data(data: bytes, match: str) -> None:
+    """
+    Loading something which is not a compiled changelog should raise an
+    appropriate error
+    """
+    with pytest.raises(CompiledFormatError, match=match):
+        compiled.loads(data)
+
+
+def test_truncated_data() -> None:
+    """
+    Truncated files should be detected
+    """
+    data = compiled.dumps(_parse(V2_CONTENT))
+    with pytest.raises(CompiledFormatError, match="Corrupt"):
+        compiled.loads(data[:-1])
+
+
+def test_read_compiled(tmp_path: Path) -> None:
+    """
+    Compiled files should be detected by their magic bytes. Nothing should be
+    consumed from plain changelogs.
+    """
+    source = tmp_path / "changelog.in"
+    source.write_text(V2_CONTENT, encoding="utf8")
+    target = tmp_path / "changelog.clpc"
+    target.write_bytes(compiled.dumps(_parse(V2_CONTENT)))
+
+    with open(source, encoding="utf8") as infile:
+        assert compiled.read_compiled(infile) is None
+        assert infile.read() == V2_CONTENT
+    with open(target, encoding="utf8") as infile:
+        assert compiled.read_compiled(infile) == target.read_bytes()
+    assert compiled.read_compiled(StringIO(V2_CONTENT)) is None
+    assert compiled.read_compiled(V2_CONTENT.splitlines()) is None
+
+
+def test_parse_compiled_file(tmp_path: Path) -> None:
+    """
+    The parser entry-points should load compiled files
+    """
+    expected = _parse(V2_CONTENT)
+    target = tmp_path / "changelog.clpc"
+    target.write_bytes(compiled.dumps(expected))
+
+    with open(target, encoding="utf8") as infile:
+        assert parser.parse(infile) == expected
+    with open(target, encoding="utf8") as infile:
+        meta, releases = parser.iter_parse(infile, num_releases=1)
+        assert meta == expected.file_metadata
+        assert tuple(releases) == expected.changelog.releases[:1]
+    with open(target, encoding="utf8") as infile:
+        _, versions = parser.scan_versions(infile)
+        assert Version("1.1") in list(versions)
+    with open(target, encoding="utf8") as infile:
+        cache = ParseCache(str(tmp_path / "cache"))
+        assert cached_parse(infile, cache) == expected
+
+
+def test_compile_changelog(tmp_path: Path) -> None:
+    """
+    Compiling a changelog should write a file which renders and checks like
+    the source
+    """
+    source = tmp_path / "changelog.in"
+    source.write_text(V2_CONTENT, encoding="utf8")
+    target = tmp_path / "changelog.clpc"
+    with open(source, encoding="utf8") as infile, open(target, "wb") as out:
+        core.compile_changelog(infile, out)
+
+    for fmt in ["markdown", "json"]:
+        with open(source, encoding="utf8") as infile:
+            expected = core.make_changelog(fmt, infile)
+        with open(target, encoding="utf8") as infile:
+            assert core.make_changelog(fmt, infile) == expected
+    with open(target, encoding="utf8") as infile:
+        assert core.check_changelog(Version("1.2.3"), infile, exact=True)
+    with open(target, encoding="utf8") as infile:
+        # The invalid row is stored in the compiled file
+        assert not core.check_changelog(Version("1.2.3"), infile, strict=True)
@@ -0,0 +1,92 @@
+from io import StringIO
+from textwrap import dedent
+from typing import List
+
+import pytest
+
+from clproc import parse
+from clproc.model import ParsingIssueMessage
+from clproc.parser.incremental import parse_incremental
+
+BASE = dedent(
+    """\
+    # -*- changelog-version: 2.0 -*-
+    1.3.0 ; added ; newest
+    1.2.1 ; fixed ; fix
+    1.2.0 ; added ; "multi
+      line"
+    # a comment
+    1.1.0 ; invalid ; broken
+          ; added   ; feature
+    1.0.0 ; added   ; initial
+    """
+)
+
+
+def _full_parse(content: str):
+    issues: List[ParsingIssueMessage] = []
+    result = parse(StringIO(content), parse_issue_handler=issues.append)
+    return result, issues
+
+
+@pytest.mark.parametrize(
+    "modified",
+    [
+        BASE,
+        BASE.replace("1.3.0 ; added ; newest\n", "1.4.0 ; added ; top\n", 1),
+        BASE.replace(
+            "1.3.0 ; added ; newest\n",
+            "1.4.0 ; added ; top\n1.3.0 ; added ; newest\n",
+        ),
+        BASE.replace(
+            "1.3.0 ; added ; newest\n",
+            "1.3.1 ; fixed ; same release\n1.3.0 ; added ; newest\n",
+        ),
+        BASE.replace("1.2.1 ; fixed ; fix\n", "1.2.1 ; fixed ; changed\n"),
+        BASE.replace("# a comment\n", ""),
+        BASE.replace("1.0.0 ; added   ; initial\n", ""),
+        BASE.replace(
+            "1.3.0 ; added ; newest\n",
+            "1.4.0 ; nope ; broken\n1.3.0 ; added ; newest\n",
+        ),
+        "# -*- changelog-version: 2.0 -*-\n",
+        "# -*- changelog-version: 2.0 -*-\n1.0 ; invalid ; foo\n",
+    ],
+)
+def test_incremental_matches_full_parse(modified: str) -> None:
+    """
+    An incremental parse should result in the same data (and issues) as a
+    full parse of the modified file.
+    """
+    _, state = parse_incremental(BASE, None, lambda _: None)
+    issues: List[ParsingIssueMessage] = []
+    result, _ = parse_incremental(modified, state, issues.append)
+    expected_result, expected_issues = _full_parse(modified)
+    assert result == expected_result
+    assert issues == expected_issues
+
+
+def test_incremental_reuses_releases() -> None:
+    """
+    Unchanged releases at the end of the file should not be parsed again
+    """
+    first, state = parse_incremental(BASE, None, lambda _: None)
+    modified = BASE.replace(
+        "1.3.0 ; added ; newest\n", "1.4.0 ; added ; top\n1.3.0 ; added ; x\n"
+    )
+    second, _ = parse_incremental(modified, state, lambda _: None)
+    old_releases = first.changelog.releases
+    new_releases = second.changelog.releases
+    assert len(new_releases) == len(old_releases) + 1
+    # The most recent unchanged release is always parsed again
+    for old, new in zip(old_releases[2:], new_releases[3:]):
+        assert old.logs is new.logs
+
+
+def test_incremental_v1() -> None:
+    """
+    Changelogs in version 1.0 cannot be parsed incrementally
+    """
+    result, state = parse_incremental("1.0 ; added ; foo\n")
+    assert state is None
+    assert len(result.changelog.releases) == 1
@@ -0,0 +1,239 @@
+"""
+Tests for scanning memory-mapped changelog files
+"""
+import os
+import random
+from io import StringIO
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple
+from unittest.mock import patch
+
+import pytest
+from packaging.version import Version
+
+from clproc import core, parser
+from clproc.model import FileMetadata, ParsingIssueMessage
+from clproc.parser import core as core_parser
+from clproc.parser import mapped
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+FRAGMENTS = [
+    ";",
+    ";",
+    " ",
+    '"',
+    '""',
+    "\n",
+    "\r",
+    "\r\n",
+    "\t",
+    "#",
+    "unreleased",
+    "1.0",
+    "2.1.3",
+    "added",
+    "release",
+    "foo bar",
+    "☆",
+]
+
+TResult = Tuple[List[str], List[ParsingIssueMessage], FileMetadata]
+
+
+@pytest.fixture(autouse=True)
+def map_small_files() -> Iterator[None]:
+    """
+    The test-files are far below the size from which files are mapped
+    """
+    with patch.object(mapped, "MIN_MAP_SIZE", 1):
+        yield
+
+
+def _scan_text(filename: Path) -> TResult:
+    issues: List[ParsingIssueMessage] = []
+    with open(filename, encoding="utf8") as infile:
+        meta, versions = parser.scan_versions(infile, issues.append)
+        return [str(version) for version in versions], issues, meta
+
+
+def _scan_mapped(filename: Path) -> TResult:
+    issues: List[ParsingIssueMessage] = []
+    with open(filename, encoding="utf8") as infile:
+        buffer = mapped.map_file(infile)
+        assert buffer is not None
+        with buffer:
+            meta, versions = mapped.scan_versions(buffer, issues.append)
+            return [str(version) for version in versions], issues, meta
+
+
+def _assert_compatible(filename: Path, content: str) -> None:
+    filename.write_bytes(content.encode("utf8"))
+    assert _scan_mapped(filename) == _scan_text(filename)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "1.0 ; added ; foo\n",
+        "1.0 ; added ; foo",
+        "1.0 ; added\n\n2.0 ; added ; foo\n",
+        "1.0 ; invalid ; foo\nfoo ; added ; bar\n1.0 ; added ; baz\n",
+        "; added ; no version yet\n1.0 ; added ; foo\n",
+        "# comment\n; added ; continues the comment\n",
+        "unreleased ; added ; foo\n ; fixed ; bar\n1.0 ; added ; baz\n",
+        '1.0 ; added ; "quoted ; value"\n; fixed ; bar\n',
+        '1.0 ; added ; foo ;;;;; "multi\n  line\n  detail"\n2.0;added;x\n',
+        '"1.0" ; "added" ; foo\n',
+        "1.0 ; added ; foo\x00bar\n",
+        "1.0 ; added ; ☆\n☆ ; added ; foo\n",
+        "# -*- changelog-version: 2.0 -*-\n1.0 ; release ; 2020-01-01\n",
+        "1.0 ; added ; foo\r\n\r\n2.0 ; added ; bar\r\n",
+        '1.0 ; added ; "multi\r\n line" \r2.0 ; added ; bar\r',
+        "1.0 ; release ; 2020-01-01\n# -*- changelog-version: 2.0 -*-\n",
+        "# -*- changelog-version: 2.0 -*-\n1.0;x\n# -*- release-nodes: 3 -*-",
+        "1.0 ; added ; ☆\n# -*- release-file: ☆.yaml -*-\n",
+    ],
+)
+def test_compatibility(tmp_path: Path, content: str) -> None:
+    """
+    Scanning a mapped file should generate the same versions and report the
+    same issues as scanning it through the text-layer.
+    """
+    _assert_compatible(tmp_path / "changelog.in", content)
+
+
+def test_changelog_file(tmp_path: Path) -> None:
+    """
+    The example changelog should be scanned identically
+    """
+    content = (DATA_DIR / "changelog.in").read_text(encoding="utf8")
+    _assert_compatible(tmp_path / "changelog.in", content)
+
+
+def test_v1_release_rows(tmp_path: Path) -> None:
+    """
+    Special "release" rows only exist in version 1.0 files and must be
+    skipped
+    """
+    content = (
+        "2.1.0 ; added   ; hello world\n"
+        "2.1.0 ; release ; 2018-01-01; Hello World\n"
+        "2.0.0 ; added   ; initial\n"
+    )
+    _assert_compatible(tmp_path / "changelog.in", content)
+    assert _scan_mapped(tmp_path / "changelog.in")[0] == ["2.1.0", "2.0.0"]
+
+
+def test_random_content(tmp_path: Path) -> None:
+    """
+    Random combinations of "interesting" fragments should be scanned
+    identically
+    """
+    rng = random.Random(0)
+    for _ in range(200):
+        size = rng.randint(1, 60)
+        content = "".join(rng.choices(FRAGMENTS, k=size))
+        if content.count('"') % 2:
+            # Unterminated quotes are reported by the csv module
+            content += '"'
+        _assert_compatible(tmp_path / "changelog.in", content)
+
+
+def test_block_boundaries(tmp_path: Path) -> None:
+    """
+    Lines crossing the boundary of the blocks read from the buffer should be
+    reassembled
+    """
+    content = "".join(
+        f'1.{minor} ; added ; "entry\n {minor}"\n' for minor in range(100)
+    )
+    with patch.object(mapped, "BLOCK_SIZE", 7):
+        _assert_compatible(tmp_path / "changelog.in", content)
+        for size in range(5, 9):
+            # Carriage-returns at the end of a block
+            with patch.object(mapped, "BLOCK_SIZE", size):
+                _assert_compatible(
+                    tmp_path / "changelog.in",
+                    content.replace("\n", "\r\n"),
+                )
+
+
+def test_metadata_chunks(tmp_path: Path) -> None:
+    """
+    Searching the mapped file for metadata should not depend on how it is
+    split into chunks (even inside multi-byte characters)
+    """
+    content = "1.0 ; added ; foo\n# -*- release-file: ☆☆.yaml -*-\n"
+    for size in range(1, 10):
+        with patch.object(core_parser, "METADATA_CHUNK_SIZE", size):
+            _assert_compatible(tmp_path / "changelog.in", content)
+
+
+@pytest.mark.parametrize(
+    "content, kwargs",
+    [
+        (b"", {}),
+        (b"1.0 ; added ; foo\n", {"encoding": "latin-1"}),
+    ],
+)
+def test_unmappable_files(tmp_path: Path, content: bytes, kwargs: Any) -> None:
+    """
+    Files which could be read differently through the text-layer should not
+    be mapped
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_bytes(content)
+    kwargs.setdefault("encoding", "utf8")
+    with open(filename, **kwargs) as infile:
+        assert mapped.map_file(infile) is None
+
+
+def test_small_files(tmp_path: Path) -> None:
+    """
+    Files below the size threshold are read faster through the text-layer
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_bytes(b"1.0 ; added ; foo\n")
+    with patch.object(mapped, "MIN_MAP_SIZE", 19), open(
+        filename, encoding="utf8"
+    ) as infile:
+        assert mapped.map_file(infile) is None
+    with patch.object(mapped, "MIN_MAP_SIZE", 18), open(
+        filename, encoding="utf8"
+    ) as infile:
+        buffer = mapped.map_file(infile)
+        assert buffer is not None
+        buffer.close()
+
+
+def test_unmappable_streams(tmp_path: Path) -> None:
+    """
+    Streams without a regular file and partially read files should not be
+    mapped
+    """
+    assert mapped.map_file(StringIO("1.0 ; added ; foo\n")) is None
+    read_fd, write_fd = os.pipe()
+    os.close(write_fd)
+    with open(read_fd, encoding="utf8") as pipe:
+        assert mapped.map_file(pipe) is None
+    filename = tmp_path / "changelog.in"
+    filename.write_text("1.0 ; added ; foo\n2.0 ; added ; bar\n")
+    with open(filename, encoding="utf8") as infile:
+        infile.readline()
+        assert mapped.map_file(infile) is None
+
+
+def test_check_changelog(tmp_path: Path) -> None:
+    """
+    Non-strict checks of regular files should scan the mapped file. Strict
+    checks need the fully parsed file.
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_text("# -*- changelog-version: 2.0 -*-\n1.2.3;added;x\n")
+    with patch.object(
+        mapped, "scan_versions", wraps=mapped.scan_versions
+    ) as scan, open(filename, encoding="utf8") as infile:
+        assert core.check_changelog(Version("1.2"), infile)
+        assert core.check_changelog(Version("1.2"), infile, strict=True)
+    scan.assert_called_once()
@@ -0,0 +1,119 @@
+"""
+Compatibility tests of the tokenizer with the previous implementation based on
+:py:func:`csv.reader`.
+"""
+import csv
+import random
+from io import StringIO
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from clproc.parser.tokenizer import tokenize_rows
+from tests.csv_tokenizer import csv_tokenize_rows
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+FRAGMENTS = [
+    ";",
+    ";",
+    " ",
+    "  ",
+    '"',
+    '""',
+    "\n",
+    "\r\n",
+    "\t",
+    "#",
+    "unreleased",
+    "1.0",
+    "2.1.3",
+    "added",
+    "fixed",
+    "foo bar",
+    "12,34",
+    "☆",
+]
+
+
+def _assert_compatible(content: str) -> None:
+    try:
+        expected = list(csv_tokenize_rows(StringIO(content, newline="")))
+    except csv.Error as exc:
+        with pytest.raises(csv.Error, match=str(exc)):
+            list(tokenize_rows(StringIO(content, newline="")))
+        return
+    assert list(tokenize_rows(StringIO(content, newline=""))) == expected
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "\n\n",
+        "   \n",
+        "1.0 ; added ; foo\n",
+        "1.0 ; added ; foo",
+        "1.0 ; added ; foo\r\n; fixed ; bar\r\n",
+        "; added ; no version yet\n1.0 ; added ; foo\n",
+        "# comment\n; added ; continues the comment\n",
+        "unreleased ; added ; foo\n ; fixed ; bar\n1.0 ; added ; baz\n",
+        '1.0 ; added ; "quoted ; value"\n; fixed ; bar\n',
+        '1.0 ; added ; foo ;;;;; "multi\n  line\n  detail"\n2.0;added;x\n',
+        '1.0 ; added ; a "b" c\n',
+        '1.0 ; added ; "a ""b"" c"\n',
+        "1.0 ; added ; foo ; 1 ; i ; h ; 2020-01-01 ; detail ; extra \n",
+        "1.0 ; added ; foo\x00bar\n",
+        "1.0 ; added ; foo\rbar\n",
+        '1.0 ; added ; "unterminated\n',
+    ],
+)
+def test_compatibility(content: str) -> None:
+    """
+    The tokenizer should generate exactly the same rows (and row-numbers) as
+    the csv module.
+    """
+    _assert_compatible(content)
+
+
+def test_changelog_file() -> None:
+    """
+    The example changelog should be tokenized identically
+    """
+    _assert_compatible((DATA_DIR / "changelog.in").read_text(encoding="utf8"))
+
+
+def test_random_content() -> None:
+    """
+    Random combinations of "interesting" fragments should be tokenized
+    identically
+    """
+    rng = random.Random(0)
+    for _ in range(500):
+        size = rng.randint(0, 60)
+        _assert_compatible("".join(rng.choices(FRAGMENTS, k=size)))
+
+
+def test_lazy_consumption() -> None:
+    """
+    Lines should only be read when they are needed for the next row. The
+    incremental parser relies on this to know the position of each row.
+    """
+    consumed: List[str] = []
+
+    def lines() -> Iterator[str]:
+        for line in [
+            '1.0;added;"a\n',
+            'b"\n',
+            "2.0;added;c\n",
+            "3.0;added;d\n",
+        ]:
+            consumed.append(line)
+            yield line
+
+    rows = tokenize_rows(lines())
+    assert next(rows) == (1, ["1.0", "added", "a\nb"])
+    assert len(consumed) == 2
+    assert next(rows) == (2, ["2.0", "added", "c"])
+    assert len(consumed) == 3
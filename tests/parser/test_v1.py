@@ -45,3 +45,48 @@ def test_drop_time_info(datestring: str, expected: date):
     data.name = f"<StringIO from {__file__}>"
     release_data = v1.extract_release_information(data, None)
     assert release_data[Version("2.1")].date == expected
+
+
+def test_release_rows_single_pass(caplog):
+    """
+    Release lines and log-entries should be processed in one pass over the
+    file without treating release lines as broken log-entries.
+    """
+    lines = iter(
+        dedent(
+            """\
+            2.1.0  ; added   ; hello world   ;    ; ;h;          ;
+            2.1.0  ; release ; 2018-01-01; Hello World
+            2.0.0  ; added   ; initial       ;    ; ; ;          ;
+            """
+        ).splitlines(keepends=True)
+    )
+    changelog = v1.parse(lines)
+    assert [release.release_date for release in changelog.releases] == [
+        date(2018, 1, 1),
+        None,
+    ]
+    assert changelog.releases[0].notes == "Hello World"
+    assert len(changelog.releases[0].logs) == 1
+    assert not any("release" in message for message in caplog.messages)
+
+
+def test_classify_rows():
+    """
+    The row classifier should generate both log-entries and release
+    information in file order.
+    """
+    data = StringIO(
+        dedent(
+            """\
+            2.1.0  ; release ; 2018-01-01; Hello World
+            2.1.0  ; added   ; hello world   ;    ; ;h;2010-01-01;
+            """
+        )
+    )
+    result = list(v1.classify_rows(data))
+    assert result[0] == v1.ReleaseRow(
+        Version("2.1.0"), date(2018, 1, 1), "Hello World"
+    )
+    assert result[1] == v1.ReleaseRow(Version("2.1.0"), date(2010, 1, 1))
+    assert result[2].subject == "hello world"
@@ -0,0 +1,115 @@
+"""
+Tests for the fragment cache of the renderers
+"""
+from dataclasses import replace
+from typing import Any
+
+import pytest
+from packaging.version import Version
+
+import clproc.renderer as renderer
+from clproc.model import Changelog, FileMetadata
+from clproc.renderer.fragments import FragmentCache, release_key
+
+
+def _cached(fmt: str) -> Any:
+    instance = renderer.create(fmt, cache_fragments=True)
+    assert instance is not None
+    assert isinstance(instance.fragment_cache, FragmentCache)
+    return instance
+
+
+@pytest.mark.parametrize("fmt", ["json", "markdown", "ndjson"])
+def test_identical_output(sample_log: Changelog, fmt: str) -> None:
+    """
+    Cached fragments should result in the same documents as rendering
+    without cache.
+    """
+    instance = _cached(fmt)
+    uncached = renderer.create(fmt)
+    assert uncached is not None
+    metadata = FileMetadata(issue_url_templates={"default": "url/{id}"})
+    (release,) = sample_log.releases
+    changelogs = [
+        Changelog((release, replace(release, version=Version("1.1")))),
+        Changelog(
+            (replace(release, version=Version("1.3")), release)
+            + (replace(release, version=Version("1.1")),)
+        ),
+        Changelog((replace(release, notes="changed"),)),
+    ]
+    for changelog in changelogs:
+        expected = uncached.render(changelog, metadata)
+        assert instance.render(changelog, metadata) == expected
+    assert instance.fragment_cache.hits == 2
+
+
+def test_only_changed_releases_are_rendered(sample_log: Changelog) -> None:
+    """
+    A second document should only render new or modified releases
+    """
+    instance = _cached("markdown")
+    cache = instance.fragment_cache
+    (release,) = sample_log.releases
+    old = replace(release, version=Version("1.0"))
+    instance.render(Changelog((release, old)), FileMetadata())
+    assert (cache.hits, cache.misses) == (0, 2)
+    instance.render(
+        Changelog((replace(release, notes="new"), old)), FileMetadata()
+    )
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_templates_are_part_of_the_key(sample_log: Changelog) -> None:
+    """
+    Changing the issue URL-templates should render all releases again
+    """
+    instance = _cached("json")
+    first = FileMetadata(issue_url_templates={"default": "a/{id}"})
+    second = FileMetadata(issue_url_templates={"default": "b/{id}"})
+    assert "a/1" in instance.render(sample_log, first)
+    assert "b/1" in instance.render(sample_log, second)
+    assert instance.fragment_cache.hits == 0
+
+
+def test_version_spelling_is_part_of_the_key(sample_log: Changelog) -> None:
+    """
+    Versions which compare equal but are written differently should not share
+    a fragment.
+    """
+    (release,) = sample_log.releases
+    modified = replace(release, version=Version("1.2.0"))
+    assert release == modified
+    assert release_key(release, {}) != release_key(modified, {})
+    instance = _cached("markdown")
+    instance.render(sample_log, FileMetadata())
+    assert "Release 1.2.0" in instance.render(
+        Changelog((modified,)), FileMetadata()
+    )
+
+
+def test_unused_fragments_are_dropped(sample_log: Changelog) -> None:
+    """
+    Only fragments of the previous document should be kept
+    """
+    instance = _cached("json")
+    (release,) = sample_log.releases
+    other = replace(release, notes="other")
+    instance.render(sample_log, FileMetadata())
+    instance.render(Changelog((other,)), FileMetadata())
+    instance.render(Changelog((other,)), FileMetadata())
+    instance.render(sample_log, FileMetadata())
+    assert instance.fragment_cache.misses == 3
+
+
+def test_equal_releases_share_fragments(sample_log: Changelog) -> None:
+    """
+    Releases which are equal (but not identical) should use the cache
+    """
+    instance = _cached("markdown")
+    (release,) = sample_log.releases
+    instance.render(sample_log, FileMetadata())
+    copy = replace(release, logs=tuple(replace(log) for log in release.logs))
+    assert copy is not release
+    instance.render(Changelog((copy,)), FileMetadata())
+    assert instance.fragment_cache.hits == 1
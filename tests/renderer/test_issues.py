@@ -0,0 +1,49 @@
+"""
+Unit-tests for the issue-link helpers shared by the renderers
+"""
+import pytest
+
+from clproc.model import IssueId
+from clproc.renderer.issues import IssueLinkFormatter
+
+
+@pytest.mark.parametrize(
+    "issue_id, expected",
+    [
+        (IssueId(12), "https://example.com/12"),
+        (IssueId(12, "other"), "https://other/12/12"),
+        (IssueId(12, "static"), "https://static"),
+        (IssueId(12, "empty"), ""),
+        (IssueId(12, "unknown"), ""),
+    ],
+)
+def test_url(issue_id: IssueId, expected: str) -> None:
+    """
+    Every occurrence of "{id}" should be replaced in the template of the
+    issue-source.
+    """
+    formatter = IssueLinkFormatter(
+        {
+            "default": "https://example.com/{id}",
+            "other": "https://other/{id}/{id}",
+            "static": "https://static",
+            "empty": "",
+        }
+    )
+    assert formatter.url(issue_id) == expected
+
+
+def test_url_is_memoised() -> None:
+    """
+    The URL of an issue should only be formatted once
+    """
+    formatter = IssueLinkFormatter({"default": "https://example.com/{id}"})
+    first = formatter.url(IssueId(1234567))
+    assert formatter.url(IssueId(1234567)) is first
+
+
+def test_no_templates() -> None:
+    """
+    A formatter without templates should not generate any URL
+    """
+    assert IssueLinkFormatter(None).url(IssueId(1)) == ""
@@ -1,5 +1,6 @@
 import random
 from datetime import date
+from io import StringIO
 from json import dumps, loads
 from typing import Any, Dict, List, Tuple, Union
 
@@ -14,7 +15,7 @@ from clproc.model import (
     FileMetadata,
     IssueId,
 )
-from clproc.renderer.json import CustomEncoder, format_log
+from clproc.renderer.json import CustomEncoder, format_log, format_release
 
 
 def _dict_getter(obj: Dict[str, Any], path: Tuple[Union[str, int], ...]) -> Any:
@@ -190,3 +191,29 @@ def test_issue_sorting():
     )
     for id_, url in zip(result["issue_ids"], result["issue_urls"]):
         assert url.endswith(f":{id_}>")
+
+
+def test_render_to(sample_log: Changelog) -> None:
+    """
+    Streaming the JSON output should result in the same document
+    """
+    instance = renderer.create("json")
+    assert instance is not None
+    metadata = FileMetadata(issue_url_templates={"default": "url/{id}"})
+    stream = StringIO()
+    instance.render_to(stream, sample_log.releases * 2, metadata)
+    expected = instance.render(Changelog(sample_log.releases * 2), metadata)
+    assert stream.getvalue() == expected
+    assert len(loads(stream.getvalue())) == 2
+
+
+def test_formatted_release_is_builtin(sample_log: Changelog) -> None:
+    """
+    The formatted data should be serialisable without a custom encoder
+    """
+    release = sample_log.releases[0]
+    result = format_release(release, {"default": "url/{id}"})
+    assert dumps(result) == dumps(result, cls=CustomEncoder)
+    assert result["meta"]["version"] == "1.2"
+    assert result["meta"]["date"] == "2000-01-02"
+    assert result["logs"][0]["type"] == "changed"
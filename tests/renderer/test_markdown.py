@@ -9,12 +9,19 @@ from packaging.version import Version
 
 import clproc.renderer as renderer
 from clproc import parse
-from clproc.model import Changelog, ChangelogEntry, FileMetadata, ReleaseEntry
+from clproc.model import (
+    Changelog,
+    ChangelogEntry,
+    ChangelogType,
+    FileMetadata,
+    ReleaseEntry,
+)
 from clproc.renderer.markdown import (
     MarkdownRenderer,
     date_string,
     format_detail,
     format_log,
+    group_by_type,
 )
 
 DATA_DIR = Path(__file__).parent / "data"
@@ -276,3 +283,47 @@ def test_format_empty_detail():
     """
     result = format_detail(ChangelogEntry(Version("1.0")))
     assert result == ""
+
+
+def test_render_keeps_order():
+    """
+    Both, the streaming and the string API, write the releases in the given
+    order without sorting them.
+    """
+    releases = [
+        ReleaseEntry(version=Version("1.0")),
+        ReleaseEntry(version=Version("2.0")),
+    ]
+    stream = StringIO()
+    MarkdownRenderer().render_to(stream, iter(releases), FileMetadata())
+    result = MarkdownRenderer().render(
+        Changelog(tuple(releases)), FileMetadata()
+    )
+    assert stream.getvalue() == result
+    assert result.index("Release 1.0") < result.index("Release 2.0")
+
+
+def test_group_by_type():
+    """
+    Sections should follow the order of the types. Highlights come first in
+    each section, followed by the newest versions.
+    """
+    logs = [
+        ChangelogEntry(Version("1.0.1"), ChangelogType.FIXED, subject="a"),
+        ChangelogEntry(Version("1.0.2"), ChangelogType.FIXED, subject="b"),
+        ChangelogEntry(Version("1.0.0"), ChangelogType.ADDED, subject="c"),
+        ChangelogEntry(
+            Version("1.0.0"),
+            ChangelogType.FIXED,
+            is_highlight=True,
+            subject="d",
+        ),
+    ]
+    result = [
+        (type_, [log.subject for log in section])
+        for type_, section in group_by_type(logs)
+    ]
+    assert result == [
+        (ChangelogType.ADDED, ["c"]),
+        (ChangelogType.FIXED, ["d", "b", "a"]),
+    ]
@@ -0,0 +1,64 @@
+from io import StringIO
+from json import loads
+
+import clproc.renderer as renderer
+from clproc import core
+from clproc.model import Changelog, FileMetadata
+
+
+def test_one_release_per_line(sample_log: Changelog) -> None:
+    """
+    Each release should be written as JSON object on its own line, identical
+    to the items of the JSON renderer.
+    """
+    instance = renderer.create("ndjson")
+    json_renderer = renderer.create("json")
+    assert instance is not None
+    assert json_renderer is not None
+    metadata = FileMetadata(issue_url_templates={"default": "url/{id}"})
+    changelog = Changelog(sample_log.releases * 3)
+    output = instance.render(changelog, metadata)
+    assert output.endswith("}\n")
+    lines = output.splitlines()
+    assert len(lines) == 3
+    assert [loads(line) for line in lines] == loads(
+        json_renderer.render(changelog, metadata)
+    )
+
+
+def test_render_to(sample_log: Changelog) -> None:
+    """
+    Streaming the output should result in the same document
+    """
+    instance = renderer.create("ndjson")
+    assert instance is not None
+    metadata = FileMetadata()
+    stream = StringIO()
+    instance.render_to(stream, sample_log.releases * 2, metadata)
+    expected = instance.render(Changelog(sample_log.releases * 2), metadata)
+    assert stream.getvalue() == expected
+
+
+def test_empty_changelog() -> None:
+    """
+    A changelog without releases should result in an empty document
+    """
+    instance = renderer.create("ndjson")
+    assert instance is not None
+    assert instance.render(Changelog(tuple()), FileMetadata()) == ""
+    outfile = StringIO()
+    core.write_document(instance, outfile, [], FileMetadata())
+    assert outfile.getvalue() == ""
+
+
+def test_write_changelog() -> None:
+    """
+    Writing the document into a file should not add an empty line after the
+    last record
+    """
+    outfile = StringIO()
+    with open("tests/data/changelog.in", encoding="utf8") as infile:
+        core.write_changelog("ndjson", infile, outfile)
+    output = outfile.getvalue()
+    assert output.endswith("}\n")
+    assert all(loads(line) for line in output[:-1].split("\n"))
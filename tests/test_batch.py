@@ -0,0 +1,303 @@
+"""
+Unit-tests for processing multiple changelog files at once
+"""
+from io import StringIO
+from json import loads
+from os.path import join
+from pathlib import Path
+from textwrap import dedent
+from typing import Any
+
+import pytest
+
+from clproc import batch, cli
+from clproc.exc import ClprocException
+
+CONTENT = """\
+# -*- changelog-version: 2.0 -*-
+1.1.0 ; added ; foo
+1.0.0 ; added ; bar
+"""
+
+
+def _make_packages(root: Path, count: int) -> None:
+    for index in range(count):
+        folder = root / f"pkg{index}"
+        folder.mkdir()
+        (folder / "changelog.in").write_text(CONTENT)
+
+
+@pytest.mark.parametrize(
+    "template, expected",
+    [
+        ("{dir}/CHANGELOG.{ext}", "pkg/CHANGELOG.md"),
+        ("out/{name}.{ext}", "out/changelog.md"),
+        ("static.txt", "static.txt"),
+    ],
+)
+def test_output_filename(template: str, expected: str) -> None:
+    """
+    Placeholders in the output template should be replaced
+    """
+    result = batch.output_filename(template, "pkg/changelog.in", "markdown")
+    assert result == expected
+
+
+def test_expand_paths(tmp_path: Path) -> None:
+    """
+    Glob patterns should be expanded while plain names are kept
+    """
+    _make_packages(tmp_path, 2)
+    result = batch.expand_paths(
+        [str(tmp_path / "**" / "changelog.in"), "missing.in"]
+    )
+    assert result == [
+        str(tmp_path / "pkg0" / "changelog.in"),
+        str(tmp_path / "pkg1" / "changelog.in"),
+        "missing.in",
+    ]
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_render_many(tmp_path: Path, num_workers: int) -> None:
+    """
+    Each changelog should be rendered next to its input file, regardless of
+    the number of worker processes.
+    """
+    _make_packages(tmp_path, 3)
+    infiles = batch.expand_paths([str(tmp_path / "*" / "changelog.in")])
+    results = batch.render_many(infiles, "markdown", num_workers=num_workers)
+    assert [result.success for result in results] == [True] * 3
+    for index in range(3):
+        output = (tmp_path / f"pkg{index}" / "CHANGELOG.md").read_text()
+        assert output.startswith("# Changelog")
+
+
+def test_render_many_failure(tmp_path: Path) -> None:
+    """
+    A failing file should be reported without stopping the other files
+    """
+    _make_packages(tmp_path, 1)
+    infiles = [
+        str(tmp_path / "missing.in"),
+        str(tmp_path / "pkg0" / "changelog.in"),
+    ]
+    results = batch.render_many(infiles, num_workers=1)
+    assert [result.success for result in results] == [False, True]
+    assert "missing.in" in results[0].message
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_render_many_relative_paths(
+    tmp_path: Path, monkeypatch: Any, num_workers: int
+) -> None:
+    """
+    Release-files should be found relative to their changelog. Unexpected
+    errors in one file should be reported without stopping the other files.
+    """
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "changelog.in").write_text(
+        "# -*- release-file: release.yaml -*-\n" + CONTENT
+    )
+    (tmp_path / "pkg" / "release.yaml").write_text(
+        dedent(
+            """\
+            meta:
+                version: "1.0"
+            releases:
+                "1.1":
+                    date: 2020-02-02
+                    notes: Notes for 1.1
+            """
+        )
+    )
+    (tmp_path / "bad").mkdir()
+    (tmp_path / "bad" / "changelog.in").write_text(
+        CONTENT + "0.9.0 ; added ; invalid issue ; 12a\n"
+    )
+    (tmp_path / "bad" / "CHANGELOG.md").write_text("existing")
+    monkeypatch.chdir(tmp_path)
+    results = batch.render_many(
+        ["bad/changelog.in", "pkg/changelog.in"],
+        "markdown",
+        num_workers=num_workers,
+    )
+    assert [result.success for result in results] == [False, True]
+    assert results[0].message.startswith("ValueError:")
+    assert (tmp_path / "bad" / "CHANGELOG.md").read_text() == "existing"
+    output = (tmp_path / "pkg" / "CHANGELOG.md").read_text()
+    assert "Notes for 1.1" in output
+
+
+def test_render_many_duplicate_output(tmp_path: Path) -> None:
+    """
+    Two files should never be rendered into the same output file
+    """
+    _make_packages(tmp_path, 2)
+    infiles = batch.expand_paths([str(tmp_path / "*" / "changelog.in")])
+    with pytest.raises(ClprocException):
+        batch.render_many(infiles, output_template=str(tmp_path / "out.json"))
+
+
+def test_cli_render_many(tmp_path: Path, capsys: Any) -> None:
+    """
+    The exit-code of "render-many" should reflect failures of any file
+    """
+    _make_packages(tmp_path, 2)
+    pattern = str(tmp_path / "*" / "changelog.in")
+    assert cli.main(["render-many", "-j", "1", pattern]) == 0
+    assert (tmp_path / "pkg1" / "CHANGELOG.json").exists()
+    exit_code = cli.main(
+        ["render-many", "-j", "1", pattern, str(tmp_path / "missing.in")]
+    )
+    assert exit_code == 1
+    assert "missing.in" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["changelog.in", "render"], "changelog.in"),
+        (["-v", "render-many", "x"], "render-many"),
+        (
+            ["--cache-dir", "render-many", "changelog.in", "render"],
+            "changelog.in",
+        ),
+        ([], None),
+    ],
+)
+def test_batch_command_detection(args: Any, expected: Any) -> None:
+    """
+    The first positional argument decides between single- and multi-file
+    commands.
+    """
+    assert cli._first_positional(args) == expected
+
+
+def test_read_manifest() -> None:
+    """
+    Manifests should contain paths with optional versions
+    """
+    manifest = StringIO(
+        dedent(
+            """\
+            # A comment
+            pkg-a/changelog.in   1.2.0
+
+            pkg-b/changelog.in   # discovered
+            /abs/changelog.in 2.0
+            """
+        )
+    )
+    result = batch.read_manifest(manifest, "root")
+    assert result == [
+        (join("root", "pkg-a", "changelog.in"), "1.2.0"),
+        (join("root", "pkg-b", "changelog.in"), ""),
+        ("/abs/changelog.in", "2.0"),
+    ]
+
+
+def test_read_manifest_invalid() -> None:
+    """
+    Lines with too many fields should be rejected
+    """
+    with pytest.raises(ClprocException):
+        batch.read_manifest(StringIO("changelog.in 1.0 2.0\n"))
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_check_many(tmp_path: Path, num_workers: int) -> None:
+    """
+    Each changelog should be checked for its version. Missing versions are
+    discovered from the project metadata next to the changelog.
+    """
+    _make_packages(tmp_path, 2)
+    (tmp_path / "pkg1" / "package.json").write_text('{"version": "1.1.0"}')
+    infile0 = str(tmp_path / "pkg0" / "changelog.in")
+    infile1 = str(tmp_path / "pkg1" / "changelog.in")
+    files = [(infile0, "1.0"), (infile0, "2.0"), (infile1, ""), (infile0, "")]
+    results = batch.check_many(files, num_workers=num_workers)
+    assert [(item.version, item.success) for item in results] == [
+        ("1.0", True),
+        ("2.0", False),
+        ("1.1.0", True),
+        ("", False),
+    ]
+    assert "2.0 not found" in results[1].message
+    assert "metadata" in results[3].message
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_check_many_relative_paths(
+    tmp_path: Path, monkeypatch: Any, num_workers: int
+) -> None:
+    """
+    Strict checks should read the release-file next to each changelog, and
+    not the one in the current folder.
+    """
+    _make_packages(tmp_path, 2)
+    valid = 'meta:\n    version: "1.0"\nreleases: {}\n'
+    invalid = 'meta:\n    version: "1.0"\n'
+    for folder, release_file in [("pkg0", valid), ("pkg1", invalid)]:
+        infile = tmp_path / folder / "changelog.in"
+        infile.write_text("# -*- release-file: release.yaml -*-\n" + CONTENT)
+        (tmp_path / folder / "release.yaml").write_text(release_file)
+    (tmp_path / "release.yaml").write_text(invalid)
+    monkeypatch.chdir(tmp_path)
+    results = batch.check_many(
+        [("pkg0/changelog.in", "1.1"), ("pkg1/changelog.in", "1.1")],
+        strict=True,
+        num_workers=num_workers,
+    )
+    assert [result.success for result in results] == [True, False]
+    assert "Missing key 'releases'" in results[1].message
+
+
+def test_check_many_unexpected_error(tmp_path: Path) -> None:
+    """
+    Any error in a strict check should fail only the affected file
+    """
+    _make_packages(tmp_path, 2)
+    with open(tmp_path / "pkg0" / "changelog.in", "a") as fptr:
+        fptr.write("0.9.0 ; added ; invalid issue ; 12a\n")
+    files = [
+        (str(tmp_path / "pkg0" / "changelog.in"), "1.1"),
+        (str(tmp_path / "pkg1" / "changelog.in"), "1.1"),
+    ]
+    results = batch.check_many(files, strict=True, num_workers=1)
+    assert [result.success for result in results] == [False, True]
+    assert results[0].message.startswith("ValueError:")
+
+
+def test_cli_check_many(tmp_path: Path) -> None:
+    """
+    The "check-many" command should write a JSON report
+    """
+    _make_packages(tmp_path, 2)
+    (tmp_path / "manifest.txt").write_text(
+        "pkg0/changelog.in 1.1\npkg1/changelog.in 1.2\n"
+    )
+    report_file = tmp_path / "report.json"
+    exit_code = cli.main(
+        [
+            "check-many",
+            "--jobs",
+            "1",
+            "--manifest",
+            str(tmp_path / "manifest.txt"),
+            "--report",
+            str(report_file),
+        ]
+    )
+    assert exit_code == 1
+    report = loads(report_file.read_text())
+    assert report["success"] is False
+    assert [item["success"] for item in report["results"]] == [True, False]
+
+
+def test_cli_check_many_without_files() -> None:
+    """
+    Either a manifest or changelog files are required
+    """
+    with pytest.raises(SystemExit):
+        cli.parse_args(["check-many"])
@@ -0,0 +1,216 @@
+"""
+Unit-tests for the on-disk parse cache
+"""
+import logging
+import os
+import time
+from io import StringIO
+from pathlib import Path
+from typing import List
+from unittest.mock import Mock, patch
+
+from packaging.version import Version
+
+from clproc import cli, core
+from clproc.cache import ParseCache, cached_parse
+from clproc.model import ParsingIssueMessage
+from clproc.parser import extract_metadata
+from clproc.parser.incremental import parse_incremental
+
+CONTENT = """\
+# -*- changelog-version: 2.0 -*-
+1.2.0 ; added ; foo
+1.1.0 ; added ; bar
+1.0.0 ; invalid ; baz
+"""
+
+
+def _infile(content: str = CONTENT) -> StringIO:
+    output = StringIO(content)
+    output.name = f"<stringio {__file__}>"
+    return output
+
+
+def _entries(directory: Path) -> List[Path]:
+    """
+    Return the cached parse results (without the incremental parser states)
+    """
+    return [
+        path
+        for path in directory.glob("*.clpc")
+        if not path.name.startswith("state-")
+    ]
+
+
+def test_cache_hit(tmp_path: Path) -> None:
+    """
+    The second parse of unchanged content should not run the parser
+    """
+    cache = ParseCache(str(tmp_path))
+    first = cached_parse(_infile(), cache)
+    with patch("clproc.parser.parse") as parse:
+        second = cached_parse(_infile(), cache)
+    parse.assert_not_called()
+    assert first == second
+
+
+def test_cache_replays_issues(tmp_path: Path) -> None:
+    """
+    Parse issues should be reported again when loading from the cache
+    """
+    cache = ParseCache(str(tmp_path))
+    first: List[ParsingIssueMessage] = []
+    second: List[ParsingIssueMessage] = []
+    cached_parse(_infile(), cache, first.append)
+    cached_parse(_infile(), cache, second.append)
+    assert first
+    assert first == second
+
+
+def test_cache_invalidation(tmp_path: Path) -> None:
+    """
+    Changes to the content, the release-file or the clproc version should
+    result in a new key.
+    """
+    cache = ParseCache(str(tmp_path))
+    release_file = tmp_path / "release.yaml"
+    release_file.write_text("---\n")
+    content = f"# -*- release-file: {release_file} -*-\n1.0 ; added ; foo\n"
+    metadata = extract_metadata(StringIO(content), lambda _: None)
+    key = cache.key(content, metadata)
+    assert cache.key(content + "\n", metadata) != key
+    with patch("clproc.cache.clproc_version", return_value="0.0.0"):
+        assert cache.key(content, metadata) != key
+    release_file.write_text("---\nfoo: bar\n")
+    assert cache.key(content, metadata) != key
+
+
+def test_eviction_by_size(tmp_path: Path) -> None:
+    """
+    The least recently used entries should be removed once the cache grows
+    beyond its size limit.
+    """
+    cache = ParseCache(str(tmp_path), max_size=0)
+    cached_parse(_infile(), cache)
+    assert not list(tmp_path.glob("*.clpc"))
+
+
+def test_eviction_by_age(tmp_path: Path) -> None:
+    """
+    Entries older than the maximum age should be removed
+    """
+    cache = ParseCache(str(tmp_path), max_age=60)
+    cached_parse(_infile(), cache)
+    (old_file,) = _entries(tmp_path)
+    an_hour_ago = time.time() - 3600
+    os.utime(old_file, (an_hour_ago, an_hour_ago))
+    cached_parse(_infile(CONTENT + "0.9 ; added ; foo\n"), cache)
+    assert old_file not in _entries(tmp_path)
+    assert len(_entries(tmp_path)) == 1
+
+
+def test_corrupt_cache_file(tmp_path: Path) -> None:
+    """
+    A broken cache-file should be ignored
+    """
+    cache = ParseCache(str(tmp_path))
+    cached_parse(_infile(), cache)
+    (cache_file,) = _entries(tmp_path)
+    cache_file.write_bytes(b"this is not a compiled changelog")
+    result = cached_parse(_infile(), cache)
+    assert len(result.changelog.releases) == 2
+
+
+def test_core_num_releases(tmp_path: Path) -> None:
+    """
+    Limiting the number of releases should also work with cached results
+    """
+    cache = ParseCache(str(tmp_path))
+    for _ in range(2):
+        outfile = StringIO()
+        core.write_changelog("json", _infile(), outfile, 1, cache=cache)
+        assert (
+            outfile.getvalue()
+            == core.make_changelog("json", _infile(), 1) + "\n"
+        )
+
+
+def test_strict_check_with_cache(tmp_path: Path, caplog) -> None:
+    """
+    A strict check should still fail on a cached changelog with issues
+    """
+    caplog.set_level(logging.WARNING)
+    cache = ParseCache(str(tmp_path))
+    for _ in range(2):
+        assert not core.check_changelog(
+            Version("1.2"), _infile(), strict=True, cache=cache
+        )
+        assert core.check_changelog(Version("1.2"), _infile(), cache=cache)
+
+
+def test_cache_dir_from_environment(tmp_path: Path) -> None:
+    """
+    The cache should be enabled by an environment variable
+    """
+    with patch.dict(os.environ, {"CLPROC_CACHE_DIR": str(tmp_path)}):
+        args = cli.parse_args(["tests/data/changelog.in", "render"])
+    assert args.cache_dir == str(tmp_path)
+    args = cli.parse_args(
+        ["--cache-dir", "foo", "tests/data/changelog.in", "render"]
+    )
+    assert cli.get_cache(args).directory == "foo"
+
+
+def test_state_roundtrip(tmp_path: Path) -> None:
+    """
+    The incremental parser state should be loaded as it was stored
+    """
+    cache = ParseCache(str(tmp_path))
+    content = CONTENT + "0.9 ; added ; foo\n"
+    _, state = parse_incremental(content, None)
+    assert state is not None
+    cache.store("state-test", state)
+    assert cache.load_state("state-test") == state
+    assert cache.load("state-test") is None
+
+
+def test_shared_cache_directory(tmp_path: Path) -> None:
+    """
+    Files removed by another process while reading or evicting should be
+    treated as cache-misses.
+    """
+    cache = ParseCache(str(tmp_path), max_size=0)
+    cached_parse(_infile(), cache)
+    cache.max_size = 1 << 20
+    cached_parse(_infile(), cache)
+    (entry,) = _entries(tmp_path)
+    key = entry.name[: -len(entry.suffix)]
+    with patch("os.utime", side_effect=FileNotFoundError):
+        assert cache.load(key) is None
+    with patch("os.unlink", side_effect=FileNotFoundError):
+        cache.max_size = 0
+        cache.evict()
+    removed = Mock(path=str(entry), stat=Mock(side_effect=FileNotFoundError))
+    removed.name = entry.name
+    with patch("os.scandir", return_value=[removed]):
+        cache.evict()
+
+
+def test_eviction_of_temporary_files(tmp_path: Path) -> None:
+    """
+    Temporary files of interrupted processes should be removed once they are
+    old enough. Files of previous cache formats are always removed.
+    """
+    cache = ParseCache(str(tmp_path))
+    old_file = tmp_path / "old.tmp"
+    new_file = tmp_path / "new.tmp"
+    old_file.write_bytes(b"")
+    new_file.write_bytes(b"")
+    legacy_file = tmp_path / "legacy.pickle"
+    legacy_file.write_bytes(b"")
+    a_day_ago = time.time() - 24 * 3600
+    os.utime(old_file, (a_day_ago, a_day_ago))
+    cache.evict()
+    assert not old_file.exists()
+    assert new_file.exists()
+    assert not legacy_file.exists()
@@ -3,6 +3,7 @@ This module ensures that we have a usable CLI interface
 """
 
 import logging
+from pathlib import Path
 from typing import Any
 from unittest.mock import patch
 
@@ -19,6 +20,8 @@ from clproc.exc import ClprocException
         ("json", "json"),
         ("md", "markdown"),
         ("markdown", "markdown"),
+        ("ndjson", "ndjson"),
+        ("jsonl", "ndjson"),
     ],
 )
 def test_argument_parsing_format(fmt: str, expected: str) -> None:
@@ -53,9 +56,9 @@ def test_render_call_spec() -> None:
     """
     We want the core implementation to be called with the proper arguments
     """
-    with patch("clproc.core.make_changelog") as make_changelog:
+    with patch("clproc.core.write_changelog") as write_changelog:
         cli.main(["tests/data/changelog.in", "render", "-f", "json"])
-    _, kwargs = make_changelog.call_args
+    _, kwargs = write_changelog.call_args
     assert kwargs["fmt"] == "json"
     assert hasattr(kwargs["infile"], "read")
 
@@ -89,6 +92,53 @@ def test_check_call_flags(flag, kwarg) -> None:
     assert kwargs[kwarg]
 
 
+def test_compile(tmp_path: Path, capsys: Any) -> None:
+    """
+    The "compile" subcommand should write a file which can be used in place
+    of the changelog
+    """
+    target = tmp_path / "changelog.clpc"
+    assert (
+        cli.main(["tests/data/changelog.in", "compile", "-o", str(target)]) == 0
+    )
+    capsys.readouterr()
+    cli.main(["tests/data/changelog.in", "render", "-f", "md"])
+    expected = capsys.readouterr().out
+    cli.main([str(target), "render", "-f", "md"])
+    assert capsys.readouterr().out == expected
+
+
+def test_render_replaces_output(tmp_path: Path) -> None:
+    """
+    The output file should only be replaced once rendering succeeded
+    """
+    infile = tmp_path / "changelog.in"
+    outfile = tmp_path / "out.md"
+    outfile.write_text("existing")
+    infile.write_text("# -*- changelog-version: 9.0 -*-\n1.0;added;x\n")
+    cli.main([str(infile), "render", "-f", "md", "-o", str(outfile)])
+    assert outfile.read_text() == "existing"
+    assert sorted(tmp_path.iterdir()) == [infile, outfile]
+
+    infile.write_text("# -*- changelog-version: 2.0 -*-\n1.0;added;x\n")
+    assert (
+        cli.main([str(infile), "render", "-f", "md", "-o", str(outfile)]) == 0
+    )
+    assert outfile.read_text().startswith("# Changelog")
+    assert sorted(tmp_path.iterdir()) == [infile, outfile]
+
+
+def test_render_unwritable_output(tmp_path: Path, caplog: Any) -> None:
+    """
+    Errors when writing the output should be reported without a traceback
+    """
+    outfile = tmp_path / "missing" / "out.md"
+    assert (
+        cli.main(["tests/data/changelog.in", "render", "-o", str(outfile)]) == 1
+    )
+    assert "No such file or directory" in caplog.text
+
+
 def test_known_error(caplog: Any) -> None:
     """
     If we have an uncaught error that is known by the internals (i.e. an
@@ -97,7 +147,7 @@ def test_known_error(caplog: Any) -> None:
     """
     caplog.set_level(logging.DEBUG)
     with patch("clproc.cli.core") as core:
-        core.make_changelog.side_effect = ClprocException("Yargs")
+        core.write_changelog.side_effect = ClprocException("Yargs")
         cli.main(["-v", "tests/data/changelog.in", "render", "-f", "json"])
     assert [logging.INFO, logging.DEBUG, logging.ERROR] == [
         log.levelno for log in caplog.records
@@ -2,8 +2,12 @@
 Unit Tests for the core/business functionality of clproc
 """
 import logging
+import os
+import stat
 from io import StringIO
+from pathlib import Path
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 from packaging.version import Version
@@ -159,3 +163,96 @@ def test_make_unknown_renderer(caplog: Any) -> None:
     result = core.make_changelog("this-is-an-unknown-renderer", infile)
     assert any("this-is-an-unknown-renderer" in msg for msg in caplog.messages)
     assert result == ""
+
+
+@pytest.mark.parametrize("fmt", ["json", "markdown"])
+def test_write_changelog(fmt: str) -> None:
+    """
+    Writing the changelog to a stream should give the same document as
+    rendering it in memory (followed by a newline).
+    """
+    content = "# -*- changelog-version: 2.0 -*-\n2.7.0 ; added ; foo ;;;;;\n"
+    infile = StringIO(content)
+    infile.name = f"<stringio {__file__}>"
+    outfile = StringIO()
+    core.write_changelog(fmt, infile, outfile)
+    infile = StringIO(content)
+    infile.name = f"<stringio {__file__}>"
+    assert outfile.getvalue() == core.make_changelog(fmt, infile) + "\n"
+
+
+def test_write_changelog_trailing_release_lines() -> None:
+    """
+    Special "release" lines in version 1.0 files may appear after their
+    block of log-entries.
+    """
+    content = (
+        "2.0 ; added   ; foo\n"
+        "1.0 ; added   ; bar\n"
+        "1.0 ; release ; 2020-01-01 ; Notes for one\n"
+        "2.0 ; release ; 2020-02-02 ; Notes for two\n"
+    )
+    infile = StringIO(content)
+    infile.name = f"<stringio {__file__}>"
+    outfile = StringIO()
+    core.write_changelog("markdown", infile, outfile)
+    output = outfile.getvalue()
+    assert "## Release 2.0 (2020-02-02)" in output
+    assert "Notes for two" in output
+    assert "## Release 1.0 (2020-01-01)" in output
+
+
+def test_check_changelog_stops_early() -> None:
+    """
+    A (non-strict) check should stop reading the changelog once the version
+    has been found.
+    """
+    consumed = []
+
+    def lines():
+        yield "# -*- changelog-version: 2.0 -*-\n"
+        for minor in range(1000, 0, -1):
+            line = f"1.{minor}.0 ; added ; entry\n"
+            consumed.append(line)
+            yield line
+
+    assert core.check_changelog(Version("1.999"), lines())
+    assert len(consumed) < 5
+
+
+def test_check_changelog_version_only() -> None:
+    """
+    A non-strict check should only look at the version column without
+    creating full log-entries.
+    """
+    data = StringIO("# -*- changelog-version: 2.0 -*-\n1.2.3 ; added ; foo\n")
+    with patch("clproc.parser.core.cleanup") as cleanup:
+        assert core.check_changelog(Version("1.2"), data)
+    cleanup.assert_not_called()
+
+
+def test_replacing_output(tmp_path: Path) -> None:
+    """
+    Replacing the output should keep the mode of existing files and write
+    through symbolic links
+    """
+    target = tmp_path / "CHANGELOG.md"
+    target.write_text("old")
+    target.chmod(0o640)
+    link = tmp_path / "link.md"
+    link.symlink_to(target)
+    with core.replacing_output(str(link)) as stream:
+        stream.write("new")
+    assert link.is_symlink()
+    assert target.read_text() == "new"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+    assert sorted(tmp_path.iterdir()) == [target, link]
+
+
+def test_replacing_output_device() -> None:
+    """
+    Outputs which are not regular files should be written directly
+    """
+    with core.replacing_output(os.devnull) as stream:
+        stream.write("discarded")
+    assert stat.S_ISCHR(os.stat(os.devnull).st_mode)
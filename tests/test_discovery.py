@@ -59,3 +59,11 @@ def test_discover_delegation(filename: str, handler_name: str):
         discovery.discover_version()
         handler.assert_called()
         mocked_open.assert_called_with(filename, mode="rb")
+
+
+def test_discover_in_directory(tmp_path):
+    """
+    The version of a project in another folder should be discoverable
+    """
+    (tmp_path / "pyproject.toml").write_text(FAKE_TOML)
+    assert discovery.discover_version(str(tmp_path)) == "1.1.0"
@@ -0,0 +1,85 @@
+"""
+Regression tests for the start-up time of the CLI.
+
+Each subcommand should only import the modules it needs. The imported modules
+are taken from the output of ``python -X importtime``.
+"""
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+from typing import List, Set
+
+import pytest
+
+CHANGELOG = """\
+# -*- changelog-version: 2.0 -*-
+1.0.0 ; added ; foo
+"""
+
+HEAVY_MODULES = {
+    "concurrent.futures.process",
+    "dateutil",
+    "tomli",
+    "yaml",
+}
+"Modules which are slow to import and only needed by some subcommands"
+
+RENDERERS = {
+    "clproc.renderer.json",
+    "clproc.renderer.markdown",
+    "clproc.renderer.ndjson",
+}
+
+
+def _imported_modules(args: List[str]) -> Set[str]:
+    """
+    Run the CLI with *args* and return the names of all imported modules
+    """
+    code = f"from clproc.cli import main; raise SystemExit(main({args!r}))"
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            modules.add(line.rpartition("|")[2].strip())
+    assert "clproc.cli" in modules
+    return modules
+
+
+@pytest.fixture()
+def changelog(tmp_path: Path) -> str:
+    """
+    A changelog file without release-file
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_text(CHANGELOG)
+    return str(filename)
+
+
+def test_check_imports(changelog: str) -> None:
+    """
+    Checking a version should neither import the renderers nor any of the
+    optional dependencies.
+    """
+    modules = _imported_modules([changelog, "check", "1.0"])
+    assert not modules & (HEAVY_MODULES | RENDERERS)
+
+
+@pytest.mark.parametrize(
+    "fmt, module",
+    [
+        ("json", "clproc.renderer.json"),
+        ("md", "clproc.renderer.markdown"),
+    ],
+)
+def test_render_imports(changelog: str, fmt: str, module: str) -> None:
+    """
+    Rendering should not import the dependencies of other subcommands
+    """
+    modules = _imported_modules([changelog, "render", "-f", fmt])
+    assert module in modules
+    assert not modules & HEAVY_MODULES
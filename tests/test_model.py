@@ -1,10 +1,27 @@
 """
 This module contains unit-tests for the data-model of clproc
 """
+import pickle  # nosec B403
+import sys
+from dataclasses import FrozenInstanceError
+from datetime import date
+
 import pytest
 from packaging.version import Version
 
-from clproc.model import ReleaseEntry
+from clproc.model import (
+    ChangelogEntry,
+    IssueId,
+    ReleaseEntry,
+    ReleaseInformation,
+)
+
+INSTANCES = [
+    ChangelogEntry(Version("1.0"), subject="foo", issue_ids=frozenset([])),
+    ReleaseEntry(Version("1.0"), date(2020, 1, 2), "notes", tuple()),
+    ReleaseInformation(date(2020, 1, 2), "notes"),
+    IssueId(1, "default"),
+]
 
 
 @pytest.mark.parametrize(
@@ -22,3 +39,33 @@ def test_release_sortability(
     Release entries should be sortable
     """
     assert (left < right) is expected
+
+
+@pytest.mark.parametrize("instance", INSTANCES)
+def test_pickle_roundtrip(instance: object) -> None:
+    """
+    Model instances must survive pickling (used by the parse cache)
+    """
+    copy = pickle.loads(pickle.dumps(instance))  # nosec B301
+    assert copy == instance
+    assert hash(copy) == hash(instance)
+
+
+@pytest.mark.parametrize("instance", INSTANCES)
+def test_immutability(instance: object) -> None:
+    """
+    Model instances should neither allow modifications nor new attributes
+    """
+    with pytest.raises((FrozenInstanceError, AttributeError, TypeError)):
+        setattr(instance, "subject", "changed")
+    with pytest.raises((FrozenInstanceError, AttributeError, TypeError)):
+        setattr(instance, "new_attribute", 1)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="slots need 3.11")
+@pytest.mark.parametrize("instance", INSTANCES)
+def test_slots(instance: object) -> None:
+    """
+    Instances held in large numbers should not have a per-instance dict
+    """
+    assert not hasattr(instance, "__dict__")
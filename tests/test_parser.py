@@ -2,17 +2,24 @@
 Test core behaviour of changelog processing
 """
 
+import logging
 from datetime import date
 from io import StringIO
 from pathlib import Path
 from textwrap import dedent
+from typing import List
+from unittest.mock import patch
 
 import pytest
-from packaging.version import Version
+from packaging.version import InvalidVersion, Version
 
 from clproc import parser
+from clproc.core import check_changelog
 from clproc.exc import ClprocException
-from clproc.model import IssueId
+from clproc.model import IssueId, ParsingIssueMessage
+from clproc.parser import core, scan_metadata
+from clproc.parser.core import make_release_version, parse_version
+from clproc.reporting import default_parse_issue_handler
 
 DATA_DIR = Path(__file__).parent / "data"
 TEST_DATA = (DATA_DIR / "changelog.in").read_text(encoding="utf8")
@@ -155,3 +162,243 @@ def test_multiple_url_templates():
         IssueId(123, "default"),
         IssueId(234, "tpl2"),
     }
+
+
+def test_non_seekable_input() -> None:
+    """
+    We want to be able to parse from inputs that cannot be rewound (f.ex.
+    stdin or pipes).
+    """
+    lines = iter(TEST_DATA.splitlines(keepends=True))
+    result = parser.parse(lines).changelog
+    assert [release.version for release in result.releases] == [
+        Version("2.8"),
+        Version("2.7"),
+    ]
+
+
+def test_metadata_scan_stops_at_data() -> None:
+    """
+    Scanning for metadata should stop at the first data-line without consuming
+    the rest of the file.
+    """
+    consumed = []
+
+    def lines():
+        for line in [
+            "# -*- changelog-version: 2.0 -*-\n",
+            "\n",
+            "1.0 ; added ; foo\n",
+            "0.9 ; added ; bar\n",
+        ]:
+            consumed.append(line)
+            yield line
+
+    metadata, remaining = scan_metadata(lines(), default_parse_issue_handler)
+    assert metadata.version == Version("2.0")
+    assert len(consumed) == 3
+    assert len(list(remaining)) == 4
+
+
+def test_metadata_scan_header_window() -> None:
+    """
+    The number of lines inspected for metadata can be limited
+    """
+    data = StringIO(
+        dedent(
+            """\
+            # first line
+            # -*- release-nodes: 3 -*-
+            1.0 ; added ; foo
+            """
+        )
+    )
+    metadata, _ = scan_metadata(
+        data, default_parse_issue_handler, max_header_lines=1
+    )
+    assert metadata.release_nodes == 2
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "1.0 ; added ; foo ;;;; Some detail\n"
+        "\n"
+        "# -*- changelog-version: 2.0 -*-\n",
+        "version;type;subject;issue_ids;internal;highlight;detail\n"
+        "# -*- changelog-version: 2.0 -*-\n"
+        "1.0 ; added ; foo ;;;; Some detail\n",
+        "# -*- changelog-version: 2.0 -*-\n"
+        "1.0 ; added ; foo ;;;; Some detail\n"
+        "# -*- release-nodes: 3 -*-\n",
+    ],
+    ids=["trailing", "after-column-names", "trailing-release-nodes"],
+)
+def test_metadata_outside_of_header(content: str) -> None:
+    """
+    Metadata below the first data line should still be found in seekable
+    files. The row of column-names does not end the header.
+    """
+    result = parser.parse(StringIO(content), parse_issue_handler=lambda _: None)
+    assert result.file_metadata.version == Version("2.0")
+    (release,) = result.changelog.releases
+    assert release.logs[0].detail == "Some detail"
+
+
+@pytest.mark.parametrize("chunk_size", [3, 7, 1 << 16])
+def test_metadata_below_data(chunk_size: int) -> None:
+    """
+    Metadata below the data should be applied even if the header contains
+    the changelog-version
+    """
+    content = (
+        "# -*- changelog-version: 2.0 -*-\n"
+        "1.2.3 ; added ; foo\n"
+        "# -*- release-nodes: 3 -*-\n"
+        "# -*- issue-url-template: https://example.com/{id} -*-"
+    )
+    with patch.object(core, "METADATA_CHUNK_SIZE", chunk_size):
+        result = parser.parse(StringIO(content))
+        assert result.changelog.releases[0].version == Version("1.2.3")
+        assert result.file_metadata.issue_url_templates == {
+            "default": "https://example.com/{id}"
+        }
+        assert check_changelog(Version("1.2.3"), StringIO(content))
+
+
+def test_ignored_metadata_is_reported() -> None:
+    """
+    Non-seekable inputs can only be read once. Metadata below the header is
+    ignored and should be reported.
+    """
+    content = "1.0 ; added ; foo\n# -*- changelog-version: 2.0 -*-\n"
+    issues: List[ParsingIssueMessage] = []
+    metadata, lines = scan_metadata(
+        iter(content.splitlines(keepends=True)), issues.append
+    )
+    assert metadata.version == Version("1.0")
+    assert list(lines) == content.splitlines(keepends=True)
+    assert [issue.message for issue in issues] == [
+        "'-*- changelog-version: x.y -*-' is missing",
+        "Line #2: Ignoring file metadata below the file header. Move it to "
+        "the top of the file.",
+    ]
+
+
+def test_num_releases_stops_reading() -> None:
+    """
+    When limiting the number of releases, we don't want to read more of the
+    file than necessary.
+    """
+    consumed = []
+
+    def lines():
+        yield "# -*- changelog-version: 2.0 -*-\n"
+        for minor in range(1000, 0, -1):
+            for patch in range(3):
+                line = f"1.{minor}.{patch} ; added ; entry ;;;;;\n"
+                consumed.append(line)
+                yield line
+
+    result = parser.parse(lines(), num_releases=2).changelog
+    assert [release.version for release in result.releases] == [
+        Version("1.1000"),
+        Version("1.999"),
+    ]
+    assert len(consumed) < 10
+
+
+def test_num_releases_trailing_release_lines() -> None:
+    """
+    Special "release" lines of version 1.0 files may appear after the
+    requested releases. Their information should be attached as when parsing
+    the whole file.
+    """
+    content = (
+        "2.0 ; added   ; foo\n"
+        "1.0 ; added   ; bar\n"
+        "1.0 ; release ; 2020-01-01 ; Notes for one\n"
+        "2.0 ; release ; 2020-02-02 ; Notes for two\n"
+    )
+    full = parser.parse(StringIO(content)).changelog
+    result = parser.parse(StringIO(content), num_releases=1).changelog
+    assert result.releases == full.releases[:1]
+    assert result.releases[0].notes == "Notes for two"
+
+
+def test_parse_version_cache() -> None:
+    """
+    Parsing the same version string repeatedly should return the same instance
+    """
+    assert parse_version("1.2.3") is parse_version("1.2.3")
+    assert make_release_version(Version("1.2.3"), 2) is make_release_version(
+        Version("1.2.4"), 2
+    )
+
+
+def test_parse_version_invalid() -> None:
+    """
+    Invalid versions should not be cached and still raise an error
+    """
+    with pytest.raises(InvalidVersion):
+        parse_version("not-a-version")
+    with pytest.raises(InvalidVersion):
+        parse_version("not-a-version")
+
+
+@pytest.mark.parametrize("changelog_version", ["1.0", "2.0"])
+def test_iter_parse(changelog_version: str) -> None:
+    """
+    The lazy parser should generate the same releases as the eager one,
+    including the release information.
+    """
+    content = dedent(
+        f"""\
+        # -*- changelog-version: {changelog_version} -*-
+        2.1.0  ; release ; 2018-01-01; Hello World
+        2.1.0  ; added   ; hello world
+        2.0.0  ; added   ; initial
+        """
+    )
+    metadata, releases = parser.iter_parse(StringIO(content))
+    assert metadata.version == Version(changelog_version)
+    assert tuple(releases) == parser.parse(StringIO(content)).changelog.releases
+
+
+@pytest.mark.parametrize("changelog_version", ["1.0", "2.0"])
+def test_scan_versions(changelog_version: str) -> None:
+    """
+    Scanning for versions should only report valid log-entries
+    """
+    issues: List[ParsingIssueMessage] = []
+    data = StringIO(
+        dedent(
+            f"""\
+            # -*- changelog-version: {changelog_version} -*-
+            2.1.0  ; added   ; hello world
+                   ; fixed   ; goodbye world
+            2.0.0  ; invalid ; broken
+            1.0.0  ; added
+            """
+        )
+    )
+    metadata, versions = parser.scan_versions(data, issues.append)
+    assert metadata.version == Version(changelog_version)
+    assert list(versions) == [Version("2.1.0"), Version("2.1.0")]
+    assert [issue.message[:8] for issue in issues] == ["Line #4:", "Line #5:"]
+
+
+def test_scan_versions_v1_release_rows() -> None:
+    """
+    The special "release" lines of changelog v1.0 are not log-entries and
+    should be skipped silently.
+    """
+    issues: List[ParsingIssueMessage] = []
+    data = StringIO("2.1.0 ; release ; 2018-01-01\n2.1.0 ; added ; foo\n")
+    _, versions = parser.scan_versions(data, issues.append)
+    assert list(versions) == [Version("2.1.0")]
+    assert issues == [
+        ParsingIssueMessage(
+            logging.WARNING, "'-*- changelog-version: x.y -*-' is missing"
+        )
+    ]
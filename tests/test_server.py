@@ -0,0 +1,225 @@
+"""
+Tests for the HTTP server mode
+"""
+import os
+import threading
+from json import loads
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from clproc.exc import ClprocException
+from clproc.server import ChangelogServer, ChangelogStore, parse_file_args
+
+CONTENT = """\
+# -*- changelog-version: 2.0 -*-
+1.1.0 ; added ; foo
+1.0.0 ; added ; bar
+"""
+
+
+@pytest.fixture()
+def changelog(tmp_path: Path) -> Path:
+    """
+    A changelog file on disk
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_text(CONTENT)
+    return filename
+
+
+@pytest.fixture()
+def server(changelog: Path) -> Iterator[Tuple[str, ChangelogStore]]:
+    """
+    A running server (on a random port) serving *changelog* as "pkg"
+    """
+    store = ChangelogStore({"pkg": str(changelog)})
+    with ChangelogServer(("127.0.0.1", 0), store) as instance:
+        thread = threading.Thread(
+            target=instance.serve_forever, args=(0.01,), daemon=True
+        )
+        thread.start()
+        host, port = instance.server_address[:2]
+        yield f"http://{host}:{port}", store
+        instance.shutdown()
+    thread.join()
+
+
+def _get(
+    url: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, Dict[str, str], bytes]:
+    try:
+        with urlopen(
+            Request(url, headers=headers or {})
+        ) as response:  # nosec B310
+            return response.status, dict(response.headers), response.read()
+    except HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def _touch(filename: Path, content: str) -> None:
+    """
+    Replace the content of *filename* and make sure the mtime changes
+    """
+    stat = filename.stat()
+    filename.write_text(content)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_index(server: Tuple[str, ChangelogStore]) -> None:
+    """
+    The root URL should list all changelog names
+    """
+    url, _ = server
+    status, _, body = _get(url + "/")
+    assert status == 200
+    assert loads(body) == ["pkg"]
+
+
+@pytest.mark.parametrize(
+    "ext, content_type",
+    [
+        ("md", "text/markdown; charset=utf-8"),
+        ("json", "application/json"),
+        ("ndjson", "application/x-ndjson"),
+    ],
+)
+def test_render(
+    server: Tuple[str, ChangelogStore], ext: str, content_type: str
+) -> None:
+    """
+    Each format should be available using its extension
+    """
+    url, _ = server
+    status, headers, body = _get(f"{url}/pkg.{ext}")
+    assert status == 200
+    assert headers["Content-Type"] == content_type
+    assert b"foo" in body
+
+
+@pytest.mark.parametrize("path", ["/other.md", "/pkg.txt", "/pkg"])
+def test_not_found(server: Tuple[str, ChangelogStore], path: str) -> None:
+    """
+    Unknown changelogs and formats should return a 404
+    """
+    url, _ = server
+    status, _, _ = _get(url + path)
+    assert status == 404
+
+
+def test_etag(server: Tuple[str, ChangelogStore], changelog: Path) -> None:
+    """
+    An unchanged document should result in a 304 response
+    """
+    url, _ = server
+    _, headers, _ = _get(f"{url}/pkg.json")
+    etag = headers["ETag"]
+    status, _, body = _get(f"{url}/pkg.json", {"If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+
+    _touch(changelog, CONTENT.replace("foo", "changed"))
+    status, headers, body = _get(f"{url}/pkg.json", {"If-None-Match": etag})
+    assert status == 200
+    assert headers["ETag"] != etag
+    assert b"changed" in body
+
+
+def test_invalid_content(
+    server: Tuple[str, ChangelogStore], changelog: Path
+) -> None:
+    """
+    Any error while rendering should result in a 500 response. The file is
+    parsed again once it is fixed.
+    """
+    url, _ = server
+    _touch(changelog, CONTENT + "0.9.0 ; added ; baz ; 12a\n")
+    status, _, _ = _get(f"{url}/pkg.json")
+    assert status == 500
+    _touch(changelog, CONTENT + "0.9.0 ; added ; baz ; 12\n")
+    status, _, body = _get(f"{url}/pkg.json")
+    assert status == 200
+    assert b"baz" in body
+
+
+def test_key_error_while_parsing(
+    server: Tuple[str, ChangelogStore], changelog: Path
+) -> None:
+    """
+    A KeyError while parsing an existing changelog is a server error, not a
+    missing document
+    """
+    url, _ = server
+    with patch(
+        "clproc.server.parse_incremental", side_effect=KeyError("notes")
+    ):
+        status, _, _ = _get(f"{url}/pkg.json")
+    assert status == 500
+
+
+def test_parsed_once(server: Tuple[str, ChangelogStore]) -> None:
+    """
+    Unchanged files should be served from memory
+    """
+    url, _ = server
+    _get(f"{url}/pkg.json")
+    with patch("clproc.server.parse_incremental") as parse_incremental:
+        status, _, _ = _get(f"{url}/pkg.json")
+        _get(f"{url}/pkg.md")
+    assert status == 200
+    parse_incremental.assert_not_called()
+
+
+def test_release_file_changes(tmp_path: Path, changelog: Path) -> None:
+    """
+    Modifying the release-file should parse the changelog again
+    """
+    release_file = tmp_path / "release.yaml"
+    release_file.write_text("meta:\n  version: '1.0'\nreleases: {}\n")
+    changelog.write_text(f"# -*- release-file: {release_file} -*-\n{CONTENT}")
+    store = ChangelogStore({"pkg": str(changelog)})
+    first = store.parse_result("pkg")
+    assert first.changelog.releases[0].release_date is None
+    assert store.parse_result("pkg") is first
+    _touch(
+        release_file,
+        "meta:\n  version: '1.0'\nreleases:\n  '1.1':\n    date: 2020-01-02\n    notes: ''\n",
+    )
+    second = store.parse_result("pkg")
+    assert second.changelog.releases[0].release_date is not None
+
+
+def test_relative_release_file(
+    tmp_path: Path, changelog: Path, monkeypatch: Any
+) -> None:
+    """
+    Release-files should be found relative to the folder of the changelog
+    """
+    release_file = tmp_path / "release.yaml"
+    release_file.write_text("meta:\n  version: '1.0'\nreleases: {}\n")
+    changelog.write_text(f"# -*- release-file: release.yaml -*-\n{CONTENT}")
+    monkeypatch.chdir(tmp_path.parent)
+    store = ChangelogStore({"pkg": f"{tmp_path.name}/{changelog.name}"})
+    first = store.parse_result("pkg")
+    assert first.changelog.releases[0].release_date is None
+    _touch(
+        release_file,
+        "meta:\n  version: '1.0'\n"
+        "releases:\n  '1.1':\n    date: 2020-01-02\n    notes: ''\n",
+    )
+    second = store.parse_result("pkg")
+    assert second.changelog.releases[0].release_date is not None
+
+
+def test_parse_file_args() -> None:
+    """
+    Names should default to the folder of the changelog
+    """
+    result = parse_file_args(["a=x/changelog.in", "pkg/changelog.in"])
+    assert result == {"a": "x/changelog.in", "pkg": "pkg/changelog.in"}
+    with pytest.raises(ClprocException):
+        parse_file_args(["a=x/changelog.in", "a=y/changelog.in"])
@@ -0,0 +1,203 @@
+"""
+Tests for the columnar representation of changelogs
+"""
+from io import StringIO
+from typing import Any, Callable, List
+
+import pytest
+from packaging.version import Version
+
+from clproc import parse
+from clproc.model import ChangelogEntry, ChangelogType, ReleaseEntry
+from clproc.table import ChangelogTable, TableView, mask_and, parse_table
+
+CONTENT = """\
+# -*- changelog-version: 2.0 -*-
+# -*- issue-url-template: https://example.com/{id} -*-
+2.0.0 ; added   ; new feature     ; 10,2 ; i
+      ; fixed   ; a fix           ;      ;   ; h
+1.1.0 ; fixed   ; another fix     ; 1    ; i ; h
+1.0.1 ; changed ; a change
+1.0   ; added   ; initial release ;      ;   ;   ; some detail
+"""
+
+
+def _logs(content: str = CONTENT) -> List[ChangelogEntry]:
+    result = parse(StringIO(content), parse_issue_handler=lambda _: None)
+    return [
+        log for release in result.changelog.releases for log in release.logs
+    ]
+
+
+@pytest.fixture()
+def table() -> ChangelogTable:
+    """
+    A table of a small changelog
+    """
+    return parse_table(StringIO(CONTENT), lambda _: None)
+
+
+def test_entries(table: ChangelogTable) -> None:
+    """
+    The entries of a table should be equal to the parsed log-entries
+    """
+    logs = _logs()
+    assert len(table) == len(logs)
+    assert list(table.all()) == logs
+    assert str(table.version(len(logs) - 1)) == "1.0"
+    assert table.file_metadata.issue_url_templates
+
+
+def test_releases(table: ChangelogTable) -> None:
+    """
+    Each entry should be linked to its release
+    """
+    result = parse(StringIO(CONTENT), parse_issue_handler=lambda _: None)
+    assert [release.version for release in table.releases] == [
+        release.version for release in result.changelog.releases
+    ]
+    assert all(not release.logs for release in table.releases)
+    assert table.release(0).version == Version("2.0")
+    assert table.release(len(table) - 1).version == Version("1.0")
+
+
+@pytest.mark.parametrize(
+    "criteria, predicate",
+    [
+        ({}, lambda log: True),
+        (
+            {"types": [ChangelogType.FIXED]},
+            lambda log: log.type_.value == "fixed",
+        ),
+        ({"types": []}, lambda log: False),
+        ({"internal": True}, lambda log: log.is_internal),
+        ({"internal": False}, lambda log: not log.is_internal),
+        ({"highlight": True}, lambda log: log.is_highlight),
+        (
+            {"min_version": Version("1.0.1")},
+            lambda log: log.version >= Version("1.0.1"),
+        ),
+        (
+            {"min_version": Version("1.0.1"), "max_version": Version("2.0")},
+            lambda log: Version("1.0.1") <= log.version < Version("2.0"),
+        ),
+        ({"max_version": Version("1.0.0")}, lambda log: False),
+        (
+            {"min_version": Version("2.0"), "max_version": Version("1.0")},
+            lambda log: False,
+        ),
+        (
+            {"types": [ChangelogType.FIXED], "internal": True},
+            lambda log: log.type_.value == "fixed" and log.is_internal,
+        ),
+    ],
+)
+def test_select(
+    table: ChangelogTable,
+    criteria: Any,
+    predicate: Callable[[ChangelogEntry], bool],
+) -> None:
+    """
+    Filters should select the same entries as filtering the objects
+    """
+    expected = [log for log in _logs() if predicate(log)]
+    view = table.select(**criteria)
+    assert len(view) == len(expected)
+    assert list(view) == expected
+
+
+def test_unordered_versions() -> None:
+    """
+    Version ranges should also work if versions are not sorted in the file
+    """
+    versions = ["1.0", "3.0", "2.0", "3.0", "1.5"]
+    releases = [
+        ReleaseEntry(
+            Version(version), logs=(ChangelogEntry(Version(version)),) * 2
+        )
+        for version in versions
+    ]
+    table = ChangelogTable.from_releases(releases)
+    view = table.select(min_version=Version("1.5"), max_version=Version("3"))
+    assert [str(entry.version) for entry in view] == [
+        "2.0",
+        "2.0",
+        "1.5",
+        "1.5",
+    ]
+
+
+def test_append_resets_version_ranks(table: ChangelogTable) -> None:
+    """
+    Appending releases should be reflected by later filters
+    """
+    assert len(table.select(max_version=Version("0.5"))) == 0
+    table.append_release(
+        ReleaseEntry(Version("0.1"), logs=(ChangelogEntry(Version("0.1")),))
+    )
+    assert len(table.select(max_version=Version("0.5"))) == 1
+
+
+def test_chained_views(table: ChangelogTable) -> None:
+    """
+    Selecting from a view should narrow it down
+    """
+    public = table.select(internal=False)
+    fixes = public.select(types=[ChangelogType.FIXED])
+    assert (
+        fixes.mask
+        == table.select(internal=False, types=[ChangelogType.FIXED]).mask
+    )
+    assert [entry.subject for entry in fixes] == ["a fix"]
+
+
+def test_view_helpers(table: ChangelogTable) -> None:
+    """
+    Views should offer aggregates without creating entry objects
+    """
+    view = table.select(internal=False)
+    logs = [log for log in _logs() if not log.is_internal]
+    assert view.subjects() == [log.subject for log in logs]
+    counts = view.count_by_type()
+    assert counts == {
+        type_: sum(1 for log in logs if log.type_ == type_)
+        for type_ in ChangelogType
+    }
+
+
+def test_version_spelling() -> None:
+    """
+    Versions which only differ in their spelling should be kept apart
+    """
+    releases = [
+        ReleaseEntry(
+            Version("1.0"),
+            logs=(
+                ChangelogEntry(Version("1.0.0")),
+                ChangelogEntry(Version("1.0")),
+            ),
+        )
+    ]
+    table = ChangelogTable.from_releases(releases)
+    assert [str(entry.version) for entry in table.all()] == ["1.0.0", "1.0"]
+
+
+def test_invalid_access(table: ChangelogTable) -> None:
+    """
+    Invalid indices and masks should be rejected
+    """
+    with pytest.raises(IndexError):
+        table.entry(len(table))
+    with pytest.raises(ValueError):
+        TableView(table, b"\x01")
+
+
+def test_mask_and() -> None:
+    """
+    Masks should be combined entry by entry
+    """
+    assert (
+        mask_and(b"\x01\x01\x00\x00", b"\x01\x00\x01\x00")
+        == b"\x01\x00\x00\x00"
+    )
+    assert mask_and(b"", b"") == b""
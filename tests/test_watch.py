@@ -0,0 +1,182 @@
+"""
+Tests for the "watch" mode of the render command
+"""
+import os
+import stat
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from clproc import cli
+from clproc.watch import Watcher, watch, write_if_changed
+
+CONTENT = """\
+# -*- changelog-version: 2.0 -*-
+1.1.0 ; added ; foo
+1.0.0 ; added ; bar
+"""
+
+
+def _touch(filename: Path, content: str) -> None:
+    """
+    Replace the content of *filename* and make sure the mtime changes
+    """
+    stat = filename.stat()
+    filename.write_text(content)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture()
+def changelog(tmp_path: Path) -> Path:
+    """
+    A changelog file on disk
+    """
+    filename = tmp_path / "changelog.in"
+    filename.write_text(CONTENT)
+    return filename
+
+
+def _watcher(changelog: Path, sleeps: List[float]) -> Watcher:
+    outfile = changelog.parent / "CHANGELOG.md"
+    return Watcher(
+        str(changelog), str(outfile), "markdown", sleep=sleeps.append
+    )
+
+
+def test_write_if_changed(tmp_path: Path) -> None:
+    """
+    Files should only be written if the content differs
+    """
+    filename = str(tmp_path / "out.txt")
+    assert write_if_changed(filename, b"foo")
+    assert not write_if_changed(filename, b"foo")
+    assert write_if_changed(filename, b"bar")
+    assert (tmp_path / "out.txt").read_bytes() == b"bar"
+    assert os.listdir(tmp_path) == ["out.txt"]
+
+
+def test_write_if_changed_mode(tmp_path: Path) -> None:
+    """
+    New files should get the default mode (from the umask) and existing
+    files should keep their mode
+    """
+    umask = os.umask(0o022)
+    try:
+        filename = tmp_path / "out.txt"
+        assert write_if_changed(str(filename), b"foo")
+        assert stat.S_IMODE(filename.stat().st_mode) == 0o644
+        filename.chmod(0o664)
+        assert write_if_changed(str(filename), b"bar")
+        assert stat.S_IMODE(filename.stat().st_mode) == 0o664
+    finally:
+        os.umask(umask)
+
+
+def test_initial_render(changelog: Path) -> None:
+    """
+    The first poll should render the changelog without waiting
+    """
+    sleeps: List[float] = []
+    watcher = _watcher(changelog, sleeps)
+    assert watcher.poll()
+    assert "foo" in (changelog.parent / "CHANGELOG.md").read_text()
+    assert not sleeps
+    assert not watcher.poll()
+
+
+def test_modification(changelog: Path) -> None:
+    """
+    A modified changelog should be rendered again after the debounce delay
+    """
+    sleeps: List[float] = []
+    watcher = _watcher(changelog, sleeps)
+    watcher.poll()
+    _touch(changelog, CONTENT.replace("foo", "changed"))
+    assert watcher.poll()
+    assert sleeps == [watcher.debounce]
+    assert "changed" in (changelog.parent / "CHANGELOG.md").read_text()
+
+
+def test_unchanged_output(changelog: Path) -> None:
+    """
+    Modifications which don't change the document should not touch the output
+    """
+    watcher = _watcher(changelog, [])
+    watcher.poll()
+    outfile = changelog.parent / "CHANGELOG.md"
+    mtime = outfile.stat().st_mtime_ns
+    _touch(changelog, CONTENT + "# just a comment\n")
+    assert not watcher.poll()
+    assert outfile.stat().st_mtime_ns == mtime
+
+
+def test_release_file(tmp_path: Path, changelog: Path) -> None:
+    """
+    Modifications of the release-file should be detected
+    """
+    release_file = tmp_path / "release.yaml"
+    release_file.write_text("meta:\n  version: '1.0'\nreleases: {}\n")
+    changelog.write_text(f"# -*- release-file: {release_file} -*-\n{CONTENT}")
+    watcher = _watcher(changelog, [])
+    watcher.poll()
+    assert not watcher.poll()
+    _touch(
+        release_file,
+        "meta:\n  version: '1.0'\nreleases:\n"
+        "  '1.1':\n    date: 2020-01-02\n    notes: ''\n",
+    )
+    assert watcher.poll()
+    assert "2020-01-02" in (tmp_path / "CHANGELOG.md").read_text()
+
+
+def test_watch_continues_after_errors(changelog: Path, caplog) -> None:
+    """
+    Errors while rendering should be reported without stopping the loop
+    """
+    sleeps: List[float] = []
+    watcher = _watcher(changelog, sleeps)
+    changelog.unlink()
+    watch(watcher, interval=1, iterations=3)
+    assert sleeps == [1, 1]
+    assert "Unable to render" in caplog.text
+
+
+def test_watch_continues_after_invalid_edit(changelog: Path, caplog) -> None:
+    """
+    Invalid content (as typed while editing) should be reported and picked up
+    again once it is fixed.
+    """
+    sleeps: List[float] = []
+    watcher = _watcher(changelog, sleeps)
+    watch(watcher, interval=1, iterations=1)
+    _touch(changelog, CONTENT + "0.9.0 ; added ; baz ; 12a\n")
+    watch(watcher, interval=1, iterations=2)
+    assert "Unable to render" in caplog.text
+    _touch(changelog, CONTENT + "0.9.0 ; added ; baz ; 12\n")
+    watch(watcher, interval=1, iterations=1)
+    assert "baz" in (changelog.parent / "CHANGELOG.md").read_text()
+
+
+def test_cli_requires_outfile(changelog: Path) -> None:
+    """
+    Watching is only possible when writing into a file
+    """
+    assert cli.main([str(changelog), "render", "--watch"]) == 1
+
+
+def test_cli_watch(changelog: Path) -> None:
+    """
+    The CLI should render into the output file until interrupted
+    """
+    outfile = changelog.parent / "out.json"
+    with patch("clproc.watch.watch", side_effect=KeyboardInterrupt) as mock:
+        exit_code = cli.main(
+            [str(changelog), "render", "--watch", "-o", str(outfile)]
+        )
+    assert exit_code == 0
+    (watcher,), _ = mock.call_args
+    assert watcher.outfile == str(outfile)
+    assert watcher.poll()
+    assert outfile.read_text().startswith("[")